@@ -0,0 +1,42 @@
+from typing import Optional
+
+import typer
+
+from .suite import compare, load_baseline, measure, record, save_baseline, select
+
+
+def main(
+    only: Optional[str] = None,
+    quick: bool = False,
+    repeat: int = 3,
+    tolerance: float = 0.2,
+    update_baseline: bool = False,
+) -> None:
+    """Run the benchmark suite, append its results to the history and flag regressions against the baseline.
+
+    `--only` selects benchmarks by glob pattern. `--quick` runs a tenth as many steps per run, as a smoke test, and
+    isn't compared against the baseline. Regressions are slowdowns, or peak memory growth, beyond `--tolerance`.
+    """
+    results = {}
+    for benchmark in select(only, quick):
+        results[benchmark.name] = result = measure(benchmark, repeat)
+        typer.echo(
+            f"{benchmark.name:<40} {result['steps_per_second']:>14,.0f} steps/s "
+            f"{result['peak_rss_bytes'] / 2**20:>8,.0f} MiB peak RSS"
+        )
+    record(results, quick)
+    if update_baseline:
+        save_baseline(results)
+        typer.echo("📌 Baseline updated.")
+        return
+    if quick:
+        return
+    regressions = compare(results, load_baseline(), tolerance)
+    for regression in regressions:
+        typer.echo(f"🔴 {regression}")
+    if regressions:
+        raise typer.Exit(code=1)
+    typer.echo("🟢 No regressions.")
+
+
+typer.run(main)
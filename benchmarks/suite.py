@@ -0,0 +1,208 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import datetime
+import fnmatch
+import functools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Optional, Sequence
+
+from examples.lotka_volterra.system import LotkaVolterraSystem, VectorizedLotkaVolterraSystem
+from solsim.simulation import Simulation
+
+from .systems import MockRPCSolanaSystem, SyntheticSystem
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baseline.json")
+HISTORY_PATH = os.path.join(BENCHMARKS_DIR, "history.jsonl")
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A simulation to time.
+
+    Attributes:
+        name: A unique name, under which results are recorded.
+        system: A zero-argument callable that builds the system.
+        watchlist: The quantities to watch.
+        runs: The number of runs.
+        steps_per_run: The number of steps per run.
+    """
+
+    name: str
+    system: Callable[[], Any]
+    watchlist: Sequence[str]
+    runs: int
+    steps_per_run: int
+    simulation_kwargs: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def steps(self) -> int:
+        return self.runs * self.steps_per_run
+
+
+def _lotka_volterra(cls: type) -> Callable[[], Any]:
+    return functools.partial(cls, population_size=50, food_supply=1000, reproduction_rate=0.01, consumption_rate=0.1)
+
+
+def _synthetic(width: int, state_size: int = 0, runs: int = 10, steps_per_run: int = 2_000) -> Benchmark:
+    system = functools.partial(SyntheticSystem, width, state_size)
+    watchlist = [f"q{i}" for i in range(width)]
+    return Benchmark(f"synthetic-w{width}-s{state_size}", system, watchlist, runs, steps_per_run)
+
+
+LOTKA_VOLTERRA_WATCHLIST = ("population_size", "food_supply")
+
+SUITE = [
+    # Runs and steps.
+    Benchmark("lotka_volterra-r1", _lotka_volterra(LotkaVolterraSystem), LOTKA_VOLTERRA_WATCHLIST, 1, 20_000),
+    Benchmark("lotka_volterra-r200", _lotka_volterra(LotkaVolterraSystem), LOTKA_VOLTERRA_WATCHLIST, 200, 100),
+    Benchmark(
+        "lotka_volterra_vectorized-r1000",
+        _lotka_volterra(VectorizedLotkaVolterraSystem),
+        LOTKA_VOLTERRA_WATCHLIST,
+        1_000,
+        1_000,
+    ),
+    # Watchlist width.
+    _synthetic(width=1),
+    _synthetic(width=16),
+    _synthetic(width=128, steps_per_run=500),
+    # State size.
+    _synthetic(width=1, state_size=100_000, steps_per_run=200),
+    # Batched RPC reads and concurrent actions, against an in-memory endpoint.
+    Benchmark("mock_rpc-a64", functools.partial(MockRPCSolanaSystem, 64), ("mean_balance", "num_ok"), 2, 20),
+]
+
+
+def select(pattern: Optional[str] = None, quick: bool = False) -> list[Benchmark]:
+    """Select benchmarks from the suite.
+
+    Args:
+        pattern: Optionally, a glob pattern that benchmark names must match, e.g. "lotka_volterra*".
+        quick: Whether to run a tenth as many steps per run, e.g. as a smoke test.
+
+    Returns:
+        The selected benchmarks.
+    """
+    benchmarks = [b for b in SUITE if pattern is None or fnmatch.fnmatch(b.name, pattern)]
+    if quick:
+        benchmarks = [
+            Benchmark(b.name, b.system, b.watchlist, b.runs, max(b.steps_per_run // 10, 2), b.simulation_kwargs)
+            for b in benchmarks
+        ]
+    return benchmarks
+
+
+def _measure(benchmark: Benchmark, repeat: int) -> dict[str, float]:
+    # Keep progress bars, written to stderr, out of the measurements' output.
+    sys.stderr = open(os.devnull, "w")
+    seconds = []
+    for _ in range(repeat):
+        simulation = Simulation(benchmark.system(), benchmark.watchlist, seed=0, **benchmark.simulation_kwargs)
+        start = time.perf_counter()
+        simulation.run(runs=benchmark.runs, steps_per_run=benchmark.steps_per_run)
+        seconds.append(time.perf_counter() - start)
+    return {
+        "steps_per_second": benchmark.steps / min(seconds),
+        # `ru_maxrss` is in kilobytes on Linux.
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def measure(benchmark: Benchmark, repeat: int = 3) -> dict[str, float]:
+    """Measure a benchmark's throughput and peak memory in a fresh process, such that benchmarks don't interfere.
+
+    Args:
+        benchmark: The benchmark.
+        repeat: The number of times to run the simulation. Throughput is that of the fastest.
+
+    Returns:
+        The benchmark's steps per second and peak resident set size, in bytes.
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_measure, benchmark, repeat).result()
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float = 0.2
+) -> list[str]:
+    """Compare results against a baseline.
+
+    Args:
+        results: The results, by benchmark name.
+        baseline: The baseline results, by benchmark name. Benchmarks absent from the baseline are not compared.
+        tolerance: The fraction by which throughput may fall, or peak memory rise, before it counts as a regression.
+
+    Returns:
+        A description of each regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]
+        if result["steps_per_second"] < expected["steps_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['steps_per_second']:,.0f} steps/s, down from {expected['steps_per_second']:,.0f}"
+            )
+        if result["peak_rss_bytes"] > expected["peak_rss_bytes"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result['peak_rss_bytes'] / 2**20:,.0f} MiB peak RSS, "
+                f"up from {expected['peak_rss_bytes'] / 2**20:,.0f}"
+            )
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict[str, dict[str, float]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        baseline: dict[str, dict[str, float]] = json.load(f)
+        return baseline
+
+
+def save_baseline(results: dict[str, dict[str, float]], path: str = BASELINE_PATH) -> None:
+    baseline = {**load_baseline(path), **{name: {k: round(v) for k, v in r.items()} for name, r in results.items()}}
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def record(results: dict[str, dict[str, float]], quick: bool = False, path: str = HISTORY_PATH) -> dict[str, Any]:
+    """Append results, and the environment that produced them, to the benchmark history: one JSON object per line.
+
+    Args:
+        results: The results, by benchmark name.
+        quick: Whether the results came from a quick run.
+        path: The history file.
+
+    Returns:
+        The recorded entry.
+    """
+    entry = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": _current_commit(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "quick": quick,
+        "results": results,
+    }
+    with open(path, "a") as f:
+        f.write(json.dumps(entry, sort_keys=True) + "\n")
+    return entry
+
+
+def _current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BENCHMARKS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
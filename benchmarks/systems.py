@@ -0,0 +1,105 @@
+import functools
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict
+
+import httpx
+import numpy as np
+from solana.keypair import Keypair
+
+from solsim.rpc import BatchClient
+from solsim.system import BaseSolanaSystem, BaseSystem
+from solsim.validator import LocalnetValidator
+
+
+class SyntheticSystem(BaseSystem):
+    """A system whose cost is dominated by the engine: `width` scalar quantities, plus `state_size` floats of payload.
+
+    Args:
+        width: The number of scalar quantities in each state, each of which can be watched.
+        state_size: The number of floats in an additional, unwatched array in each state.
+    """
+
+    HISTORY = 0
+
+    def __init__(self, width: int, state_size: int = 0):
+        self.width = width
+        self.state_size = state_size
+        self.quantities = [f"q{i}" for i in range(width)]
+
+    def initial_step(self) -> Dict:
+        return {**{qty: 0.0 for qty in self.quantities}, "payload": np.zeros(self.state_size)}
+
+    def step(self, state, history) -> Dict:
+        noise = np.random.random()
+        return {**{qty: state[qty] + noise for qty in self.quantities}, "payload": state["payload"] + noise}
+
+
+class _ValidatorlessLocalnet(LocalnetValidator):
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class MockRPCSolanaSystem(BaseSolanaSystem):
+    """A Solana system that reads balances and submits transactions against an in-memory RPC endpoint.
+
+    Exercises `BaseSolanaSystem`'s batched reads and concurrent actions without a localnet cluster.
+
+    Args:
+        num_agents: The number of agents, each of which owns one token account and submits one transaction per step.
+        latency: The number of seconds the endpoint takes to answer each batch.
+    """
+
+    HISTORY = 0
+    CACHE_ACCOUNTS = False  # Balances are random, and change behind the cache's back.
+
+    def __init__(self, num_agents: int, latency: float = 0.0):
+        self._workspace_dir = tempfile.mkdtemp(prefix="solsim-bench-")
+        os.makedirs(os.path.join(self._workspace_dir, "target", "idl"))
+        validator = _ValidatorlessLocalnet(self._workspace_dir)
+        super().__init__(self._workspace_dir, validator=validator)
+        self.num_agents = num_agents
+        self.latency = latency
+        self.accounts = [Keypair().public_key for _ in range(num_agents)]
+        self._rpc = BatchClient(
+            validator.cluster_uri, session=httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+        )
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            # The transport is synchronous, so latency is paid per batch, not per request.
+            time.sleep(self.latency)
+        responses = []
+        for r in json.loads(request.content):
+            if r["method"] == "getTokenAccountBalance":
+                result: Any = {"value": {"uiAmount": float(np.random.randint(1, 1000))}}
+            else:
+                result = r["params"][0]
+            responses.append({"jsonrpc": "2.0", "id": r["id"], "result": result})
+        return httpx.Response(200, json=responses)
+
+    async def _transact(self, account: Any) -> Any:
+        return await self.rpc.request("sendTransaction", [str(account)])
+
+    async def _step(self) -> Dict:
+        balances = await self.get_token_account_balances(self.accounts)
+        results = await self.gather_agent_actions(
+            {str(account): [functools.partial(self._transact, account)] for account in self.accounts}
+        )
+        return {"mean_balance": float(np.mean(balances)), "num_ok": sum(result.ok for result in results.values())}
+
+    async def cleanup(self) -> None:
+        await super().cleanup()
+        shutil.rmtree(self._workspace_dir, ignore_errors=True)
+
+    async def initial_step(self) -> Dict:
+        return await self._step()
+
+    async def step(self, state, history) -> Dict:
+        return await self._step()
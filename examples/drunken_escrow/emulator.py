@@ -0,0 +1,79 @@
+"""The escrow program's instructions, emulated, such that the example runs without a localnet cluster."""
+from solsim.emulator import EmulatedBackend
+
+
+def _require_signer(signers, pubkey):
+    if not any(signer.public_key == pubkey for signer in signers):
+        raise Exception(f"Missing signature for {pubkey}.")
+
+
+def init_mints(emulator, foo_coin_mint_bump, bar_coin_mint_bump, *, accounts, signers):
+    emulator.create_mint(accounts["foo_coin_mint"])
+    emulator.create_mint(accounts["bar_coin_mint"])
+
+
+def init_maker_assoc_token_accts(emulator, *, accounts, signers):
+    _require_signer(signers, accounts["maker"])
+    for coin in ("foo", "bar"):
+        address = accounts[f"maker_{coin}_coin_assoc_token_acct"]
+        if not emulator.exists(address):
+            emulator.create_token_account(address, accounts[f"{coin}_coin_mint"], accounts["maker"])
+
+
+def init_taker_assoc_token_accts(emulator, *, accounts, signers):
+    _require_signer(signers, accounts["taker"])
+    for coin in ("foo", "bar"):
+        address = accounts[f"taker_{coin}_coin_assoc_token_acct"]
+        if not emulator.exists(address):
+            emulator.create_token_account(address, accounts[f"{coin}_coin_mint"], accounts["taker"])
+
+
+def reset_assoc_token_acct_balances(
+    emulator, foo_coin_mint_bump, bar_coin_mint_bump, init_assoc_token_acct_balance, *, accounts, signers
+):
+    # The maker starts out with foo coin, and the taker with bar coin.
+    emulator.set_token_balance(accounts["maker_foo_coin_assoc_token_acct"], init_assoc_token_acct_balance)
+    emulator.set_token_balance(accounts["taker_bar_coin_assoc_token_acct"], init_assoc_token_acct_balance)
+
+
+def init_escrow(emulator, escrow_account_bump, *, accounts, signers):
+    _require_signer(signers, accounts["swap_state"])
+    emulator.create_account(accounts["swap_state"])
+    emulator.create_token_account(accounts["escrow_account"], accounts["foo_coin_mint"], accounts["escrow_account"])
+
+
+def submit(emulator, escrow_account_bump, foo_coin_amount, bar_coin_amount, *, accounts, signers):
+    _require_signer(signers, accounts["maker"])
+    emulator.transfer(accounts["maker_foo_coin_assoc_token_acct"], accounts["escrow_account"], foo_coin_amount)
+    emulator.write(accounts["swap_state"]).data = {
+        "maker": str(accounts["maker"]),
+        "foo_coin_amount": foo_coin_amount,
+        "bar_coin_amount": bar_coin_amount,
+    }
+
+
+def accept(emulator, *, accounts, signers):
+    _require_signer(signers, accounts["taker"])
+    terms = emulator.account(accounts["swap_state"]).data
+    if terms.get("maker") != str(accounts["maker"]):
+        raise Exception(f"Swap state {accounts['swap_state']} holds no offer from {accounts['maker']}.")
+    emulator.transfer(
+        accounts["taker_bar_coin_assoc_token_acct"], accounts["maker_bar_coin_assoc_token_acct"], terms["bar_coin_amount"]
+    )
+    emulator.transfer(accounts["escrow_account"], accounts["taker_foo_coin_assoc_token_acct"], terms["foo_coin_amount"])
+    emulator.close_account(accounts["escrow_account"])
+    emulator.close_account(accounts["swap_state"])
+
+
+def escrow_backend(workspace_dir, latency=0.0):
+    """Return a backend that runs `anchor_escrow_program` in-process."""
+    instructions = {
+        "init_mints": init_mints,
+        "init_maker_assoc_token_accts": init_maker_assoc_token_accts,
+        "init_taker_assoc_token_accts": init_taker_assoc_token_accts,
+        "reset_assoc_token_acct_balances": reset_assoc_token_acct_balances,
+        "init_escrow": init_escrow,
+        "submit": submit,
+        "accept": accept,
+    }
+    return EmulatedBackend(workspace_dir, {"anchor_escrow_program": instructions}, latency=latency)
@@ -1,15 +1,19 @@
 import os
 
+from .emulator import escrow_backend
 from .system import DrunkenEscrowSystem
 from solsim.simulation import Simulation
 
 
-def main(num_escrows=3, steps_per_run=4):
+def main(num_escrows=3, steps_per_run=4, emulated=False):
+    workspace_dir = os.path.join(os.path.dirname(__file__), "anchor-escrow-program")
     simulation = Simulation(
         system=DrunkenEscrowSystem(
-            workspace_dir=os.path.join(os.path.dirname(__file__), "anchor-escrow-program"),
+            workspace_dir=workspace_dir,
             init_assoc_token_acct_balance=100,
             num_escrows=num_escrows,
+            # Run the escrow program's instructions in-process, rather than on a localnet cluster.
+            validator=escrow_backend(workspace_dir) if emulated else None,
         ),
         watchlist=("num_swaps", "mean_swap_amount", "mean_balance_spread"),
     )
@@ -1,5 +1,5 @@
-import random
-from typing import Dict, Tuple
+import functools
+from typing import Dict
 
 
 from anchorpy import Context
@@ -8,6 +8,7 @@ from solana.keypair import Keypair
 from solana.publickey import PublicKey
 from spl.token.instructions import get_associated_token_address
 
+from solsim.population import Population
 from solsim.system import BaseSolanaSystem
 from solsim.constant import (
     SYSVAR_RENT_PUBKEY,
@@ -29,6 +30,8 @@ class SimpleEscrow:
         bar_coin_mint_bump,
         program,
         init_assoc_token_acct_balance,
+        assoc_token_accts=None,
+        swap_state=None,
     ):
         self.maker = maker
         self.taker = taker
@@ -39,10 +42,15 @@ class SimpleEscrow:
         self.bar_coin_mint_bump = bar_coin_mint_bump
         self.program = program
         self.init_assoc_token_acct_balance = init_assoc_token_acct_balance
-        self.swap_state = Keypair()
-        self.escrow_account, self.escrow_account_bump = PublicKey.find_program_address(
-            [bytes(self.swap_state.public_key)], self.program.program_id
-        )
+        if assoc_token_accts is not None:
+            self.assoc_token_accts = assoc_token_accts
+        if swap_state is not None:
+            self.swap_state, self.escrow_account, self.escrow_account_bump = swap_state
+        else:
+            self.swap_state = Keypair()
+            self.escrow_account, self.escrow_account_bump = PublicKey.find_program_address(
+                [bytes(self.swap_state.public_key)], self.program.program_id
+            )
 
     async def get_assoc_token_accounts(self):
         self.assoc_token_accts = {
@@ -174,49 +182,98 @@ class SimpleEscrow:
 
 
 class DrunkenEscrowSystem(BaseSolanaSystem):
-    def __init__(self, workspace_dir: str, init_assoc_token_acct_balance: int, num_escrows: int):
-        super().__init__(workspace_dir)
+
+    HISTORY = 0  # `step` only reads `len(history)`
+    REUSE_LOCALNET = True  # `reset` gives each run fresh agents.
+
+    def __init__(self, workspace_dir: str, init_assoc_token_acct_balance: int, num_escrows: int, validator=None):
+        super().__init__(workspace_dir, validator=validator)
         self._escrow_program = self.workspace["anchor_escrow_program"]
         self.payer = self._escrow_program.provider.wallet.public_key
         self.init_assoc_token_acct_balance = init_assoc_token_acct_balance
-        self.agents = [Keypair() for _ in range(num_escrows * 2)]
-
-    def _compose_maker_taker_pairs(self):
-        agents = list(self.agents)
-        random.shuffle(agents)
-        return [tuple(agents[i : i + 2]) for i in range(0, len(agents), 2)]  # noqa: E203
-
-    async def _compose_escrows(self, step):
-        pairs = self._compose_maker_taker_pairs()
-        escrows = []
-        for maker, taker in pairs:
-            escrow = SimpleEscrow(
-                maker,
-                taker,
-                self.payer,
-                self.foo_coin_mint,
-                self.bar_coin_mint,
-                self.foo_coin_mint_bump,
-                self.bar_coin_mint_bump,
-                self._escrow_program,
-                self.init_assoc_token_acct_balance,
-            )
-            await escrow.get_assoc_token_accounts()
-            if step == 0:
-                await escrow.init_maker_assoc_token_accounts()
-                await escrow.init_taker_assoc_token_accounts()
-                await escrow.reset_assoc_token_acct_balances()
-            await escrow.initialize()
-            escrows.append(escrow)
-        return escrows
-
-    async def _init_mints(self):
+        self.num_escrows = num_escrows
         self.foo_coin_mint, self.foo_coin_mint_bump = PublicKey.find_program_address(
             [bytes("foo", encoding="utf8")], self._escrow_program.program_id
         )
         self.bar_coin_mint, self.bar_coin_mint_bump = PublicKey.find_program_address(
             [bytes("bar", encoding="utf8")], self._escrow_program.program_id
         )
+        # `init_escrow` creates each escrow's swap state account, so swap states are used up, not recycled. The pool
+        # generates them, and derives their escrow accounts, in bulk, before each step: at most one per pair trades.
+        self._swap_states = self.account_pool(self._new_swap_state, size=num_escrows, reusable=False)
+        self.reset()
+
+    def reset(self):
+        # Fresh agents have fresh associated token accounts, so each run starts from the initial balances.
+        self._build_agents([Keypair() for _ in range(self.num_escrows * 2)])
+
+    def _build_agents(self, keypairs):
+        # Agents are rows of arrays: their token accounts are derived once per run, rather than once per escrow.
+        self.agents = Population(
+            len(keypairs),
+            ids=keypairs,
+            foo_acct=[get_associated_token_address(agent.public_key, self.foo_coin_mint) for agent in keypairs],
+            bar_acct=[get_associated_token_address(agent.public_key, self.bar_coin_mint) for agent in keypairs],
+            foo_balance=0,
+            bar_balance=0,
+        )
+
+    def snapshot(self, path):
+        super().snapshot(path)
+        return [agent.secret_key for agent in self.agents.ids]
+
+    def restore(self, snapshot, path):
+        super().restore(snapshot, path)
+        self._build_agents([Keypair.from_secret_key(secret_key) for secret_key in snapshot])
+
+    def _compose_maker_taker_pairs(self):
+        return self.agents.pair(self.rng)
+
+    def _new_swap_state(self):
+        swap_state = Keypair()
+        escrow_account, escrow_account_bump = PublicKey.find_program_address(
+            [bytes(swap_state.public_key)], self._escrow_program.program_id
+        )
+        return swap_state, escrow_account, escrow_account_bump
+
+    def _compose_escrow(self, maker, taker, swap_state=None):
+        return SimpleEscrow(
+            self.agents.ids[maker],
+            self.agents.ids[taker],
+            self.payer,
+            self.foo_coin_mint,
+            self.bar_coin_mint,
+            self.foo_coin_mint_bump,
+            self.bar_coin_mint_bump,
+            self._escrow_program,
+            self.init_assoc_token_acct_balance,
+            assoc_token_accts={
+                "maker": {"foo": self.agents["foo_acct"][maker], "bar": self.agents["bar_acct"][maker]},
+                "taker": {"foo": self.agents["foo_acct"][taker], "bar": self.agents["bar_acct"][taker]},
+            },
+            swap_state=swap_state,
+        )
+
+    async def _init_assoc_token_accounts(self, pairs):
+        actions = {}
+        for maker, taker in pairs:
+            escrow = self._compose_escrow(maker, taker)
+            actions[escrow] = [
+                escrow.init_maker_assoc_token_accounts,
+                escrow.init_taker_assoc_token_accounts,
+                escrow.reset_assoc_token_acct_balances,
+            ]
+        self._raise_for_failed_actions(await self.gather_agent_actions(actions))
+
+    @staticmethod
+    def _raise_for_failed_actions(results):
+        errors = {agent: result.error for agent, result in results.items() if not result.ok}
+        if errors:
+            raise Exception(f"{len(errors)} escrow(s) failed: {list(errors.values())}")
+
+    async def _init_mints(self):
+        if self.client.get_account_info(self.foo_coin_mint)["result"]["value"] is not None:
+            return  # Mints were initialized in a previous run on the same localnet cluster.
         await self._escrow_program.rpc["init_mints"](
             self.foo_coin_mint_bump,
             self.bar_coin_mint_bump,
@@ -232,39 +289,41 @@ class DrunkenEscrowSystem(BaseSolanaSystem):
             ),
         )
 
-    def _propose_escrow_terms(self, escrow) -> Tuple[float, float]:
-        maker_foo_balance = self.get_token_account_balance(escrow.assoc_token_accts["maker"]["foo"])
-        taker_bar_balance = self.get_token_account_balance(escrow.assoc_token_accts["taker"]["bar"])
-        if maker_foo_balance > 1 and taker_bar_balance > 1:
-            foo_amt = np.random.randint(1, maker_foo_balance)
-            bar_amt = np.random.randint(1, taker_bar_balance)
-            amt = min(foo_amt, bar_amt)
-            terms = (amt, amt)
-        else:
-            terms = (None, None)
-        return terms
+    def _propose_escrow_terms(self, maker_foo_balances, taker_bar_balances):
+        # Every pair's terms at once: pairs in which either agent holds at most 1 coin don't trade.
+        trades = (maker_foo_balances > 1) & (taker_bar_balances > 1)
+        foo_amts = self.rng.integers(1, maker_foo_balances[trades])
+        bar_amts = self.rng.integers(1, taker_bar_balances[trades])
+        return trades, np.minimum(foo_amts, bar_amts)
+
+    async def _fetch_balances(self):
+        balances = await self.get_token_account_balances([*self.agents["foo_acct"], *self.agents["bar_acct"]])
+        self.agents["foo_balance"] = np.array(balances[: len(self.agents)], dtype=np.int64)
+        self.agents["bar_balance"] = np.array(balances[len(self.agents) :], dtype=np.int64)  # noqa: E203
 
     async def _swap(self, step: int):
-        escrows = await self._compose_escrows(step)
-        amounts = []
-        for escrow in escrows:
-            terms = self._propose_escrow_terms(escrow)
-            if terms != (None, None):
-                foo_coin_amount, bar_coin_amount = terms
-                await escrow.submit(foo_coin_amount, bar_coin_amount)
-                await escrow.accept()
-                amounts.append(foo_coin_amount)  # foo_coin_amount and bar_coin_amount always equivalent
-        return escrows, amounts
-
-    def _compute_balance_spread_stats(self, escrows):
-        spreads = []
-        for escrow in escrows:
-            for role in ["maker", "taker"]:
-                spread = abs(
-                    self.get_token_account_balance(escrow.assoc_token_accts[role]["foo"])
-                    - self.get_token_account_balance(escrow.assoc_token_accts[role]["bar"])  # noqa: W503
-                )
-                spreads.append(spread)
+        pairs = self._compose_maker_taker_pairs()
+        if step == 0:
+            await self._init_assoc_token_accounts(pairs)
+        await self._fetch_balances()
+        trades, amounts = self._propose_escrow_terms(
+            self.agents["foo_balance"][pairs[:, 0]], self.agents["bar_balance"][pairs[:, 1]]
+        )
+        # Only pairs that trade go on-chain. Terms are equivalent: as much foo coin as bar coin.
+        swap_states = await self._swap_states.lease(len(amounts))
+        try:
+            actions = {}
+            for (maker, taker), amount, swap_state in zip(pairs[trades], amounts.tolist(), swap_states):
+                escrow = self._compose_escrow(maker, taker, swap_state)
+                actions[escrow] = [escrow.initialize, functools.partial(escrow.submit, amount, amount), escrow.accept]
+            self._raise_for_failed_actions(await self.gather_agent_actions(actions))
+        finally:
+            self._swap_states.release(swap_states)
+        return amounts.tolist()
+
+    async def _compute_balance_spread_stats(self):
+        await self._fetch_balances()
+        spreads = np.abs(self.agents["foo_balance"] - self.agents["bar_balance"])
         return {"mean_balance_spread": np.mean(spreads)}
 
     def _compute_swap_amount_stats(self, amounts):
@@ -272,15 +331,15 @@ class DrunkenEscrowSystem(BaseSolanaSystem):
 
     async def initial_step(self) -> Dict:
         await self._init_mints()
-        escrows, amounts = await self._swap(step=0)
+        amounts = await self._swap(step=0)
         return {
             **self._compute_swap_amount_stats(amounts),
-            **self._compute_balance_spread_stats(escrows),
+            **(await self._compute_balance_spread_stats()),
         }
 
     async def step(self, state, history) -> Dict:
-        escrows, amounts = await self._swap(step=len(history))
+        amounts = await self._swap(step=len(history))
         return {
             **self._compute_swap_amount_stats(amounts),
-            **self._compute_balance_spread_stats(escrows),
+            **(await self._compute_balance_spread_stats()),
         }
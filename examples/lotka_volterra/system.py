@@ -1,8 +1,14 @@
 from typing import Dict
-from solsim.system import BaseSystem
+
+import numpy as np
+
+from solsim.system import BaseSystem, VectorizedSystem
 
 
 class LotkaVolterraSystem(BaseSystem):
+
+    HISTORY = 0
+
     def __init__(
         self,
         population_size,
@@ -25,3 +31,36 @@ class LotkaVolterraSystem(BaseSystem):
         population_size = max(state["population_size"] + self.reproduction_rate * state["food_supply"], 0)
         food_supply = max(state["food_supply"] - self.consumption_rate * state["population_size"], 0)
         return {"population_size": population_size, "food_supply": food_supply}
+
+
+class VectorizedLotkaVolterraSystem(VectorizedSystem):
+    """The Lotka-Volterra system, advancing every run at once.
+
+    Each parameter is either a scalar, shared by every run, or an array of shape `(runs,)`, e.g. to sweep
+    `reproduction_rate` across runs.
+    """
+
+    HISTORY = 0
+
+    def __init__(
+        self,
+        population_size,
+        food_supply,
+        reproduction_rate,
+        consumption_rate,
+    ):
+        self.population_size = population_size
+        self.food_supply = food_supply
+        self.reproduction_rate = reproduction_rate
+        self.consumption_rate = consumption_rate
+
+    def initial_step(self, runs) -> Dict:
+        return {
+            "population_size": np.broadcast_to(self.population_size, runs).astype(float),
+            "food_supply": np.broadcast_to(self.food_supply, runs).astype(float),
+        }
+
+    def step(self, state, history) -> Dict:
+        population_size = np.maximum(state["population_size"] + self.reproduction_rate * state["food_supply"], 0)
+        food_supply = np.maximum(state["food_supply"] - self.consumption_rate * state["population_size"], 0)
+        return {"population_size": population_size, "food_supply": food_supply}
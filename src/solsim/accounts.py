@@ -0,0 +1,108 @@
+from collections.abc import Iterable, Sequence
+from typing import Any, Awaitable, Callable, Optional
+
+from solsim.instrument import active_profiler
+
+# Reads accounts from the cluster: given public keys, returns the slot at which they were read, if known, and a
+# value per key.
+AccountReader = Callable[[Sequence[Any]], Awaitable[tuple[Optional[int], Sequence[Any]]]]
+
+
+class AccountCache:
+    """Caches what a system reads from its cluster, such that re-reading an account that hasn't changed is free.
+
+    Entries are keyed by account, by what was read (e.g. `"account"` or `"balance"`) and by commitment level, and
+    remember the slot at which they were read. An account's entries are dropped once a transaction that writes to
+    it is sent, e.g. by `BaseSolanaSystem`, which does so for transactions sent through its workspace's programs.
+    Reads that were in flight while an account was invalidated aren't cached, and an entry is never replaced by a
+    read from an earlier slot.
+
+    `hits` and `misses` count the accounts read from the cache and from the cluster, respectively. They're also
+    recorded by the active profiler, if any, as `account_cache_hit` and `account_cache_miss` events.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, dict[tuple[str, str], tuple[int, Any]]] = {}
+        self._versions: dict[str, int] = {}
+        self._epoch = 0
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def get(self, kind: str, pubkey: Any, commitment: str) -> tuple[bool, Any]:
+        """Look an account up, without counting a hit or miss.
+
+        Returns:
+            Whether the account is cached, and if so, its cached value.
+        """
+        entry = self._entries.get(str(pubkey), {}).get((kind, commitment))
+        return (True, entry[1]) if entry is not None else (False, None)
+
+    def put(self, kind: str, pubkey: Any, commitment: str, value: Any, slot: Optional[int] = None) -> None:
+        """Cache a value read at a slot, unless a value read at a later slot is already cached."""
+        entries = self._entries.setdefault(str(pubkey), {})
+        slot = slot if slot is not None else -1
+        cached = entries.get((kind, commitment))
+        if cached is None or cached[0] <= slot:
+            entries[(kind, commitment)] = (slot, value)
+
+    async def fetch(self, kind: str, pubkeys: Sequence[Any], commitment: str, read: AccountReader) -> list[Any]:
+        """Read accounts from the cache, reading those that aren't cached from the cluster in one call to `read`.
+
+        Args:
+            kind: What is read, e.g. `"balance"`.
+            pubkeys: The public keys of the accounts to read.
+            commitment: The commitment level of the read.
+            read: Reads the accounts that aren't cached.
+
+        Returns:
+            A value per account.
+        """
+        keys = [str(pubkey) for pubkey in pubkeys]
+        values = [self._entries.get(key, {}).get((kind, commitment)) for key in keys]
+        missing = {key: pubkey for key, pubkey, value in zip(keys, pubkeys, values) if value is None}
+        hits = len(keys) - sum(value is None for value in values)
+        self.record(hits, len(missing))
+        fetched = {}
+        if missing:
+            epoch, versions = self._epoch, {key: self._versions.get(key, 0) for key in missing}
+            slot, results = await read(list(missing.values()))
+            fetched = dict(zip(missing, results))
+            for key, value in fetched.items():
+                # Accounts written, or a cache cleared, while the read was in flight may have been read stale.
+                if self._epoch == epoch and self._versions.get(key, 0) == versions[key]:
+                    self.put(kind, key, commitment, value, slot)
+        return [value[1] if value is not None else fetched[key] for key, value in zip(keys, values)]
+
+    def invalidate(self, pubkeys: Iterable[Any]) -> None:
+        """Drop accounts' entries, e.g. because a transaction wrote to them."""
+        for pubkey in pubkeys:
+            key = str(pubkey)
+            self._entries.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def clear(self) -> None:
+        self._entries = {}
+        self._versions = {}
+        self._epoch += 1
+
+    def record(self, hits: int, misses: int) -> None:
+        """Count accounts read from the cache, and from the cluster."""
+        self.hits += hits
+        self.misses += misses
+        profiler = active_profiler()
+        if profiler is not None:
+            if hits:
+                profiler.record("account_cache_hit", 0.0, hits)
+            if misses:
+                profiler.record("account_cache_miss", 0.0, misses)
+
+
+def writable_accounts(tx: Any) -> list[Any]:
+    """Return the public keys of the accounts that a transaction's instructions may write to, and its fee payer."""
+    pubkeys = [meta.pubkey for instruction in tx.instructions for meta in instruction.keys if meta.is_writable]
+    if getattr(tx, "fee_payer", None) is not None:
+        pubkeys.append(tx.fee_payer)
+    return pubkeys
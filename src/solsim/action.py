@@ -0,0 +1,63 @@
+import asyncio
+from collections.abc import Awaitable, Hashable, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from solsim.instrument import timer
+
+
+Action = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class ActionResult:
+    """The outcome of an agent's sequence of actions.
+
+    Attributes:
+        results: The result of each action that completed, in order.
+        error: The exception raised by the first action that failed, if any. Later actions were not attempted.
+    """
+
+    results: list[Any] = field(default_factory=list)
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def gather_actions(
+    actions: Mapping[Hashable, Sequence[Action]], concurrency: Optional[int] = None
+) -> dict[Hashable, ActionResult]:
+    """Run independent agents' actions concurrently, and wait for all of them.
+
+    Each agent's actions run in order, e.g. an escrow's `submit` before its `accept`, while different agents'
+    actions run concurrently, at most `concurrency` at a time.
+
+    Args:
+        actions: A mapping from each agent to its sequence of (zero-argument, `async`) actions.
+        concurrency: The maximum number of actions in flight at once. Unlimited if `None`.
+
+    Returns:
+        A mapping from each agent to the outcome of its actions.
+    """
+    semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+
+    async def run(agent_actions: Sequence[Action]) -> ActionResult:
+        outcome = ActionResult()
+        for action in agent_actions:
+            try:
+                if semaphore is None:
+                    with timer("action"):
+                        outcome.results.append(await action())
+                else:
+                    async with semaphore:
+                        with timer("action"):
+                            outcome.results.append(await action())
+            except Exception as exc:
+                outcome.error = exc
+                break
+        return outcome
+
+    outcomes = await asyncio.gather(*(run(agent_actions) for agent_actions in actions.values()))
+    return dict(zip(actions, outcomes))
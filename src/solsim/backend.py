@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+import glob
+import os
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from solsim.rpc import BatchClient
+
+
+class SolanaBackend(ABC):
+    """Where a Solana system's programs run, and the clients through which the system talks to them.
+
+    `BaseSolanaSystem` starts and stops its backend, snapshots and restores its state for checkpoints, and builds its
+    `client`, `rpc` client and `workspace` from it. `LocalnetValidator`, i.e. a local cluster, is the default
+    backend; `EmulatedBackend` runs programs' effects in-process instead.
+
+    Args:
+        workspace_dir: The Anchor workspace whose programs the backend runs.
+        cluster_uri: The cluster's RPC endpoint.
+    """
+
+    # Whether the backend runs in the simulation's process, such that parallel workers each run their own copy
+    # rather than a cluster apiece.
+    IN_PROCESS = False
+
+    def __init__(self, workspace_dir: str, cluster_uri: str) -> None:
+        self.workspace_dir = workspace_dir
+        self.cluster_uri = cluster_uri
+
+    @abstractmethod
+    def start(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stop(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def snapshot(self, path: str) -> None:
+        """Save the state of every account to a directory."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def restore(self, path: str) -> None:
+        """Restore the state of every account from a directory written by `snapshot`."""
+        raise NotImplementedError
+
+    # Backends that serve a cluster's JSON-RPC API at `cluster_uri` needn't override the following: systems then
+    # connect to the cluster as usual, and load the workspace's programs via `anchorpy`.
+
+    def client(self) -> Optional[Any]:
+        """Return a blocking client, à la `solana.rpc.api.Client`, if not one for `cluster_uri`."""
+        return None
+
+    def rpc(self) -> Optional["BatchClient"]:
+        """Return an `async` client that batches requests, if not one for `cluster_uri`."""
+        return None
+
+    def workspace(self) -> Optional[dict[str, Any]]:
+        """Return the workspace's programs, by name, if not those that `anchorpy.create_workspace` loads."""
+        return None
+
+    def source_files(self) -> list[str]:
+        """Return the files that determine what the programs do, e.g. for `ResultCache` to fingerprint."""
+        return glob.glob(os.path.join(self.workspace_dir, "target", "deploy", "*.so"))
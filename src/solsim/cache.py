@@ -0,0 +1,176 @@
+from collections.abc import Iterable
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from typing import TYPE_CHECKING, Any, Union, cast
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather
+
+from solsim.backend import SolanaBackend
+from solsim.system import BaseSystem, VectorizedSystem
+
+if TYPE_CHECKING:
+    from solsim.solana_system import BaseSolanaSystem
+
+
+class ResultCache:
+    """An on-disk cache of simulation results, one file per run, evicting the least recently used runs.
+
+    Entries are keyed by the system's class and constructor arguments, the watchlist, the number of steps per run,
+    the simulation's seed and a fingerprint of the system's code: the source of its class hierarchy and of solsim's
+    simulation loop, plus, for Solana systems, their workspace's program binaries. Since each run is seeded from the
+    seed and its ID alone, a simulation of more runs than are cached computes only the missing ones.
+
+    Cached runs are assumed to depend only on their seed, so systems that carry state from one run to the next
+    shouldn't be cached.
+
+    Args:
+        path: The cache directory.
+        max_bytes: The most disk space that cached runs may take up, beyond which the least recently read or written
+            are evicted.
+    """
+
+    EXTENSION = "feather"
+
+    def __init__(self, path: str, max_bytes: int = 1 << 30) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+    def key(
+        self,
+        system: Union[BaseSystem, "BaseSolanaSystem", VectorizedSystem],
+        watchlist: Iterable[str],
+        steps_per_run: int,
+        seed: int,
+    ) -> str:
+        """Hash everything that determines a run's results, bar its ID."""
+        cls = type(system)
+        payload = {
+            "system": f"{cls.__module__}.{cls.__qualname__}",
+            "params": _digest(_params(system)),
+            "watchlist": sorted(watchlist),
+            "steps_per_run": steps_per_run,
+            "seed": str(seed),
+            "code": fingerprint(system),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:32]
+
+    def get(self, key: str, runs: Iterable[int]) -> dict[int, pd.DataFrame]:
+        """Read whichever of the given runs are cached.
+
+        Args:
+            key: The simulation's key.
+            runs: The IDs of the runs to read.
+
+        Returns:
+            The results of each cached run, by run ID.
+        """
+        cached = {}
+        for run in runs:
+            path = self._run_path(key, run)
+            try:
+                cached[run] = pyarrow.feather.read_table(path).to_pandas()
+            except FileNotFoundError:
+                continue
+            os.utime(path)  # Mark the run as recently used.
+        return cached
+
+    def put(self, key: str, results: pd.DataFrame) -> None:
+        """Write each run in a batch of results, then evict least recently used runs if the cache is too big.
+
+        Args:
+            key: The simulation's key.
+            results: The results of one or more runs.
+        """
+        os.makedirs(os.path.join(self.path, key), exist_ok=True)
+        for run, run_results in results.groupby("run", sort=False):
+            path = self._run_path(key, int(run))
+            tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}")
+            pyarrow.feather.write_feather(pa.Table.from_pandas(run_results, preserve_index=False), tmp_path)
+            os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used runs until the cache fits in `max_bytes`."""
+        entries = []
+        for path in glob.glob(os.path.join(self.path, "*", f"run-*.{self.EXTENSION}")):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_bytes:
+                break
+            os.remove(path)
+            size -= entry_size
+
+    @property
+    def size(self) -> int:
+        """The disk space, in bytes, that cached runs take up."""
+        return sum(os.path.getsize(path) for path in glob.glob(os.path.join(self.path, "*", f"run-*.{self.EXTENSION}")))
+
+    def clear(self) -> None:
+        for path in glob.glob(os.path.join(self.path, "*", f"run-*.{self.EXTENSION}")):
+            os.remove(path)
+
+    def _run_path(self, key: str, run: int) -> str:
+        return os.path.join(self.path, key, f"run-{run:08d}.{self.EXTENSION}")
+
+
+def fingerprint(system: Union[BaseSystem, "BaseSolanaSystem", VectorizedSystem]) -> str:
+    """Hash the code that determines a system's results.
+
+    That's the source files defining its class and each base class, solsim's simulation loop and, for a Solana
+    system, its backend's `source_files`: the program binaries in its workspace's `target/deploy` directory, or the
+    source of emulated instructions.
+    """
+    from solsim import simulation
+
+    paths = {cast(str, inspect.getsourcefile(simulation))}
+    for cls in type(system).__mro__:
+        try:
+            source = inspect.getsourcefile(cls)
+        except TypeError:
+            continue  # Built-in classes, e.g. `object`, have no source.
+        if source is not None:
+            paths.add(source)
+    if system.uses_solana:
+        paths.update(cast("BaseSolanaSystem", system).validator.source_files())
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _params(system: Union[BaseSystem, "BaseSolanaSystem", VectorizedSystem]) -> Any:
+    # Bind constructor arguments to their parameters, such that e.g. `System(1)` and `System(drift=1)` share a key.
+    try:
+        bound = inspect.signature(type(system)).bind(*system._init_args, **system._init_kwargs)
+    except (TypeError, ValueError):
+        args, kwargs = system._init_args, system._init_kwargs
+        return [_param(arg) for arg in args], sorted((name, _param(value)) for name, value in kwargs.items())
+    bound.apply_defaults()
+    return sorted((name, _param(value)) for name, value in bound.arguments.items())
+
+
+def _param(value: Any) -> Any:
+    # A backend holds live state, e.g. a fresh wallet, so is keyed by its type; its code is part of the fingerprint.
+    if isinstance(value, SolanaBackend):
+        cls = type(value)
+        return f"{cls.__module__}.{cls.__qualname__}"
+    return value
+
+
+def _digest(value: Any) -> str:
+    try:
+        data = pickle.dumps(value, protocol=4)
+    except Exception:
+        # Unpicklable arguments, e.g. clients, are keyed by their representation.
+        data = repr(value).encode()
+    return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Any, Optional, Union
+
+from solsim.history import History
+from solsim.results import ResultsStore
+from solsim.stopping import Convergence
+from solsim.summary import SummaryStore
+from solsim.type import StateType
+
+
+@dataclass
+class Checkpoint:
+    """Everything needed to resume a simulation from the end of a given step.
+
+    Attributes:
+        runs: The runs that the simulation (or one of its shards) executes.
+        steps_per_run: The number of steps per run.
+        run: The run in progress.
+        step: The last completed step of `run`.
+        state: The state after `step`.
+        history: The retained history of states after `step`.
+        rng: The states of Python's and NumPy's global random number generators, and the system's `rng`, after `step`.
+        results: Results not yet written to the simulation's sink, if any, or the summary so far.
+        convergence: The simulation's convergence estimates, as of `step`, if it stops runs once they converge.
+        system: What the system's `snapshot` hook returned.
+        system_dir: The directory into which the system's `snapshot` hook wrote, e.g. its validator's ledger.
+    """
+
+    runs: list[int]
+    steps_per_run: int
+    run: int
+    step: int
+    state: StateType
+    history: History
+    rng: tuple[Any, Any, Any]
+    results: Union[ResultsStore, SummaryStore]
+    convergence: Optional[Convergence] = None
+    system: Any = None
+    system_dir: Optional[str] = None
+
+    def save(self, path: str) -> None:
+        """Write the checkpoint to a file, atomically replacing the previous one and its system directory.
+
+        Args:
+            path: The checkpoint file.
+        """
+        previous_system_dir = Checkpoint._read_system_dir(path)
+        _write_atomically(path, pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+        _write_atomically(Checkpoint._system_dir_path(path), (self.system_dir or "").encode())
+        if previous_system_dir not in (None, self.system_dir):
+            shutil.rmtree(previous_system_dir, ignore_errors=True)  # type: ignore
+
+    @staticmethod
+    def load(path: str) -> Optional["Checkpoint"]:
+        """Read a checkpoint from a file.
+
+        Args:
+            path: The checkpoint file.
+
+        Returns:
+            The checkpoint, or `None` if there is none.
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            checkpoint: Checkpoint = pickle.load(f)
+        return checkpoint
+
+    @staticmethod
+    def remove(path: str) -> None:
+        """Delete a checkpoint file, if any, and its system directory."""
+        system_dir = Checkpoint._read_system_dir(path)
+        if system_dir is not None:
+            shutil.rmtree(system_dir, ignore_errors=True)
+        for file in (path, Checkpoint._system_dir_path(path)):
+            if os.path.exists(file):
+                os.remove(file)
+
+    @staticmethod
+    def system_dir_for(path: str) -> str:
+        """Create a fresh directory, next to a checkpoint file, into which a system can snapshot itself."""
+        return tempfile.mkdtemp(prefix=f"{os.path.basename(path)}-system-", dir=os.path.dirname(path))
+
+    @staticmethod
+    def _system_dir_path(path: str) -> str:
+        # The system directory is also recorded next to the checkpoint, such that replacing or removing a
+        # checkpoint needn't unpickle it, results and all.
+        return f"{path}.system_dir"
+
+    @staticmethod
+    def _read_system_dir(path: str) -> Optional[str]:
+        if not os.path.exists(Checkpoint._system_dir_path(path)):
+            return None
+        with open(Checkpoint._system_dir_path(path)) as f:
+            return f.read() or None
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -0,0 +1,403 @@
+from collections import deque
+import copy
+from dataclasses import dataclass
+import hmac
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pickle
+import secrets
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING, Any, Optional, Union, cast
+import urllib.error
+import urllib.request
+
+from solsim.instrument import Profiler
+from solsim.simulation import Simulation, _run_shard
+from solsim.summary import SummaryStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from solsim.solana_system import BaseSolanaSystem
+
+
+# Bodies are pickled, so only workers that know the coordinator's authkey may talk to it: anyone who can unpickle
+# on a host can run code on it. Run coordinators and workers on trusted networks only.
+AUTHKEY_HEADER = "X-Solsim-Authkey"
+
+# What workers see of a coordinator that has stopped: a refused connection, or one reset mid-request as it shuts down.
+COORDINATOR_GONE = (urllib.error.URLError, ConnectionError)
+
+
+@dataclass
+class Task:
+    """One run of a distributed simulation.
+
+    Attributes:
+        id: The task's ID, unique across attempts.
+        run: The ID of the run, from which, with the simulation's seed, the run is seeded.
+        attempt: How many times the run has been leased, including this time.
+        deadline: When the current lease expires, unless the worker renews it, per `time.monotonic`.
+    """
+
+    id: int
+    run: int
+    attempt: int = 0
+    deadline: float = 0.0
+
+
+class Coordinator:
+    """Serves the runs of a simulation, over HTTP, to workers on any host, and gathers their results.
+
+    Each run is a task. Workers lease tasks one at a time and report each run's results as soon as it completes.
+    A worker renews its lease while it runs a task; should it crash, or its host become unreachable, the lease
+    expires and the run is reassigned. Runs that fail, or whose leases expire, more than `max_attempts` times fail
+    the simulation.
+
+    Since each run is seeded from the simulation's seed and its ID alone, results match those of a local
+    simulation of the same runs, provided that the system carries no state from one run to the next.
+
+    Args:
+        simulation: The simulation to distribute. Its sink, if any, receives each run's results as they arrive.
+        runs: The number of runs, or the IDs of the runs to execute.
+        steps_per_run: The number of steps per run.
+        host: The interface on which to listen.
+        port: The port on which to listen; `0` picks a free one (see `url`).
+        authkey: A shared secret that workers must present. A random one is generated if `None`.
+        lease_seconds: How long a worker may go without renewing its lease before its task is reassigned.
+        max_attempts: How many times to attempt each run.
+    """
+
+    def __init__(
+        self,
+        simulation: Simulation,
+        runs: Union[int, list[int], range],
+        steps_per_run: int,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        authkey: Optional[str] = None,
+        lease_seconds: float = 30.0,
+        max_attempts: int = 3,
+    ) -> None:
+        if simulation._checkpoint_dir is not None or simulation._convergence is not None or simulation._cache is not None:
+            raise Exception("Distributed simulations retry lost runs instead of checkpointing, and can't converge or cache.")
+        self.simulation = simulation
+        self.runs = list(range(runs) if isinstance(runs, int) else runs)
+        self.steps_per_run = steps_per_run
+        self.authkey = authkey or secrets.token_hex(16)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._pending: deque[Task] = deque(Task(id=i, run=run) for i, run in enumerate(self.runs))
+        self._leased: dict[int, Task] = {}
+        self._next_id = len(self.runs)
+        self._results: dict[int, Union["pd.DataFrame", SummaryStore]] = {}
+        self._error: Optional[str] = None
+        self._job = self._build_job()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        """Start serving tasks, in a background thread."""
+        if self.simulation._sink is not None:
+            # As in `Simulation.run`, parts written by a previous simulation to the same sink are deleted.
+            self.simulation._sink.reset()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def wait(self, timeout: Optional[float] = None) -> "pd.DataFrame":
+        """Wait for every run to complete.
+
+        Args:
+            timeout: The most seconds to wait, or `None` to wait indefinitely.
+
+        Returns:
+            The simulation's results, as `Simulation.run` would return them.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while not self._done.wait(timeout=min(self.lease_seconds, 1.0)):
+            # Leases also expire when workers ask for tasks, but all of them may have died.
+            with self._lock:
+                self._expire_leases()
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"{len(self.runs) - len(self._results)} run(s) didn't complete within {timeout}s.")
+        if self._error is not None:
+            raise Exception(self._error)
+        return self._collect()
+
+    def run(self, timeout: Optional[float] = None) -> "pd.DataFrame":
+        """Serve tasks until every run completes, then stop.
+
+        Args:
+            timeout: The most seconds to wait, or `None` to wait indefinitely.
+
+        Returns:
+            The simulation's results, as `Simulation.run` would return them.
+        """
+        self.start()
+        try:
+            return self.wait(timeout)
+        finally:
+            self.stop()
+
+    def __enter__(self) -> "Coordinator":
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def _build_job(self) -> bytes:
+        # Workers compute; the coordinator alone writes results to the sink.
+        simulation = copy.copy(self.simulation)
+        simulation._sink = None
+        workspace_dir = None
+        system = simulation._system
+        if system.uses_solana and cast("BaseSolanaSystem", system).uses_localnet:
+            workspace_dir = cast("BaseSolanaSystem", system).validator.workspace_dir
+        # The simulation is pickled on its own, since a worker must start its cluster before unpickling a Solana system.
+        job = {"simulation": pickle.dumps(simulation), "steps_per_run": self.steps_per_run, "workspace_dir": workspace_dir}
+        return pickle.dumps(job)
+
+    def _lease(self) -> Optional[Task]:
+        with self._lock:
+            self._expire_leases()
+            if self._done.is_set() or not self._pending:
+                return None
+            task = self._pending.popleft()
+            task.attempt += 1
+            task.deadline = time.monotonic() + self.lease_seconds
+            self._leased[task.id] = task
+            return task
+
+    def _renew(self, task_id: int) -> bool:
+        with self._lock:
+            task = self._leased.get(task_id)
+            if task is None:
+                return False
+            task.deadline = time.monotonic() + self.lease_seconds
+            return True
+
+    def _complete(self, task_id: int, results: Union["pd.DataFrame", SummaryStore], profiler: Optional[Profiler]) -> None:
+        with self._lock:
+            task = self._leased.pop(task_id, None)
+            if task is None or task.run in self._results:
+                return  # The lease expired and the run was reassigned, or a duplicate completed first.
+            self._results[task.run] = results
+            if self.simulation._sink is not None and not isinstance(results, SummaryStore):
+                self.simulation._sink.write(results)
+            if self.simulation._profiler is not None and profiler is not None:
+                self.simulation._profiler.merge(profiler)
+            if len(self._results) == len(self.runs):
+                self._done.set()
+
+    def _fail(self, task_id: int, error: str) -> None:
+        with self._lock:
+            task = self._leased.pop(task_id, None)
+            if task is not None:
+                self._retry(task, error)
+
+    def _expire_leases(self) -> None:
+        now = time.monotonic()
+        for task in [task for task in self._leased.values() if task.deadline < now]:
+            del self._leased[task.id]
+            self._retry(task, f"The lease on run {task.run} expired: its worker may have crashed.")
+
+    def _retry(self, task: Task, error: str) -> None:
+        if task.attempt >= self.max_attempts:
+            self._error = f"Run {task.run} failed {task.attempt} time(s). Last error: {error}"
+            self._done.set()
+            return
+        # A fresh ID, such that a late report from the previous attempt is ignored.
+        self._pending.append(Task(id=self._next_id, run=task.run, attempt=task.attempt))
+        self._next_id += 1
+
+    def _collect(self) -> "pd.DataFrame":
+        import pandas as pd
+
+        results = [self._results[run] for run in self.runs]
+        if self.simulation._summarize:
+            summary, *others = cast(list[SummaryStore], results)
+            for other in others:
+                summary.merge(other)
+            return summary.to_frame()
+        if self.simulation._sink is not None:
+            return self.simulation._sink.read()
+        return pd.concat(cast(list["pd.DataFrame"], results), ignore_index=True)
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if not self._authorized():
+                    return
+                if self.path == "/job":
+                    self._respond(200, coordinator._job)
+                else:
+                    self._respond(404)
+
+            def do_POST(self) -> None:
+                if not self._authorized():
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                route, _, task_id = self.path.strip("/").partition("/")
+                if route == "lease":
+                    task = coordinator._lease()
+                    if task is not None:
+                        self._respond(200, pickle.dumps(task))
+                    else:
+                        self._respond(410 if coordinator._done.is_set() else 204)
+                elif route == "heartbeat":
+                    self._respond(200 if coordinator._renew(int(task_id)) else 410)
+                elif route == "complete":
+                    coordinator._complete(int(task_id), *pickle.loads(body))
+                    self._respond(200)
+                elif route == "fail":
+                    coordinator._fail(int(task_id), body.decode())
+                    self._respond(200)
+                else:
+                    self._respond(404)
+
+            def _authorized(self) -> bool:
+                if hmac.compare_digest(self.headers.get(AUTHKEY_HEADER, ""), coordinator.authkey):
+                    return True
+                self._respond(403)
+                return False
+
+            def _respond(self, status: int, body: bytes = b"") -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+class Worker:
+    """Pulls runs from a `Coordinator`, executes them, and reports their results.
+
+    Workers must be able to import the simulated system's code, e.g. by running from the same checkout as the
+    coordinator.
+
+    Args:
+        url: The coordinator's URL.
+        authkey: The coordinator's authkey.
+        validator_slot: For Solana systems, which slot of a `ValidatorPool` the worker's localnet cluster occupies,
+            such that workers on the same host use distinct ports and ledgers.
+        base_port: The first port of the `ValidatorPool`'s first slot.
+        poll_seconds: How long to wait before asking again when every remaining task is leased.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        authkey: str,
+        validator_slot: int = 0,
+        base_port: int = 20000,
+        poll_seconds: float = 0.5,
+    ) -> None:
+        self.url = url.rstrip("/")
+        self.authkey = authkey
+        self.validator_slot = validator_slot
+        self.base_port = base_port
+        self.poll_seconds = poll_seconds
+
+    def run(self) -> int:
+        """Execute tasks until the coordinator has none left, or stops answering.
+
+        Returns:
+            The number of runs this worker completed.
+        """
+        try:
+            status, body = self._request("GET", "/job")
+        except COORDINATOR_GONE:
+            return 0
+        job = pickle.loads(body)
+        if job["workspace_dir"] is not None:
+            from solsim.validator import ValidatorPool, assign_worker_validator
+
+            # Solana systems connect to the worker process's cluster as they're unpickled.
+            pool = ValidatorPool(job["workspace_dir"], self.validator_slot + 1, self.base_port)
+            assign_worker_validator(pool.validator(self.validator_slot))
+        completed = 0
+        try:
+            while True:
+                status, body = self._request("POST", "/lease")
+                if status == 410:
+                    return completed
+                if status == 204:
+                    time.sleep(self.poll_seconds)
+                    continue
+                task: Task = pickle.loads(body)
+                if self._execute(job["simulation"], task, job["steps_per_run"]):
+                    completed += 1
+        except COORDINATOR_GONE:
+            return completed  # The coordinator finished, and stopped.
+
+    def _execute(self, pickled_simulation: bytes, task: Task, steps_per_run: int) -> bool:
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(task, stop_heartbeat), daemon=True)
+        heartbeat.start()
+        try:
+            # Each run cleans up its system, e.g. closing a Solana system's workspace, so each task builds its own.
+            simulation: Simulation = pickle.loads(pickled_simulation)
+            results = _run_shard(simulation, [task.run], steps_per_run, position=0)
+        except Exception:
+            self._request("POST", f"/fail/{task.id}", traceback.format_exc().encode())
+            return False
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        self._request("POST", f"/complete/{task.id}", pickle.dumps(results))
+        return True
+
+    def _heartbeat(self, task: Task, stop: threading.Event) -> None:
+        while not stop.wait(timeout=1.0):
+            try:
+                self._request("POST", f"/heartbeat/{task.id}")
+            except COORDINATOR_GONE:
+                pass
+
+    def _request(self, method: str, path: str, body: bytes = b"") -> tuple[int, bytes]:
+        request = urllib.request.Request(
+            self.url + path, data=body if method == "POST" else None, method=method, headers={AUTHKEY_HEADER: self.authkey}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 403:
+                raise Exception("The coordinator rejected this worker's authkey.")
+            if e.code == 410:
+                return e.code, b""
+            raise
+
+
+def main(url: str, authkey: str, validator_slot: int = 0, base_port: int = 20000) -> None:
+    """Run a worker against the coordinator at URL."""
+    completed = Worker(url, authkey, validator_slot=validator_slot, base_port=base_port).run()
+    print(f"Completed {completed} run(s).")
+
+
+if __name__ == "__main__":
+    import typer
+
+    typer.run(main)
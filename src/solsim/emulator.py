@@ -0,0 +1,422 @@
+import asyncio
+import base64
+from collections.abc import Callable, Mapping, Sequence
+import copy
+from dataclasses import dataclass, field
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from typing import Any, NamedTuple, Optional
+
+import httpx
+from solana.keypair import Keypair
+from solana.publickey import PublicKey
+
+from solsim.backend import SolanaBackend
+from solsim.rpc import BatchClient
+
+# An emulated instruction: applies a program instruction's effects to the emulator, given the instruction's
+# arguments, and the `accounts` and `signers` of its context, e.g.
+# `def deposit(emulator, amount, *, accounts, signers): emulator.transfer(accounts["from"], accounts["vault"], amount)`.
+# It raises to fail the transaction, whose effects are then rolled back.
+Instruction = Callable[..., Any]
+
+
+@dataclass
+class EmulatedAccount:
+    """An account in the emulator.
+
+    Attributes:
+        lamports: The account's balance, in lamports.
+        owner: The program that owns the account.
+        data: Program state, e.g. an escrow's terms.
+        mint: For token accounts, the mint of their tokens.
+        token_owner: For token accounts, the wallet that owns their tokens.
+        amount: For token accounts, their balance, in the mint's smallest unit.
+        decimals: For mints, the number of decimals of their tokens.
+    """
+
+    lamports: int = 0
+    owner: Optional[str] = None
+    data: dict[str, Any] = field(default_factory=dict)
+    mint: Optional[str] = None
+    token_owner: Optional[str] = None
+    amount: int = 0
+    decimals: Optional[int] = None
+
+
+class Emulator:
+    """An in-process stand-in for a Solana cluster: accounts, SPL token balances, and programs' effects as Python.
+
+    It answers the JSON-RPC reads that solsim makes (`getTokenAccountBalance`, `getMultipleAccounts`,
+    `getAccountInfo`, `getBalance` and `getSlot`), and executes transactions by calling emulated instructions, each
+    in its own slot. Instructions change state via the methods below; should one raise, its changes are undone.
+
+    Args:
+        latency: The number of seconds each transaction takes to confirm, e.g. to exercise concurrency.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.reset()
+
+    def reset(self) -> None:
+        self.slot = 0
+        self.accounts: dict[str, EmulatedAccount] = {}
+        self._journal: Optional[dict[str, Optional[EmulatedAccount]]] = None
+
+    def exists(self, address: Any) -> bool:
+        return str(address) in self.accounts
+
+    def account(self, address: Any) -> EmulatedAccount:
+        """Return an account, to read. Use `write` to change it."""
+        try:
+            return self.accounts[str(address)]
+        except KeyError:
+            raise Exception(f"Account {address} not found.")
+
+    def write(self, address: Any) -> EmulatedAccount:
+        """Return an account, to change, recording its state beforehand should the transaction fail."""
+        account = self.account(address)
+        self._record(str(address))
+        return account
+
+    def create_account(
+        self, address: Any, owner: Any = None, lamports: int = 0, data: Optional[dict[str, Any]] = None
+    ) -> EmulatedAccount:
+        if self.exists(address):
+            raise Exception(f"Account {address} already in use.")
+        self._record(str(address))
+        account = EmulatedAccount(lamports=lamports, owner=str(owner) if owner is not None else None, data=data or {})
+        self.accounts[str(address)] = account
+        return account
+
+    def close_account(self, address: Any) -> None:
+        self.account(address)
+        self._record(str(address))
+        del self.accounts[str(address)]
+
+    def create_mint(self, address: Any, decimals: int = 0) -> EmulatedAccount:
+        account = self.create_account(address)
+        account.decimals = decimals
+        return account
+
+    def create_token_account(self, address: Any, mint: Any, owner: Any) -> EmulatedAccount:
+        self.account(mint)
+        account = self.create_account(address)
+        account.mint, account.token_owner = str(mint), str(owner)
+        return account
+
+    def token_balance(self, address: Any) -> int:
+        account = self.account(address)
+        if account.mint is None:
+            raise Exception(f"Account {address} is not a token account.")
+        return account.amount
+
+    def mint_to(self, address: Any, amount: int) -> None:
+        self.token_balance(address)
+        self.write(address).amount += amount
+
+    def set_token_balance(self, address: Any, amount: int) -> None:
+        self.token_balance(address)
+        self.write(address).amount = amount
+
+    def transfer(self, source: Any, destination: Any, amount: int) -> None:
+        """Transfer tokens between accounts of the same mint."""
+        if self.token_balance(source) < amount:
+            raise Exception(f"Insufficient funds: {source} holds {self.token_balance(source)}, not {amount}.")
+        if self.account(source).mint != self.account(destination).mint:
+            raise Exception(f"Accounts {source} and {destination} hold different mints.")
+        self.write(source).amount -= amount
+        self.write(destination).amount += amount
+
+    async def execute(self, tx: "EmulatedTransaction") -> str:
+        """Execute a transaction's instructions in order, all or none of them, in the next slot.
+
+        Returns:
+            The transaction's (emulated) signature.
+        """
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._journal = {}
+        try:
+            for instruction in tx.instructions:
+                instruction.handler(self, *instruction.args, accounts=instruction.accounts, signers=instruction.signers)
+        except Exception:
+            for address, account in self._journal.items():
+                if account is None:
+                    self.accounts.pop(address, None)
+                else:
+                    self.accounts[address] = account
+            raise
+        finally:
+            self._journal = None
+        self.slot += 1
+        return f"emulated-{self.slot}"
+
+    def request(self, method: str, params: Sequence[Any]) -> Any:
+        """Answer a JSON-RPC request.
+
+        Returns:
+            The request's result, as a cluster would return it.
+        """
+        context = {"slot": self.slot}
+        if method == "getSlot":
+            return self.slot
+        if method == "getTokenAccountBalance":
+            amount = self.token_balance(params[0])
+            decimals = self.account(self.account(params[0]).mint).decimals or 0
+            ui_amount = amount / 10 ** decimals
+            value: Any = {"amount": str(amount), "decimals": decimals, "uiAmount": ui_amount}
+            return {"context": context, "value": {**value, "uiAmountString": str(ui_amount)}}
+        if method == "getBalance":
+            account = self.accounts.get(str(params[0]))
+            return {"context": context, "value": account.lamports if account is not None else 0}
+        if method == "getAccountInfo":
+            return {"context": context, "value": self._account_info(str(params[0]))}
+        if method == "getMultipleAccounts":
+            return {"context": context, "value": [self._account_info(str(address)) for address in params[0]]}
+        raise Exception(f"The emulator doesn't support {method} requests.")
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer a batch of JSON-RPC requests, e.g. as an `httpx.MockTransport` handler."""
+        responses = []
+        for r in json.loads(request.content):
+            try:
+                responses.append({"jsonrpc": "2.0", "id": r["id"], "result": self.request(r["method"], r["params"])})
+            except Exception as e:
+                responses.append({"jsonrpc": "2.0", "id": r["id"], "error": {"code": -32602, "message": str(e)}})
+        return httpx.Response(200, json=responses)
+
+    def _account_info(self, address: str) -> Optional[dict[str, Any]]:
+        account = self.accounts.get(address)
+        if account is None:
+            return None
+        data = json.dumps(account.data).encode() if account.data else b""
+        return {
+            "lamports": account.lamports,
+            "owner": account.owner,
+            "data": [base64.b64encode(data).decode(), "base64"],
+            "executable": False,
+            "rentEpoch": 0,
+        }
+
+    def _record(self, address: str) -> None:
+        if self._journal is not None and address not in self._journal:
+            account = self.accounts.get(address)
+            self._journal[address] = copy.deepcopy(account) if account is not None else None
+
+
+class _AccountMeta(NamedTuple):
+    pubkey: Any
+    is_writable: bool
+
+
+@dataclass
+class EmulatedInstruction:
+    """A call to an emulated instruction, with the context that `anchorpy` would pass it."""
+
+    handler: Instruction
+    args: tuple[Any, ...]
+    accounts: dict[str, Any]
+    signers: list[Any]
+
+    @property
+    def keys(self) -> list[_AccountMeta]:
+        # Emulated instructions don't declare which accounts they write, so all of them may be written.
+        return [_AccountMeta(pubkey, True) for pubkey in self.accounts.values()]
+
+
+@dataclass
+class EmulatedTransaction:
+    instructions: list[EmulatedInstruction]
+    fee_payer: Any = None
+
+
+class EmulatedProvider:
+    """Sends emulated transactions, in place of an `anchorpy.Provider`."""
+
+    def __init__(self, emulator: Emulator, wallet: Keypair) -> None:
+        self.emulator = emulator
+        self.wallet = wallet
+        self.closed = False
+
+    async def send(self, tx: EmulatedTransaction, signers: Any = None, opts: Any = None) -> str:
+        self._raise_if_closed()
+        return await self.emulator.execute(tx)
+
+    async def send_all(self, reqs: Sequence[Any], opts: Any = None) -> list[str]:
+        self._raise_if_closed()
+        return [await self.emulator.execute(req.tx) for req in reqs]
+
+    def _raise_if_closed(self) -> None:
+        # Like an `anchorpy.Provider` whose connection was closed, e.g. by `close_workspace`.
+        if self.closed:
+            raise Exception("The provider's connection is closed.")
+
+
+class EmulatedProgram:
+    """Stands in for an `anchorpy.Program`, whose `rpc` namespace calls emulated instructions instead.
+
+    Args:
+        name: The program's name.
+        program_id: The program's address.
+        instructions: The program's emulated instructions, by name.
+        provider: Sends the program's transactions.
+    """
+
+    def __init__(
+        self, name: str, program_id: PublicKey, instructions: Mapping[str, Instruction], provider: EmulatedProvider
+    ) -> None:
+        self.name = name
+        self.program_id = program_id
+        self.instructions = dict(instructions)
+        self.provider = provider
+        self.rpc = _RPCNamespace(self)
+
+    async def close(self) -> None:
+        self.provider.closed = True
+
+
+class _RPCNamespace:
+    def __init__(self, program: EmulatedProgram) -> None:
+        self._program = program
+
+    def __getitem__(self, name: str) -> Callable[..., Any]:
+        program = self._program
+        if name not in program.instructions:
+            raise Exception(f"{program.name} has no emulated instruction {name}: {sorted(program.instructions)}")
+
+        async def call(*args: Any, ctx: Any = None) -> str:
+            instruction = EmulatedInstruction(
+                program.instructions[name],
+                args,
+                dict(ctx.accounts) if ctx is not None else {},
+                list(ctx.signers) if ctx is not None else [],
+            )
+            tx = EmulatedTransaction([instruction], fee_payer=program.provider.wallet.public_key)
+            return await program.provider.send(tx)
+
+        return call
+
+
+class EmulatedBackend(SolanaBackend):
+    """Runs a system's programs as emulated instructions, in-process, rather than on a localnet cluster.
+
+    Systems then run at Python speed, without a cluster to start or transactions to confirm, e.g. to iterate on,
+    profile or sweep their logic, while the cluster remains the reference for what programs actually do.
+
+    Programs' addresses are read from the workspace's IDLs, in `target/idl`, if any, or else derived from their
+    names. A wallet, the `provider.wallet` of each program, is funded with `lamports`.
+
+    Args:
+        workspace_dir: The Anchor workspace whose programs are emulated.
+        programs: The emulated instructions of each program, by program name, then instruction name.
+        latency: The number of seconds each transaction takes to confirm.
+        lamports: The wallet's initial balance.
+    """
+
+    IN_PROCESS = True
+
+    def __init__(
+        self,
+        workspace_dir: str,
+        programs: Mapping[str, Mapping[str, Instruction]],
+        latency: float = 0.0,
+        lamports: int = 10 ** 12,
+    ) -> None:
+        super().__init__(workspace_dir, cluster_uri="http://emulator")
+        self.programs = {name: dict(instructions) for name, instructions in programs.items()}
+        self.lamports = lamports
+        self.emulator = Emulator(latency)
+        self.wallet = Keypair()
+        self.running = False
+
+    def start(self) -> None:
+        if not self.running:
+            self.emulator.create_account(self.wallet.public_key, lamports=self.lamports)
+            self.running = True
+
+    def stop(self) -> None:
+        # Like a cluster restarted from genesis, the emulator starts afresh.
+        self.emulator.reset()
+        self.running = False
+
+    def snapshot(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "emulator.pkl"), "wb") as f:
+            pickle.dump((self.emulator.slot, self.emulator.accounts), f)
+
+    def restore(self, path: str) -> None:
+        with open(os.path.join(path, "emulator.pkl"), "rb") as f:
+            self.emulator.slot, self.emulator.accounts = pickle.load(f)
+        self.running = True
+
+    def client(self) -> "EmulatedClient":
+        return EmulatedClient(self.emulator)
+
+    def rpc(self) -> BatchClient:
+        return BatchClient(self.cluster_uri, session=httpx.AsyncClient(transport=httpx.MockTransport(self.emulator.handle)))
+
+    def workspace(self) -> dict[str, Any]:
+        program_ids = self._program_ids()
+        return {
+            name: EmulatedProgram(
+                name,
+                program_ids.get(name) or _derive_program_id(name),
+                instructions,
+                EmulatedProvider(self.emulator, self.wallet),
+            )
+            for name, instructions in self.programs.items()
+        }
+
+    def source_files(self) -> list[str]:
+        paths = set()
+        for instructions in self.programs.values():
+            for instruction in instructions.values():
+                try:
+                    source = inspect.getsourcefile(instruction)
+                except TypeError:
+                    continue
+                if source is not None:
+                    paths.add(source)
+        return sorted(paths)
+
+    def _program_ids(self) -> dict[str, PublicKey]:
+        program_ids = {}
+        for path in glob.glob(os.path.join(self.workspace_dir, "target", "idl", "*.json")):
+            with open(path) as f:
+                idl = json.load(f)
+            address = idl.get("metadata", {}).get("address")
+            if address is not None:
+                program_ids[idl["name"]] = PublicKey(address)
+        return program_ids
+
+
+class EmulatedClient:
+    """Answers the blocking reads of a `solana.rpc.api.Client` from an emulator."""
+
+    def __init__(self, emulator: Emulator) -> None:
+        self.emulator = emulator
+
+    def get_token_account_balance(self, pubkey: Any, commitment: Any = None) -> dict[str, Any]:
+        return self._request("getTokenAccountBalance", [str(pubkey)])
+
+    def get_account_info(self, pubkey: Any, commitment: Any = None, encoding: str = "base64", **kwargs: Any) -> Any:
+        return self._request("getAccountInfo", [str(pubkey)])
+
+    def get_balance(self, pubkey: Any, commitment: Any = None) -> dict[str, Any]:
+        return self._request("getBalance", [str(pubkey)])
+
+    def get_slot(self, commitment: Any = None) -> dict[str, Any]:
+        return self._request("getSlot", [])
+
+    def _request(self, method: str, params: list[Any]) -> dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": 0, "result": self.emulator.request(method, params)}
+
+
+def _derive_program_id(name: str) -> PublicKey:
+    return PublicKey(hashlib.sha256(f"solsim-emulated-program:{name}".encode()).digest())
@@ -0,0 +1,194 @@
+from collections.abc import Sequence
+import math
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from solsim.results import ResultsStore
+from solsim.sink import open_parts
+
+
+INDEX_COLS = ResultsStore.INDEX_COLS
+
+
+def open_results(path: str, format: str = "feather") -> ds.Dataset:
+    """Lazily open simulation results, such that only the columns needed are ever read.
+
+    Args:
+        path: A results file, or a sink's directory of part files.
+        format: The format of the results, e.g. "feather" or "parquet".
+
+    Returns:
+        A pyarrow Dataset over the results.
+    """
+    return open_parts(ds.dataset(path, format=format).files, format)
+
+
+def watched_quantities(dataset: ds.Dataset) -> list[str]:
+    """Return the names of the watched quantities in a results dataset, without reading any rows."""
+    return [name for name in dataset.schema.names if name not in INDEX_COLS]
+
+
+def read_quantities(dataset: ds.Dataset, quantities: Sequence[str], runs: Optional[Sequence[int]] = None) -> pd.DataFrame:
+    """Read the index columns and a selection of watched quantities, optionally for a selection of runs.
+
+    Args:
+        dataset: The results dataset.
+        quantities: The watched quantities to read.
+        runs: Optionally, the runs to read. All runs if `None`.
+
+    Returns:
+        A pandas DataFrame with `step`, `run` and the selected quantities.
+    """
+    filter = ds.field("run").isin(list(runs)) if runs is not None else None
+    return dataset.to_table(columns=INDEX_COLS + list(quantities), filter=filter).to_pandas()
+
+
+def summarize(dataset: ds.Dataset) -> dict[str, int]:
+    """Count the runs and steps per run in a results dataset, reading only its index columns.
+
+    Returns:
+        The number of runs, steps per run and rows.
+    """
+    index = dataset.to_table(columns=INDEX_COLS).to_pandas()
+    return {
+        "runs": index["run"].nunique(),
+        "steps_per_run": int(index["step"].max()) + 1 if len(index) else 0,
+        "rows": len(index),
+    }
+
+
+def run_ids(dataset: ds.Dataset) -> list[int]:
+    """Return the IDs of the runs in a results dataset, reading only its `run` column.
+
+    Run IDs needn't be `0..runs - 1`, e.g. if runs were passed by ID or stopped on convergence.
+    """
+    return sorted(int(run) for run in dataset.to_table(columns=["run"]).column("run").unique().to_pylist())
+
+
+def aggregate(results: pd.DataFrame, quantities: Sequence[str], band: tuple[float, float] = (0.05, 0.95)) -> pd.DataFrame:
+    """Aggregate watched quantities across runs, step by step.
+
+    Args:
+        results: Results with `step`, `run` and the quantities in question.
+        quantities: The quantities to aggregate.
+        band: The lower and upper quantiles that bound the band drawn around each quantity's mean.
+
+    Returns:
+        A long pandas DataFrame with one row per step and quantity, and columns `step`, `variable`, `mean`,
+        `median`, `lower` and `upper`.
+    """
+    lower, upper = band
+    grouped = results.groupby("step")[list(quantities)]
+    stats = {
+        "mean": grouped.mean(),
+        "median": grouped.median(),
+        "lower": grouped.quantile(lower),
+        "upper": grouped.quantile(upper),
+    }
+    aggregated = pd.DataFrame({stat: frame.stack(dropna=False) for stat, frame in stats.items()})
+    aggregated.index.names = ["step", "variable"]
+    return aggregated.reset_index().sort_values(["variable", "step"], ignore_index=True)
+
+
+def lttb(x: np.ndarray[Any, Any], y: np.ndarray[Any, Any], threshold: int) -> np.ndarray[Any, Any]:
+    """Select the points of a series that best preserve its shape, via Largest-Triangle-Three-Buckets.
+
+    Args:
+        x: The series' (increasing) x values.
+        y: The series' y values.
+        threshold: The number of points to select.
+
+    Returns:
+        The (increasing) indices of the selected points, including the first and last.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    # Interior points are split into `threshold - 2` buckets; one point is selected from each.
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    selected: np.ndarray[Any, Any] = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[end : edges[i + 2]].mean(), y[end : edges[i + 2]].mean()  # noqa: E203
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Select the point that forms the largest triangle with the last selected point and the next bucket's mean.
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def min_max(x: np.ndarray[Any, Any], y: np.ndarray[Any, Any], threshold: int) -> np.ndarray[Any, Any]:
+    """Select each bucket's smallest and largest points, such that a series' extremes survive downsampling.
+
+    Args:
+        x: The series' (increasing) x values.
+        y: The series' y values.
+        threshold: The (approximate) number of points to select.
+
+    Returns:
+        The (increasing) indices of the selected points.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=float)
+    buckets = math.ceil(threshold / 2)
+    starts = np.floor(np.linspace(0, n, buckets + 1)).astype(int)[:-1]
+    # Sort each bucket's points by value, and take its first and last.
+    bucket = np.repeat(np.arange(buckets), np.diff(np.append(starts, n)))
+    order = np.lexsort((y, bucket))
+    ends: np.ndarray[Any, Any] = np.append(starts[1:], n) - 1
+    selected: np.ndarray[Any, Any] = np.unique(np.concatenate([order[starts], order[ends]]))
+    return selected
+
+
+DOWNSAMPLERS = {"lttb": lttb, "min_max": min_max}
+
+
+def downsample(
+    results: pd.DataFrame, x: str, y: str, threshold: int, by: Optional[str] = None, method: str = "lttb"
+) -> pd.DataFrame:
+    """Downsample series for plotting.
+
+    Args:
+        results: The series, in long format.
+        x: The column of x values.
+        y: The column of y values.
+        threshold: The number of points to keep per series.
+        by: Optionally, the column that identifies each series, e.g. `variable`.
+        method: "lttb", to preserve each series' shape, or "min_max", to preserve its extremes.
+
+    Returns:
+        The selected rows.
+    """
+    select = DOWNSAMPLERS[method]
+    groups = results.groupby(by, sort=False) if by is not None else [(None, results)]
+    selected = []
+    for _, series in groups:
+        series = series.sort_values(x)
+        selected.append(series.iloc[select(series[x].to_numpy(), series[y].to_numpy(), threshold)])
+    return pd.concat(selected) if selected else results
+
+
+def paginate(results: pd.DataFrame, page: int, page_size: int = 100) -> pd.DataFrame:
+    """Return one page of rows.
+
+    Args:
+        results: The rows.
+        page: The page, counting from 1.
+        page_size: The number of rows per page.
+
+    Returns:
+        The rows on the page.
+    """
+    start = (page - 1) * page_size
+    return results.iloc[start : start + page_size]  # noqa: E203
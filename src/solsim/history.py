@@ -0,0 +1,62 @@
+from collections import deque
+from collections.abc import Iterator, Sequence
+from typing import MutableSequence, Optional, Union, overload
+
+from solsim.type import StateType
+
+
+class History(Sequence[StateType]):
+    """The states through which a system has passed in the current run.
+
+    Only the `maxlen` most recent states are retained (all of them if `maxlen` is `None`). Regardless, `len`
+    counts every state appended, and indices refer to steps, e.g. `history[-1]` is the previous state and
+    `history[0]` the initial one. Indexing a step that is no longer retained raises an `IndexError`, while
+    iterating, e.g. `for state in history` or `state in history`, covers the retained states only, oldest first.
+    """
+
+    def __init__(self, maxlen: Optional[int] = None) -> None:
+        self._maxlen = maxlen
+        self._states: MutableSequence[StateType]
+        if maxlen is None:
+            self._states = []
+        else:
+            self._states = deque(maxlen=maxlen)
+        self._len = 0
+
+    @property
+    def maxlen(self) -> Optional[int]:
+        return self._maxlen
+
+    def append(self, state: StateType) -> None:
+        if self._maxlen != 0:
+            self._states.append(state)
+        self._len += 1
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[StateType]:
+        return iter(self._states)
+
+    def __reversed__(self) -> Iterator[StateType]:
+        return reversed(self._states)
+
+    @overload
+    def __getitem__(self, index: int) -> StateType:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[StateType]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[StateType, list[StateType]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("history index out of range")
+        offset = index - (self._len - len(self._states))
+        if offset < 0:
+            raise IndexError(f"step {index} is no longer retained in history (maxlen={self._maxlen})")
+        return self._states[offset]
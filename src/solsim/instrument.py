@@ -0,0 +1,119 @@
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+import resource
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class Profiler:
+    """Records where a simulation spends its time, and how much memory it uses.
+
+    Each timed event is tagged with the run and step during which it occurred, e.g. each call to `step`, each RPC
+    round trip, or each custom timer opened by a system via `self.timer(name)`.
+
+    Args:
+        trace_memory: Whether to trace Python memory allocations via `tracemalloc`, which slows the simulation.
+    """
+
+    COLUMNS = ["run", "step", "name", "seconds", "count"]
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.run = -1
+        self.step = -1
+        self.peak_memory: dict[str, int] = {}
+        self._events: list[tuple[int, int, str, float, int]] = []
+
+    @contextmanager
+    def timer(self, name: str, count: int = 1) -> Iterator[None]:
+        """Time a block of code.
+
+        Args:
+            name: The name under which to record the time.
+            count: The number of events the block accounts for, e.g. the number of requests in an RPC batch.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, count)
+
+    def record(self, name: str, seconds: float, count: int = 1) -> None:
+        self._events.append((self.run, self.step, name, seconds, count))
+
+    def clear(self) -> None:
+        self.run = self.step = -1
+        self.peak_memory = {}
+        self._events = []
+
+    def start(self) -> None:
+        if self.trace_memory:
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        # `ru_maxrss` is in kilobytes on Linux.
+        self.peak_memory["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        if self.trace_memory and tracemalloc.is_tracing():
+            self.peak_memory["traced"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def merge(self, other: "Profiler") -> None:
+        """Fold in the events and peak memory recorded by another profiler, e.g. in a worker process."""
+        self._events += other._events
+        for key, value in other.peak_memory.items():
+            self.peak_memory[key] = max(self.peak_memory.get(key, 0), value)
+
+    def metrics(self) -> "pd.DataFrame":
+        """Return every timed event.
+
+        Returns:
+            A pandas DataFrame with one row per event. Events outside of any step, e.g. `setup`, have `step` -1.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self._events, columns=self.COLUMNS)
+
+    def summary(self) -> "pd.DataFrame":
+        """Summarize timed events by name.
+
+        Returns:
+            A pandas DataFrame indexed by name, with the number of events and their total, mean and max seconds.
+        """
+        return (
+            self.metrics()
+            .groupby("name")
+            .agg(count=("count", "sum"), total=("seconds", "sum"), mean=("seconds", "mean"), max=("seconds", "max"))
+            .sort_values("total", ascending=False)
+        )
+
+
+_active_profiler: ContextVar[Optional[Profiler]] = ContextVar("solsim_profiler", default=None)
+
+
+def active_profiler() -> Optional[Profiler]:
+    """Return the profiler of the simulation currently running, if it is being profiled."""
+    return _active_profiler.get()
+
+
+def activate(profiler: Optional[Profiler]) -> Any:
+    """Make a profiler the active one, returning a token with which to `deactivate` it."""
+    return _active_profiler.set(profiler)
+
+
+def deactivate(token: Any) -> None:
+    _active_profiler.reset(token)
+
+
+def timer(name: str, count: int = 1) -> AbstractContextManager[None]:
+    """Time a block of code with the active profiler, if any. Otherwise, do nothing.
+
+    Args:
+        name: The name under which to record the time.
+        count: The number of events the block accounts for, e.g. the number of requests in an RPC batch.
+    """
+    profiler = _active_profiler.get()
+    return profiler.timer(name, count) if profiler is not None else nullcontext()
@@ -0,0 +1,82 @@
+from collections import deque
+from collections.abc import Iterable
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+
+from solsim.instrument import timer
+
+T = TypeVar("T")
+
+
+class AccountPool(Generic[T]):
+    """A pool of pre-provisioned accounts, e.g. keypairs, PDAs or initialized on-chain accounts.
+
+    Provision the pool up front, e.g. in `setup` or a run's `initial_step`, then lease accounts during steps instead
+    of creating them, and release them once done. Pools created by `BaseSolanaSystem.account_pool` are provisioned
+    before each step. Keypairs are generated, PDAs derived and accounts initialized in
+    bulk, off the step path, and released accounts are handed out again, in later steps and runs.
+
+    Should a lease outgrow the accounts available, the shortfall is provisioned on the spot and timed, by the
+    active profiler if any, as `account_pool_provision`.
+
+    Args:
+        factory: Creates an account, e.g. `Keypair`, or a function deriving a PDA from a fresh keypair.
+        size: The number of accounts to keep available.
+        initialize: Initializes new accounts on-chain, given a batch of them, e.g. by sending their `init`
+            transactions concurrently via `gather_agent_actions`.
+        reusable: Whether released accounts may be leased again. Make it `False` for accounts that are used up,
+            e.g. closed by a program, such that the pool replenishes them instead.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], T],
+        size: int,
+        initialize: Optional[Callable[[list[T]], Awaitable[Any]]] = None,
+        reusable: bool = True,
+    ) -> None:
+        self.factory = factory
+        self.size = size
+        self.initialize = initialize
+        self.reusable = reusable
+        self._available: deque[T] = deque()
+        self._leased = 0
+
+    @property
+    def available(self) -> int:
+        return len(self._available)
+
+    @property
+    def leased(self) -> int:
+        return self._leased
+
+    async def provision(self, size: Optional[int] = None) -> None:
+        """Create, and initialize, accounts until `size` (by default, the pool's size) are available."""
+        await self._grow((size if size is not None else self.size) - len(self._available))
+
+    async def lease(self, n: int) -> list[T]:
+        """Take `n` accounts from the pool, provisioning any shortfall."""
+        if n > len(self._available):
+            with timer("account_pool_provision", count=n - len(self._available)):
+                await self._grow(n - len(self._available))
+        self._leased += n
+        return [self._available.popleft() for _ in range(n)]
+
+    def release(self, accounts: Iterable[T]) -> None:
+        """Return leased accounts to the pool, or, unless the pool is `reusable`, mark them as used up."""
+        accounts = list(accounts)
+        self._leased -= len(accounts)
+        if self.reusable:
+            self._available.extend(accounts)
+
+    def clear(self) -> None:
+        """Forget every account, e.g. once the cluster on which they were initialized is reset."""
+        self._available.clear()
+        self._leased = 0
+
+    async def _grow(self, n: int) -> None:
+        if n <= 0:
+            return
+        accounts = [self.factory() for _ in range(n)]
+        if self.initialize is not None:
+            await self.initialize(accounts)
+        self._available.extend(accounts)
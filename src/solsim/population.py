@@ -0,0 +1,206 @@
+from collections.abc import Iterable, Sequence
+from typing import Any, Callable, Optional, Union, cast
+
+import numpy as np
+import numpy.typing as npt
+
+
+# Decides something for every agent in a population at once, e.g. how much each bids, from the population's columns
+# and a generator. Returns an array with one entry per agent.
+Policy = Callable[["Population", np.random.Generator], npt.ArrayLike]
+
+
+class Population:
+    """A population of agents, stored as columns of a table: one array per attribute, one row per agent.
+
+    Off-chain agent logic, e.g. which agents trade, with whom and how much, is then a handful of NumPy operations
+    over every agent at once, rather than a Python loop over agent objects, and only the resulting actions go
+    on-chain. This keeps steps fast with tens of thousands of agents.
+
+    Columns are accessed by name, e.g. `population["balance"] += 1`, and sub-populations by a boolean mask or
+    indices, e.g. `population[population["balance"] > 0]`.
+
+    Args:
+        size: The number of agents.
+        ids: An object per agent, e.g. its `Keypair`, for issuing its on-chain actions.
+        columns: The agents' attributes, e.g. balances, strategy parameters or flags, mapped to their values: an
+            array with one entry per agent, or a scalar shared by every agent.
+    """
+
+    def __init__(self, size: int, ids: Optional[Iterable[Any]] = None, **columns: npt.ArrayLike) -> None:
+        self._size = size
+        self.ids = self._to_objects(ids, size) if ids is not None else None
+        self._columns: dict[str, npt.NDArray[Any]] = {}
+        for name, values in columns.items():
+            self[name] = values
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._columns)
+
+    @property
+    def columns(self) -> dict[str, npt.NDArray[Any]]:
+        return self._columns
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __getitem__(self, key: Any) -> Any:
+        """Return a column, given its name, or else a sub-population, given a boolean mask or indices.
+
+        The sub-population's columns are copies: write changes back with `update`.
+        """
+        if isinstance(key, str):
+            try:
+                return self._columns[key]
+            except KeyError:
+                raise Exception(f"{key} not found in population columns: {self.names}")
+        indices = self.indices(key)
+        return Population(
+            len(indices),
+            ids=self.ids[indices] if self.ids is not None else None,
+            **{name: values[indices] for name, values in self._columns.items()},
+        )
+
+    def __setitem__(self, name: str, values: npt.ArrayLike) -> None:
+        array: npt.NDArray[Any] = np.asarray(values)
+        if array.ndim > 1 and not isinstance(values, np.ndarray):
+            array = self._to_objects(cast(Iterable[Any], values), self._size)
+        if array.ndim == 0:
+            array = np.full(self._size, array)
+        if array.shape[:1] != (self._size,):
+            raise Exception(f"Column {name} has {len(array)} values, for a population of {self._size} agents.")
+        self._columns[name] = array
+
+    def indices(self, key: Any) -> npt.NDArray[np.intp]:
+        """Convert a boolean mask, or indices, to indices."""
+        array: npt.NDArray[Any] = np.asarray(key)
+        if array.dtype == bool:
+            return np.flatnonzero(array)
+        return array.astype(np.intp)
+
+    def update(self, key: Any, **columns: npt.ArrayLike) -> None:
+        """Write values into some agents' columns, e.g. `population.update(winners, balance=new_balances)`.
+
+        Args:
+            key: The agents to update, as a boolean mask or indices.
+            columns: The columns to write, mapped to one value per agent to update, or a scalar shared by each.
+        """
+        indices = self.indices(key)
+        for name, values in columns.items():
+            if name not in self._columns:
+                raise Exception(f"{name} not found in population columns: {self.names}")
+            self._columns[name][indices] = values
+
+    def append(self, size: int, ids: Optional[Iterable[Any]] = None, **columns: npt.ArrayLike) -> None:
+        """Add agents, e.g. births. Columns that aren't given are filled with zeros."""
+        new_ids = self._to_objects(ids, size) if ids is not None else None
+        if (self.ids is None) != (new_ids is None) and self._size and size:
+            raise Exception("Either every agent in a population has an ID, or none does.")
+        unknown = set(columns) - set(self._columns)
+        if unknown:
+            raise Exception(f"Columns {sorted(unknown)} not found in population columns: {self.names}")
+        for name, values in self._columns.items():
+            appended = np.zeros(size, dtype=values.dtype)
+            if name in columns:
+                appended[:] = columns[name]
+            self._columns[name] = np.concatenate([values, appended])
+        if new_ids is not None:
+            self.ids = new_ids if self.ids is None else np.concatenate([self.ids, new_ids])
+        self._size += size
+
+    def keep(self, key: Any) -> None:
+        """Remove every agent but some, e.g. `population.keep(population["alive"])`."""
+        indices = self.indices(key)
+        self._columns = {name: values[indices] for name, values in self._columns.items()}
+        if self.ids is not None:
+            self.ids = self.ids[indices]
+        self._size = len(indices)
+
+    def evaluate(
+        self, policy: Union[Policy, Sequence[Policy]], rng: np.random.Generator, by: Optional[str] = None
+    ) -> npt.NDArray[Any]:
+        """Evaluate each agent's policy, with one call per policy rather than per agent.
+
+        Args:
+            policy: A policy for every agent, or, if `by` is given, a sequence of policies.
+            rng: The generator from which policies draw, e.g. the system's `rng`.
+            by: A column of integer codes, indexing into `policy`, that assigns each agent its policy, e.g. its
+                strategy. Each policy is then called with the sub-population that follows it.
+
+        Returns:
+            An array with the decision of each agent.
+        """
+        if by is None:
+            if isinstance(policy, Sequence):
+                raise Exception("Pass a single policy, or the column that assigns each agent one of several: `by`.")
+            return self._decide(policy, self, rng)
+        policies = list(policy) if isinstance(policy, Sequence) else [policy]
+        codes = self[by]
+        groups = []
+        for code, group_policy in enumerate(policies):
+            indices = np.flatnonzero(codes == code)
+            if len(indices):
+                groups.append((indices, self._decide(group_policy, self[indices], rng)))
+        dtype = np.result_type(*(group[1] for group in groups)) if groups else float
+        decisions: npt.NDArray[Any] = np.zeros(self._size, dtype=dtype)
+        for indices, group_decisions in groups:
+            decisions[indices] = group_decisions
+        return decisions
+
+    def pair(self, rng: np.random.Generator, among: Any = None) -> npt.NDArray[np.intp]:
+        """Pair agents at random, e.g. makers with takers. Should there be an odd number of agents, one sits out.
+
+        Args:
+            rng: The generator with which to shuffle agents, e.g. the system's `rng`.
+            among: The agents to pair, as a boolean mask or indices. All agents if `None`.
+
+        Returns:
+            An array of shape `(pairs, 2)` of agent indices, one pair per row.
+        """
+        indices = np.arange(self._size) if among is None else self.indices(among)
+        shuffled = rng.permutation(indices)
+        paired: npt.NDArray[np.intp] = shuffled[: len(shuffled) // 2 * 2].reshape(-1, 2)
+        return paired
+
+    def match(self, left: Any, right: Any, rng: np.random.Generator) -> npt.NDArray[np.intp]:
+        """Match agents from one group with distinct agents from another at random, e.g. buyers with sellers.
+
+        Agents left over from the larger group sit out.
+
+        Args:
+            left: The agents of the first group, as a boolean mask or indices.
+            right: The agents of the second group, as a boolean mask or indices.
+            rng: The generator with which to shuffle agents, e.g. the system's `rng`.
+
+        Returns:
+            An array of shape `(matches, 2)` of agent indices: agents from `left` in the first column, and from
+            `right` in the second.
+        """
+        left_indices = rng.permutation(self.indices(left))
+        right_indices = rng.permutation(self.indices(right))
+        matches = min(len(left_indices), len(right_indices))
+        return np.stack([left_indices[:matches], right_indices[:matches]], axis=1)
+
+    @staticmethod
+    def _decide(policy: Policy, population: "Population", rng: np.random.Generator) -> npt.NDArray[Any]:
+        decisions: npt.NDArray[Any] = np.asarray(policy(population, rng))
+        if decisions.ndim == 0:
+            decisions = np.full(len(population), decisions)
+        if len(decisions) != len(population):
+            raise Exception(f"Policy {policy} made {len(decisions)} decisions, for {len(population)} agents.")
+        return decisions
+
+    @staticmethod
+    def _to_objects(items: Iterable[Any], size: int) -> npt.NDArray[np.object_]:
+        # An object array, filled element-wise, such that e.g. tuples aren't unpacked into a second dimension.
+        objects = list(items)
+        if len(objects) != size:
+            raise Exception(f"Got {len(objects)} values, for a population of {size} agents.")
+        array: npt.NDArray[np.object_] = np.empty(size, dtype=object)
+        for i, item in enumerate(objects):
+            array[i] = item
+        return array
@@ -0,0 +1,122 @@
+from collections.abc import Iterable, Mapping
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+import numpy as np
+
+from solsim.type import StateType
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class ResultsStore:
+    """Columnar, growable buffer of watched quantities.
+
+    Each watched quantity is appended into its own preallocated NumPy array, alongside `step` and `run`
+    integer arrays. Column dtypes are inferred from the first appended state, and promoted (e.g. from `int` to
+    `float`, or to `object` for integers that overflow `int64`) if a later value doesn't fit. If `dtypes` are
+    declared, e.g. by a system's `StateSchema`, columns are allocated with them up front and values are written
+    without inference or promotion.
+    """
+
+    INDEX_COLS = ["step", "run"]
+
+    def __init__(
+        self, watchlist: Iterable[str], capacity: int = 1024, dtypes: Optional[Mapping[str, np.dtype[Any]]] = None
+    ) -> None:
+        self._watchlist = sorted(watchlist)
+        self._capacity = max(capacity, 1)
+        self._size = 0
+        self._columns: Dict[str, np.ndarray[Any, Any]] = {
+            col: np.empty(self._capacity, dtype=np.int64) for col in self.INDEX_COLS
+        }
+        self._types: Dict[str, Set[type]] = {}
+        self._inferred = False
+        self._typed = dtypes is not None
+        if dtypes is not None:
+            for qty in self._watchlist:
+                self._columns[qty] = np.empty(self._capacity, dtype=dtypes[qty])
+            self._inferred = True
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, run: int, step: int, state: StateType) -> None:
+        """Append the watched quantities of a single state.
+
+        Args:
+            run: The run to which the state belongs.
+            step: The step to which the state belongs.
+            state: The system state.
+        """
+        if not self._inferred:
+            self._infer_dtypes(state)
+        if self._size == self._capacity:
+            self._grow()
+        i = self._size
+        for qty in self._watchlist:
+            try:
+                value = state[qty]
+            except KeyError:
+                raise Exception(f"{qty} not found in state: {state}")
+            if not self._typed and type(value) not in self._types[qty]:
+                self._promote(qty, value)
+            try:
+                self._columns[qty][i] = value
+            except OverflowError:
+                # Integers outside the column's range, e.g. u64 token amounts past 2**63, are kept as Python ints.
+                if self._typed:
+                    raise
+                self._columns[qty] = self._columns[qty].astype(object)
+                self._columns[qty][i] = value
+        self._columns["step"][i] = step
+        self._columns["run"][i] = run
+        self._size += 1
+
+    def clear(self) -> None:
+        """Drop all appended rows, keeping the inferred dtypes and allocated buffers."""
+        self._size = 0
+
+    def to_frame(self) -> "pd.DataFrame":
+        """Build a DataFrame that views, rather than copies, the underlying buffers.
+
+        Returns:
+            A pandas DataFrame with `step` and `run` columns followed by the sorted watched quantities.
+        """
+        import pandas as pd
+
+        cols = self.INDEX_COLS + self._watchlist
+        return pd.DataFrame(
+            {col: self._columns[col][: self._size] if col in self._columns else [] for col in cols},
+            columns=cols,
+            copy=False,
+        )
+
+    def _infer_dtypes(self, state: StateType) -> None:
+        for qty in self._watchlist:
+            if qty not in state:
+                raise Exception(f"{qty} not found in state: {state}")
+            self._columns[qty] = np.empty(self._capacity, dtype=self._dtype_of(state[qty]))
+            self._types[qty] = {type(state[qty])}
+        self._inferred = True
+
+    def _promote(self, qty: str, value: Any) -> None:
+        column = self._columns[qty]
+        dtype = np.promote_types(column.dtype, self._dtype_of(value))
+        if dtype != column.dtype:
+            self._columns[qty] = column.astype(dtype)
+        self._types[qty].add(type(value))
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        for col, column in self._columns.items():
+            grown = np.empty(self._capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[col] = grown
+
+    @staticmethod
+    def _dtype_of(value: Any) -> np.dtype[Any]:
+        dtype: np.dtype[Any] = np.asarray(value).dtype
+        if np.ndim(value) or dtype.kind not in "biufc":
+            return np.dtype(object)
+        return dtype
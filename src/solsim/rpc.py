@@ -0,0 +1,132 @@
+from collections.abc import Sequence
+from typing import Any, Optional
+
+import httpx
+from solana.publickey import PublicKey
+from solana.rpc import commitment
+
+from solsim.instrument import timer
+
+
+class BatchClient:
+    """An `async` Solana JSON-RPC client that pools connections and batches requests.
+
+    Requests passed to `batch` are sent to the cluster as a single JSON-RPC batch, i.e. in one round trip.
+
+    Args:
+        endpoint: The cluster's RPC endpoint.
+        max_connections: The maximum number of concurrent connections to the cluster.
+        timeout: The number of seconds to wait for each response.
+        session: Optionally, the HTTP session through which to send requests.
+    """
+
+    # The maximum number of accounts per `getMultipleAccounts` request.
+    MAX_ACCOUNTS_PER_REQUEST = 100
+
+    def __init__(
+        self,
+        endpoint: str,
+        max_connections: int = 10,
+        timeout: float = 10,
+        session: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self.endpoint = endpoint
+        self._session = session or httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        )
+
+    async def batch(self, requests: Sequence[tuple[str, list[Any]]]) -> list[Any]:
+        """Send several requests in one round trip.
+
+        Args:
+            requests: (method, params) pairs.
+
+        Returns:
+            The result of each request, in order.
+        """
+        if not requests:
+            return []
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params} for i, (method, params) in enumerate(requests)
+        ]
+        with timer("rpc", count=len(requests)):
+            response = await self._session.post(self.endpoint, json=payload)
+        response.raise_for_status()
+        responses = {r["id"]: r for r in response.json()}
+        results = []
+        for i, (method, _) in enumerate(requests):
+            if "error" in responses[i]:
+                raise Exception(f"{method} request failed: {responses[i]['error']}")
+            results.append(responses[i]["result"])
+        return results
+
+    async def request(self, method: str, params: list[Any]) -> Any:
+        """Send a single request.
+
+        Args:
+            method: The RPC method.
+            params: The method's parameters.
+
+        Returns:
+            The result of the request.
+        """
+        (result,) = await self.batch([(method, params)])
+        return result
+
+    async def get_multiple_accounts(
+        self, pubkeys: Sequence[PublicKey], commitment: commitment.Commitment = commitment.Confirmed
+    ) -> list[Optional[dict[str, Any]]]:
+        """Get several accounts in one round trip.
+
+        Args:
+            pubkeys: The public keys of the accounts in question.
+            commitment: The bank state to query.
+
+        Returns:
+            Each account's info, with base64-encoded data, or `None` if the account doesn't exist.
+        """
+        return (await self.fetch_multiple_accounts(pubkeys, commitment))[1]
+
+    async def fetch_multiple_accounts(
+        self, pubkeys: Sequence[PublicKey], commitment: commitment.Commitment = commitment.Confirmed
+    ) -> tuple[Optional[int], list[Optional[dict[str, Any]]]]:
+        """Like `get_multiple_accounts`, but also return the (earliest) slot at which accounts were read."""
+        chunks = [
+            pubkeys[i : i + self.MAX_ACCOUNTS_PER_REQUEST]  # noqa: E203
+            for i in range(0, len(pubkeys), self.MAX_ACCOUNTS_PER_REQUEST)
+        ]
+        params = {"commitment": commitment, "encoding": "base64"}
+        results = await self.batch([("getMultipleAccounts", [[str(pk) for pk in chunk], params]) for chunk in chunks])
+        return _slot(results), [account for result in results for account in result["value"]]
+
+    async def get_token_account_balances(
+        self, pubkeys: Sequence[PublicKey], commitment: commitment.Commitment = commitment.Confirmed
+    ) -> list[float]:
+        """Get several accounts' token balances in one round trip.
+
+        Args:
+            pubkeys: The public keys of the accounts in question.
+            commitment: The bank state to query.
+
+        Returns:
+            The token balance of each account.
+        """
+        return (await self.fetch_token_account_balances(pubkeys, commitment))[1]
+
+    async def fetch_token_account_balances(
+        self, pubkeys: Sequence[PublicKey], commitment: commitment.Commitment = commitment.Confirmed
+    ) -> tuple[Optional[int], list[float]]:
+        """Like `get_token_account_balances`, but also return the (earliest) slot at which balances were read."""
+        results = await self.batch(
+            [("getTokenAccountBalance", [str(pubkey), {"commitment": commitment}]) for pubkey in pubkeys]
+        )
+        return _slot(results), [float(result["value"]["uiAmount"]) for result in results]
+
+    async def close(self) -> None:
+        await self._session.aclose()
+
+
+def _slot(results: Sequence[Any]) -> Optional[int]:
+    slots = [result["context"]["slot"] for result in results if "context" in result]
+    return min(slots) if slots else None
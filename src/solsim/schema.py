@@ -0,0 +1,43 @@
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from solsim.type import StateType
+
+
+class StateSchema:
+    """Declares the variables of a system's state, and their dtypes.
+
+    Set it as a system's `STATE` class attribute, e.g. `STATE = StateSchema(population_size=float, food_supply=float)`.
+    The simulation then checks the watchlist against the schema before running, rather than once results are first
+    stored, checks each run's initial state once, rather than each state, and writes watched quantities straight
+    into result columns of the declared dtypes, converting values as NumPy does (e.g. truncating floats written to an
+    `int` column). Narrow dtypes, e.g. `np.float32`, shrink results in memory and on disk.
+
+    Args:
+        fields: The state variables, mapped to anything that `np.dtype` accepts.
+    """
+
+    def __init__(self, **fields: npt.DTypeLike) -> None:
+        self.dtypes: dict[str, np.dtype[Any]] = {name: np.dtype(dtype) for name, dtype in fields.items()}
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.dtypes)
+
+    def check_watchlist(self, watchlist: Iterable[str]) -> None:
+        """Raise if a watched quantity isn't a declared state variable."""
+        missing = sorted(set(watchlist) - set(self.dtypes))
+        if missing:
+            raise Exception(f"Watched quantities {missing} aren't declared in the state schema: {self.names}")
+
+    def check(self, state: StateType) -> None:
+        """Raise if a state lacks a declared variable, or has one that isn't declared."""
+        missing = [name for name in self.dtypes if name not in state]
+        if missing:
+            raise Exception(f"State variables {missing}, declared in the state schema, are missing from: {state}")
+        undeclared = [name for name in state if name not in self.dtypes and name not in ("run", "step")]
+        if undeclared:
+            raise Exception(f"State variables {undeclared} aren't declared in the state schema: {self.names}")
@@ -1,34 +1,104 @@
 import asyncio
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+import glob
+import multiprocessing
 import os
+import queue
+import random
+import secrets
 import subprocess
 import tempfile
-from typing import Any, Union
+from typing import TYPE_CHECKING, Any, Optional, Union, cast
 
-import feather
-import pandas as pd
+import numpy as np
 from tqdm.auto import tqdm
-import typer
 
-from solsim.system import BaseSystem, BaseSolanaSystem
+from solsim import instrument
+from solsim.checkpoint import Checkpoint
+from solsim.history import History
+from solsim.instrument import Profiler
+from solsim.results import ResultsStore
+from solsim.stopping import Convergence, RemoteConvergence, RunStopCondition
+from solsim.summary import SummaryStore
+from solsim.system import BaseSystem, VectorizedSystem
 from solsim.type import StateType
 
+# pandas, pyarrow, typer and the Solana stack are imported where used, such that pure-Python simulations, and the
+# worker processes that run them, start quickly.
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow.dataset as ds
+    import typer
+
+    from solsim.cache import ResultCache
+    from solsim.sink import BaseSink
+    from solsim.solana_system import BaseSolanaSystem
+
 
 class Simulation:
 
-    INDEX_COLS = ["step", "run"]
+    INDEX_COLS = ResultsStore.INDEX_COLS
 
-    def __init__(self, system: Union[BaseSystem, BaseSolanaSystem], watchlist: Iterable[str]) -> None:
+    def __init__(
+        self,
+        system: Union[BaseSystem, "BaseSolanaSystem", VectorizedSystem],
+        watchlist: Iterable[str],
+        seed: Optional[int] = None,
+        sink: Optional["BaseSink"] = None,
+        profiler: Optional[Profiler] = None,
+        checkpoint_dir: Optional[str] = None,
+        checkpoint_every: int = 1_000,
+        summarize: bool = False,
+        quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95),
+        stop_run: Optional[RunStopCondition] = None,
+        convergence: Optional[Convergence] = None,
+        cache: Optional["ResultCache"] = None,
+    ) -> None:
         self._system = system
         self._watchlist = set(watchlist)
+        schema = getattr(system, "STATE", None)
+        if schema is not None:
+            schema.check_watchlist(self._watchlist)
+        self._seed_given = seed is not None
+        self._seed = seed if seed is not None else secrets.randbits(128)
+        self._sink = sink
+        self._profiler = profiler
+        self._checkpoint_dir = checkpoint_dir
+        self._checkpoint_every = checkpoint_every
+        if checkpoint_dir is not None:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+        if summarize and sink is not None:
+            raise Exception("A summarizing simulation keeps no raw results for a sink to write.")
+        self._summarize = summarize
+        self._quantiles = quantiles
+        self._stop_run = stop_run
+        self._convergence = convergence
+        if cache is not None:
+            if seed is None:
+                raise Exception("A cached simulation needs a `seed`, of which cached results are a function.")
+            if isinstance(system, VectorizedSystem):
+                raise Exception("Vectorized systems draw every run from one generator, so runs can't be cached alone.")
+            if sink is not None or summarize or stop_run is not None or convergence is not None:
+                raise Exception("A cached simulation can't stream to a sink, summarize or stop runs early.")
+        self._cache = cache
 
     @property
-    def cli(self) -> typer.Typer:
+    def metrics(self) -> Optional["pd.DataFrame"]:
+        """Timings recorded by the simulation's profiler, if any, during the last call to `run`."""
+        return self._profiler.metrics() if self._profiler is not None else None
+
+    @property
+    def cli(self) -> "typer.Typer":
+        import typer
+
         app = typer.Typer()
 
         @app.command()  # type: ignore
-        def run(runs: int = 1, steps_per_run: int = 1, viz_results: bool = False) -> pd.DataFrame:
-            return self.run(runs, steps_per_run, viz_results)
+        def run(
+            runs: int = 1, steps_per_run: int = 1, viz_results: bool = False, workers: int = 1, resume: bool = False
+        ) -> "pd.DataFrame":
+            return self.run(runs, steps_per_run, viz_results, workers, resume=resume)
 
         @app.callback()  # type: ignore
         def callback() -> None:
@@ -36,17 +106,54 @@ class Simulation:
 
         return app
 
-    def run(self, runs: int = 1, steps_per_run: int = 3, visualize_results: bool = False) -> pd.DataFrame:
+    def run(
+        self,
+        runs: Union[int, Sequence[int]] = 1,
+        steps_per_run: int = 3,
+        visualize_results: bool = False,
+        workers: int = 1,
+        lazy: bool = False,
+        resume: bool = False,
+    ) -> Union["pd.DataFrame", "ds.Dataset"]:
         """Run your simulation.
 
         Args:
-            runs: The number of times to run your simulation.
+            runs: The number of times to run your simulation, or the IDs of the runs to execute, e.g. `[3]` to
+                re-execute run 3 alone. Each run is seeded from the simulation's `seed` and its ID.
             visualize_results: Optionally build and start a Streamlit app to explore simulation results.
+            workers: The number of processes across which to shard runs.
+            lazy: If the simulation has a sink, return a handle to the results on disk instead of reading them.
+            resume: Resume from the simulation's last checkpoints, e.g. after a crash, rather than starting afresh.
+                Pass the same `runs`, `steps_per_run` and `workers` as the interrupted simulation.
 
         Returns:
-            results: A pandas DataFrame containing your simulation results.
+            results: A pandas DataFrame containing your simulation results, or a pyarrow Dataset if `lazy`. If the
+                simulation summarizes, a pandas DataFrame of per-step summary statistics of each watched quantity
+                across runs (see `SummaryStore.to_frame`).
         """
-        results = asyncio.run(self._run(runs, steps_per_run))
+        if resume and self._checkpoint_dir is None:
+            raise Exception("Only a simulation with a `checkpoint_dir` can resume.")
+        if visualize_results and self._summarize:
+            raise Exception("A summarizing simulation keeps no runs to explore, so its results can't be visualized.")
+        if not resume:
+            if self._sink is not None:
+                self._sink.reset()
+            if self._checkpoint_dir is not None:
+                for path in glob.glob(os.path.join(self._checkpoint_dir, "checkpoint-*.pkl")):
+                    Checkpoint.remove(path)
+        if self._checkpoint_dir is not None:
+            self._persist_seed(resume)
+        if self._profiler is not None:
+            self._profiler.clear()
+        if self._convergence is not None:
+            self._convergence.reset()
+        run_ids = range(runs) if isinstance(runs, int) else list(runs)
+        if self._cache is not None:
+            results = self._run_cached(self._cache, run_ids, steps_per_run, workers, resume)
+        else:
+            results = self._execute(run_ids, steps_per_run, workers, resume)
+        if self._sink is not None:
+            results = self._sink.dataset() if lazy else self._sink.read()
         if visualize_results:
             try:
                 with tempfile.TemporaryDirectory() as tmpdir:
@@ -56,43 +163,402 @@ class Simulation:
                 pass
         return results
 
-    @staticmethod
-    def _start_results_app(results: pd.DataFrame, tmpdir: str) -> subprocess.Popen[Any]:
-        results_path = os.path.join(tmpdir, "results.feather")
-        feather.write_dataframe(results, results_path)
-        env = {**os.environ, "SOLSIM_RESULTS_PATH": results_path}
+    def _start_results_app(self, results: Union["pd.DataFrame", "ds.Dataset"], tmpdir: str) -> subprocess.Popen[Any]:
+        if self._sink is not None:
+            # The app reads the quantities it plots straight from the sink's parts.
+            results_path, results_format = self._sink.path, self._sink.FORMAT
+        else:
+            import feather
+
+            results_path, results_format = os.path.join(tmpdir, "results.feather"), "feather"
+            feather.write_dataframe(results, results_path)
+        env = {**os.environ, "SOLSIM_RESULTS_PATH": results_path, "SOLSIM_RESULTS_FORMAT": results_format}
         return subprocess.Popen(["streamlit", "run", "visualize.py"], cwd=os.path.dirname(__file__), env=env)
 
-    async def _run(self, runs: int, steps_per_run: int) -> pd.DataFrame:
-        results: list[StateType] = []
+    def _execute(self, runs: Sequence[int], steps_per_run: int, workers: int, resume: bool) -> "pd.DataFrame":
+        if workers > 1:
+            return self._run_parallel(runs, steps_per_run, workers, resume)
+        results = asyncio.run(self._run(runs, steps_per_run, resume=resume, monitor=self._convergence))
+        return results.to_frame() if isinstance(results, SummaryStore) else results
+
+    def _run_cached(
+        self, cache: "ResultCache", runs: Sequence[int], steps_per_run: int, workers: int, resume: bool
+    ) -> "pd.DataFrame":
+        import pandas as pd
+
+        key = cache.key(self._system, self._watchlist, steps_per_run, self._seed)
+        cached = cache.get(key, runs)
+        missing = [run for run in runs if run not in cached]
+        if missing:
+            computed = self._execute(missing, steps_per_run, workers, resume)
+            cache.put(key, computed)
+            cached.update({int(run): run_results for run, run_results in computed.groupby("run", sort=False)})
+        return pd.concat([cached[run] for run in runs if run in cached], ignore_index=True)
+
+    def _run_parallel(self, runs: Sequence[int], steps_per_run: int, workers: int, resume: bool = False) -> "pd.DataFrame":
+        import pandas as pd
+
+        split: list[np.ndarray[Any, Any]] = np.array_split(np.asarray(runs), workers)
+        shards = [shard.tolist() for shard in split if len(shard)]
+        if self._system.uses_solana and cast("BaseSolanaSystem", self._system).uses_localnet:
+            from solsim.validator import ValidatorPool
+
+            # Each worker runs against its own cluster, so the cluster in this process sits idle.
+            validator = cast("BaseSolanaSystem", self._system).validator
+            validator.stop()
+            executor = ValidatorPool(validator.workspace_dir, len(shards)).executor()
+        else:
+            executor = ProcessPoolExecutor(max_workers=len(shards))
+        manager = multiprocessing.Manager()
+        with executor, manager:
+            monitors: list[Optional[RemoteConvergence]] = [None] * len(shards)
+            if self._convergence is not None:
+                # Workers relay each finished run to this process, which tells them to stop once estimates converge.
+                states, converged = manager.Queue(), manager.Event()
+                monitors = [
+                    RemoteConvergence(self._convergence.quantities, states, converged, manager.Queue(), position)
+                    for position in range(len(shards))
+                ]
+            futures = [
+                executor.submit(_run_shard, self, shard, steps_per_run, position, resume, monitors[position])
+                for position, shard in enumerate(shards)
+            ]
+            if self._convergence is not None:
+                self._watch_convergence(self._convergence, cast(list[RemoteConvergence], monitors), futures)
+            results = []
+            for future in futures:
+                shard_results, shard_profiler = future.result()
+                results.append(shard_results)
+                if self._profiler is not None and shard_profiler is not None:
+                    self._profiler.merge(shard_profiler)
+        if self._summarize:
+            summary, *others = cast(list[SummaryStore], results)
+            for other in others:
+                summary.merge(other)
+            return summary.to_frame()
+        return pd.concat(results, ignore_index=True)
+
+    @staticmethod
+    def _watch_convergence(
+        convergence: Convergence, monitors: Sequence[RemoteConvergence], futures: Sequence["Future[Any]"]
+    ) -> None:
+        while True:
+            try:
+                position, final_state = monitors[0].queue.get(timeout=0.1)
+            except queue.Empty:
+                if all(future.done() for future in futures):
+                    return
+                continue
+            convergence.update(final_state)
+            # Runs in flight once estimates converge still finish, and may widen an interval past `tolerance`, in
+            # which case their workers carry on until estimates converge again.
+            if convergence.converged:
+                monitors[0].event.set()
+            else:
+                monitors[0].event.clear()
+            monitors[position].acknowledge()
+
+    def _seed_run(self, *runs: int) -> None:
+        # Each run's streams derive from the root seed and the run's ID alone, such that a run re-executed on its
+        # own, or in another worker, reproduces its rows exactly, and no two runs' streams are correlated. Runs
+        # advanced in lockstep share streams, derived from all of their IDs.
+        sequence = np.random.SeedSequence(self._seed, spawn_key=runs)
+        seed = sequence.generate_state(1)[0]
+        random.seed(int(seed))
+        np.random.seed(seed)
+        self._system.rng = np.random.default_rng(sequence.spawn(1)[0])
+
+    async def _run(
+        self,
+        runs: Sequence[int],
+        steps_per_run: int,
+        position: Optional[int] = None,
+        resume: bool = False,
+        monitor: Optional[Union[Convergence, RemoteConvergence]] = None,
+    ) -> Union["pd.DataFrame", SummaryStore]:
+        token = instrument.activate(self._profiler)
+        if self._profiler is not None:
+            self._profiler.start()
         try:
-            for run in range(runs):
+            if isinstance(self._system, VectorizedSystem):
+                if self._checkpoint_dir is not None:
+                    raise Exception("Vectorized systems can't be checkpointed.")
+                if self._convergence is not None:
+                    raise Exception("Vectorized systems advance every run at once, so can't stop once runs converge.")
+                return self._run_vectorized(self._system, runs, steps_per_run, position)
+            return await self._run_systems(runs, steps_per_run, position, resume, monitor)
+        finally:
+            if self._profiler is not None:
+                self._profiler.stop()
+            instrument.deactivate(token)
+
+    async def _run_systems(
+        self,
+        runs: Sequence[int],
+        steps_per_run: int,
+        position: Optional[int] = None,
+        resume: bool = False,
+        monitor: Optional[Union[Convergence, RemoteConvergence]] = None,
+    ) -> Union["pd.DataFrame", SummaryStore]:
+        schema = self._system.STATE
+        checkpoint = self._resume(runs, steps_per_run, position) if resume else None
+        if checkpoint is not None and checkpoint.convergence is not None and isinstance(monitor, Convergence):
+            monitor.merge(checkpoint.convergence)
+        results: Union[ResultsStore, SummaryStore]
+        if checkpoint is not None:
+            results = checkpoint.results
+        elif self._summarize:
+            results = SummaryStore(self._watchlist, steps_per_run, self._quantiles)
+        else:
+            results = ResultsStore(self._watchlist, dtypes=schema.dtypes if schema is not None else None)
+        steps_since_checkpoint = 0
+        # Runs may be given in any order, so those completed before the checkpoint are those that precede its run.
+        resume_from = list(runs).index(checkpoint.run) if checkpoint is not None else 0
+        try:
+            for position_in_runs, run in enumerate(runs):
+                if position_in_runs < resume_from:
+                    continue
+                if monitor is not None and monitor.done():
+                    break
                 try:
-                    state: StateType = {}
-                    history: list[StateType] = []
-                    self._system.setup()
-                    for step in tqdm(range(steps_per_run), desc=f"🟢 run: {run} | step"):
+                    state: StateType
+                    if checkpoint is not None and run == checkpoint.run:
+                        state, history, first_step = checkpoint.state, checkpoint.history, checkpoint.step + 1
+                        random.setstate(checkpoint.rng[0])
+                        np.random.set_state(checkpoint.rng[1])
+                        self._system.rng = checkpoint.rng[2]
+                    else:
+                        state, history, first_step = {}, History(self._system.HISTORY), 0
+                        self._seed_run(run)
+                    self._tag(run, -1)
+                    with instrument.timer("setup"):
+                        self._system.setup()
+                    for step in tqdm(
+                        range(first_step, steps_per_run),
+                        desc=f"🟢 run: {run} | step",
+                        position=position,
+                        initial=first_step,
+                        total=steps_per_run,
+                    ):
+                        self._tag(run, step)
                         if self._system.uses_solana:
-                            updates = await self._system.initial_step() if step == 0 else await self._system.step(state, history)  # type: ignore  # noqa: E501
-                        else:
-                            updates = self._system.initial_step() if step == 0 else self._system.step(state, history)
-                        state = {**state, **updates, "run": run, "step": step}
-                        history.append(state)
-                        results.append(self._filter_state(state))
+                            solana_system = cast("BaseSolanaSystem", self._system)
+                            with instrument.timer("provision_pools"):
+                                await solana_system.provision_pools()
+                            # Reads are deduplicated within a step, but not across steps: accounts may also be written
+                            # by means the cache can't see, e.g. via the blocking `client`.
+                            solana_system.account_cache.clear()
+                        with instrument.timer("wall"):
+                            with instrument.timer("initial_step" if step == 0 else "step"):
+                                if self._system.uses_solana:
+                                    updates = await self._system.initial_step() if step == 0 else await self._system.step(state, history)  # type: ignore  # noqa: E501
+                                else:
+                                    updates = self._system.initial_step() if step == 0 else self._system.step(state, history)  # type: ignore  # noqa: E501
+                            with instrument.timer("record"):
+                                if history.maxlen == 0:
+                                    # No retained state can alias `state`, so update it in place.
+                                    state.update(updates)
+                                    state["run"], state["step"] = run, step
+                                else:
+                                    state = {**state, **updates, "run": run, "step": step}
+                                if step == 0 and schema is not None:
+                                    schema.check(state)
+                                history.append(state)
+                                results.append(run, step, state)
+                                if self._sink is not None and len(results) >= self._sink.flush_every:
+                                    self._flush(self._sink, cast(ResultsStore, results))
+                        if self._stop_run is not None and self._stop_run(state, history):
+                            break
+                        if self._checkpoint_dir is not None:
+                            steps_since_checkpoint += 1
+                            if steps_since_checkpoint >= self._checkpoint_every:
+                                self._checkpoint(runs, steps_per_run, position, run, step, state, history, results, monitor)
+                                steps_since_checkpoint = 0
                 finally:
-                    self._system.teardown()
+                    self._tag(run, -1)
+                    with instrument.timer("teardown"):
+                        self._system.teardown()
+                if monitor is not None:
+                    monitor.report(state)
         finally:
-            await self._system.cleanup() if self._system.uses_solana else self._system.cleanup()
+            if self._sink is not None:
+                self._flush(self._sink, cast(ResultsStore, results))
+            with instrument.timer("cleanup"):
+                await self._system.cleanup() if self._system.uses_solana else self._system.cleanup()
+
+        return results if isinstance(results, SummaryStore) else results.to_frame()
+
+    def _persist_seed(self, resume: bool) -> None:
+        # Runs not yet started when a simulation is interrupted must be seeded as they would have been.
+        path = os.path.join(self._checkpoint_dir or "", "seed")
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                seed = int(f.read())
+            if self._seed_given and seed != self._seed:
+                raise Exception(
+                    f"Checkpoints in {self._checkpoint_dir} are of a simulation with seed {seed}, not {self._seed}."
+                )
+            self._seed = seed
+        else:
+            with open(path, "w") as f:
+                f.write(str(self._seed))
+
+    def _checkpoint_path(self, position: Optional[int]) -> str:
+        return os.path.join(self._checkpoint_dir or "", f"checkpoint-{position or 0:04d}.pkl")
+
+    def _checkpoint(
+        self,
+        runs: Sequence[int],
+        steps_per_run: int,
+        position: Optional[int],
+        run: int,
+        step: int,
+        state: StateType,
+        history: History,
+        results: Union[ResultsStore, SummaryStore],
+        monitor: Optional[Union[Convergence, RemoteConvergence]] = None,
+    ) -> None:
+        with instrument.timer("checkpoint"):
+            path = self._checkpoint_path(position)
+            if self._sink is not None:
+                # Results up to the checkpoint are on disk, so resuming only needs to truncate the sink.
+                self._flush(self._sink, cast(ResultsStore, results))
+            system_dir = Checkpoint.system_dir_for(path)
+            Checkpoint(
+                runs=list(runs),
+                steps_per_run=steps_per_run,
+                run=run,
+                step=step,
+                state=state,
+                history=history,
+                rng=(random.getstate(), np.random.get_state(), self._system.rng),
+                results=results,
+                convergence=monitor if isinstance(monitor, Convergence) else None,
+                system=self._system.snapshot(system_dir),
+                system_dir=system_dir,
+            ).save(path)
+
+    def _resume(self, runs: Sequence[int], steps_per_run: int, position: Optional[int]) -> Optional[Checkpoint]:
+        path = self._checkpoint_path(position)
+        checkpoint = Checkpoint.load(path)
+        if checkpoint is None:
+            # Nothing to resume from: start afresh, discarding any results written before the first checkpoint.
+            if self._sink is not None:
+                self._sink.truncate(runs)
+            return None
+        if checkpoint.runs != list(runs) or checkpoint.steps_per_run != steps_per_run:
+            raise Exception(
+                f"Checkpoint {path} is of runs {checkpoint.runs} with {checkpoint.steps_per_run} steps each, not runs "
+                f"{list(runs)} with {steps_per_run}: resume with the same `runs`, `steps_per_run` and `workers`."
+            )
+        if self._sink is not None:
+            self._sink.truncate(runs, after=(checkpoint.run, checkpoint.step))
+        self._system.restore(checkpoint.system, checkpoint.system_dir)  # type: ignore
+        return checkpoint
+
+    def _tag(self, run: int, step: int) -> None:
+        if self._profiler is not None:
+            self._profiler.run, self._profiler.step = run, step
 
-        results = pd.DataFrame(results)
-        return self._reorder_results_columns(results)
+    def _run_vectorized(
+        self, system: VectorizedSystem, runs: Sequence[int], steps_per_run: int, position: Optional[int] = None
+    ) -> Union["pd.DataFrame", SummaryStore]:
+        run_ids: np.ndarray[Any, Any] = np.asarray(runs, dtype=np.int64)
+        columns: dict[str, np.ndarray[Any, Any]] = {}
+        summary = SummaryStore(self._watchlist, steps_per_run, self._quantiles) if self._summarize else None
+        # Runs that meet `stop_run` keep advancing in lockstep with the others, but their later states are dropped.
+        active: np.ndarray[Any, Any] = np.ones(len(run_ids), dtype=bool)
+        last_step = np.full(len(run_ids), steps_per_run - 1)
+        steps_taken = steps_per_run
+        state: StateType = {}
+        history = History(system.HISTORY)
+        schema = system.STATE
+        # Draws are arrays over every run in the shard, so they depend on which runs share it, i.e. on `workers`.
+        self._seed_run(*run_ids.tolist())
+        try:
+            with instrument.timer("setup"):
+                system.setup()
+            try:
+                for step in tqdm(range(steps_per_run), desc=f"🟢 runs: {len(run_ids)} | step", position=position):
+                    self._tag(-1, step)
+                    with instrument.timer("wall"):
+                        with instrument.timer("initial_step" if step == 0 else "step", count=len(run_ids)):
+                            updates = system.initial_step(len(run_ids)) if step == 0 else system.step(state, history)
+                        with instrument.timer("record", count=len(run_ids)):
+                            state = {**state, **updates, "run": run_ids, "step": step}
+                            if step == 0 and schema is not None:
+                                schema.check(state)
+                            history.append(state)
+                            if summary is not None:
+                                if active.all():
+                                    summary.append_batch(step, state)
+                                else:
+                                    summary.append_batch(
+                                        step,
+                                        {qty: np.asarray(state[qty])[active] for qty in self._watchlist if qty in state},
+                                    )
+                            else:
+                                for qty in self._watchlist:
+                                    if qty not in state:
+                                        raise Exception(f"{qty} not found in state: {state}")
+                                    if qty not in columns:
+                                        dtype = schema.dtypes[qty] if schema is not None else np.asarray(state[qty]).dtype
+                                        columns[qty] = np.empty((steps_per_run, len(run_ids)), dtype=dtype)
+                                    if schema is None:
+                                        dtype = np.result_type(columns[qty], state[qty])
+                                        if dtype != columns[qty].dtype:
+                                            columns[qty] = columns[qty].astype(dtype)
+                                    columns[qty][step] = state[qty]
+                    if self._stop_run is not None:
+                        stopped = active & np.broadcast_to(
+                            np.asarray(self._stop_run(state, history), dtype=bool), active.shape
+                        )
+                        last_step[stopped] = step
+                        active &= ~stopped
+                        if not active.any():
+                            steps_taken = step + 1
+                            break
+            finally:
+                self._tag(-1, -1)
+                with instrument.timer("teardown"):
+                    system.teardown()
+        finally:
+            with instrument.timer("cleanup"):
+                system.cleanup()
+        if summary is not None:
+            return summary
+
+        import pandas as pd
+
+        # Columns are (step, run) arrays; flattening them in column-major order lists each run's steps in turn.
+        results = pd.DataFrame(
+            {
+                "step": np.tile(np.arange(steps_taken, dtype=np.int64), len(run_ids)),
+                "run": np.repeat(run_ids, steps_taken),
+                **{qty: columns[qty][:steps_taken].ravel(order="F") for qty in sorted(columns)},
+            },
+            copy=False,
+        )
+        if not (last_step == steps_per_run - 1).all():
+            results = results[results["step"].to_numpy() <= np.repeat(last_step, steps_taken)].reset_index(drop=True)
+        if self._sink is not None:
+            self._sink.write(results)
+            return results.iloc[:0]
+        return results
+
+    @staticmethod
+    def _flush(sink: "BaseSink", results: ResultsStore) -> None:
+        sink.write(results.to_frame())
+        results.clear()
 
-    def _filter_state(self, state: StateType) -> StateType:
-        for qty in self._watchlist:
-            if qty not in state:
-                raise Exception(f"{qty} not found in state: {state}")
-        return {qty: state[qty] for qty in self._watchlist | set(self.INDEX_COLS)}
 
-    def _reorder_results_columns(self, results: pd.DataFrame) -> pd.DataFrame:
-        cols = self.INDEX_COLS + sorted([col for col in results.columns if col not in self.INDEX_COLS])
-        return results[cols]
+def _run_shard(
+    simulation: Simulation,
+    runs: Sequence[int],
+    steps_per_run: int,
+    position: int,
+    resume: bool = False,
+    monitor: Optional[RemoteConvergence] = None,
+) -> tuple[Union["pd.DataFrame", SummaryStore], Optional[Profiler]]:
+    results = asyncio.run(simulation._run(runs, steps_per_run, position, resume, monitor))
+    return results, simulation._profiler
@@ -0,0 +1,146 @@
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+import glob
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather
+import pyarrow.parquet
+
+
+class BaseSink(ABC):
+    """A directory to which simulation results are streamed while the simulation runs.
+
+    Every `flush_every` rows, buffered results are written to a new part file in `path`. Each part is
+    written to a hidden temporary file then renamed, so a simulation that dies mid-run leaves every previously
+    flushed part readable.
+    """
+
+    FORMAT = ""
+    EXTENSION = ""
+
+    def __init__(self, path: str, flush_every: int = 10_000) -> None:
+        self.path = path
+        self.flush_every = flush_every
+        os.makedirs(self.path, exist_ok=True)
+
+    @property
+    def parts(self) -> list[str]:
+        return sorted(glob.glob(os.path.join(self.path, f"part-*.{self.EXTENSION}")))
+
+    def reset(self) -> None:
+        """Delete parts written by a previous simulation."""
+        for part in self.parts:
+            os.remove(part)
+
+    def truncate(self, runs: Sequence[int], after: Optional[tuple[int, int]] = None) -> None:
+        """Delete parts written after a checkpoint, such that resuming from it doesn't duplicate results.
+
+        Args:
+            runs: The runs whose parts to consider, e.g. those of one worker's shard, in the order they're executed.
+            after: The (run, step) of the checkpoint. Parts starting after it are deleted; if `None`, all are.
+        """
+        order = {run: position for position, run in enumerate(runs)}
+        for part in self.parts:
+            _, run, step = os.path.splitext(os.path.basename(part))[0].split("-")
+            if int(run) in order and (after is None or (order[int(run)], int(step)) > (order[after[0]], after[1])):
+                os.remove(part)
+
+    def write(self, results: pd.DataFrame) -> None:
+        """Write a batch of results to a new part file.
+
+        Args:
+            results: A batch of results, ordered by run then step.
+        """
+        if results.empty:
+            return
+        run, step = results["run"].iloc[0], results["step"].iloc[0]
+        filename = f"part-{run:08d}-{step:010d}.{self.EXTENSION}"
+        tmp_path = os.path.join(self.path, f".{filename}")
+        self._write_table(pa.Table.from_pandas(results, preserve_index=False), tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, filename))
+
+    def dataset(self) -> ds.Dataset:
+        """Lazily open the results written so far.
+
+        Returns:
+            A pyarrow Dataset over every part file, whose columns have the widest of their types across parts, e.g.
+            `double` for a column promoted from `int` in a later flush.
+        """
+        return open_parts(self.parts, self.FORMAT)
+
+    def read(self) -> pd.DataFrame:
+        """Read the results written so far into memory.
+
+        Returns:
+            A pandas DataFrame of results, ordered by run then step.
+        """
+        results = [self._read_table(part).to_pandas() for part in self.parts]
+        return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+    @abstractmethod
+    def _write_table(self, table: pa.Table, path: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _read_table(self, path: str) -> pa.Table:
+        raise NotImplementedError
+
+
+class FeatherSink(BaseSink):
+    """Stream results to Feather (Arrow IPC) files, one record batch per flush."""
+
+    FORMAT = "feather"
+    EXTENSION = "feather"
+
+    def _write_table(self, table: pa.Table, path: str) -> None:
+        pyarrow.feather.write_feather(table, path)
+
+    def _read_table(self, path: str) -> pa.Table:
+        return pyarrow.feather.read_table(path)
+
+
+class ParquetSink(BaseSink):
+    """Stream results to Parquet files, one row group per flush."""
+
+    FORMAT = "parquet"
+    EXTENSION = "parquet"
+
+    def _write_table(self, table: pa.Table, path: str) -> None:
+        pyarrow.parquet.write_table(table, path, row_group_size=len(table))
+
+    def _read_table(self, path: str) -> pa.Table:
+        return pyarrow.parquet.read_table(path)
+
+
+def open_parts(paths: list[str], format: str) -> ds.Dataset:
+    """Lazily open part files, e.g. a sink's, as one dataset.
+
+    A column's type may differ across parts, e.g. once `ResultsStore` promotes it from `int` to `float` in a later
+    flush, so each column takes the widest of its types.
+
+    Args:
+        paths: The part files.
+        format: The format of the parts, e.g. "feather" or "parquet".
+
+    Returns:
+        A pyarrow Dataset over the parts.
+    """
+    schemas = [ds.dataset(path, format=format).schema for path in paths]
+    if not schemas:
+        return ds.dataset(paths, format=format)
+    fields = []
+    for field in schemas[0]:
+        types = {schema.field(field.name).type for schema in schemas}
+        if len(types) > 1:
+            try:
+                dtype = np.result_type(*(np.dtype(t.to_pandas_dtype()) for t in types))
+                field = field.with_type(pa.from_numpy_dtype(dtype))
+            except (NotImplementedError, TypeError, pa.ArrowNotImplementedError):
+                raise Exception(f"Column {field.name} has incompatible types across parts: {sorted(map(str, types))}")
+        fields.append(field)
+    return ds.dataset(paths, schema=pa.schema(fields, metadata=schemas[0].metadata), format=format)
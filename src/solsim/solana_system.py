@@ -0,0 +1,284 @@
+from abc import ABC, abstractmethod
+from collections.abc import Hashable, Mapping, Sequence
+import functools
+import os
+from typing import Awaitable, Callable, Optional, Any, TypeVar, cast
+
+from anchorpy import close_workspace, create_workspace
+from psutil import Process
+from solana.publickey import PublicKey
+from solana.rpc.api import Client
+from solana.rpc import commitment
+
+from solsim import instrument
+from solsim.accounts import AccountCache, writable_accounts
+from solsim.action import Action, ActionResult, gather_actions
+from solsim.backend import SolanaBackend
+from solsim.history import History
+from solsim.pool import AccountPool
+from solsim.rpc import BatchClient
+from solsim.system import BaseMixin
+from solsim.type import StateType
+from solsim.validator import LocalnetValidator, worker_validator
+
+T = TypeVar("T")
+
+
+class BaseSolanaSystem(ABC, BaseMixin):
+
+    SOLANA_CLUSTER_URI = "http://127.0.0.1:8899"
+
+    # Whether to keep the localnet cluster running across runs, calling `reset` between them. Opt in once `reset`
+    # restores a clean slate; by default, the cluster is restarted for each run, such that no state leaks across runs.
+    REUSE_LOCALNET = False
+
+    # The default maximum number of agent actions, e.g. transactions, in flight at once in `gather_agent_actions`.
+    MAX_CONCURRENT_ACTIONS = 16
+
+    # Whether to cache account reads within each step, invalidating accounts written by transactions sent through
+    # the workspace's programs (see `account_cache`). Disable it for systems that write accounts by other means
+    # mid-step, or call `account_cache.invalidate` after doing so.
+    CACHE_ACCOUNTS = True
+
+    def __init__(
+        self,
+        workspace_dir: str,
+        client: Optional[Client] = None,
+        localnet_process: Optional[Process] = None,
+        validator: Optional[SolanaBackend] = None,
+    ) -> None:
+        self._workspace_dir = workspace_dir
+        validator = validator or worker_validator()
+        # The backend on which programs run: a localnet cluster by default, or e.g. an `EmulatedBackend`.
+        self.validator = validator or LocalnetValidator(
+            workspace_dir, cluster_uri=self.SOLANA_CLUSTER_URI, process=localnet_process
+        )
+        self._rpc: Optional[BatchClient] = None
+        self.account_cache = AccountCache()
+        self._pools: list[AccountPool[Any]] = []
+        self.setup()
+        backend = self._backend
+        self.client = client or (backend and backend.client()) or Client(self.validator.cluster_uri)
+        workspace = backend.workspace() if backend is not None else None
+        self.workspace = (
+            workspace if workspace is not None else create_workspace(self._workspace_dir, url=self.validator.cluster_uri)
+        )
+        for program in self.workspace.values():
+            self._invalidate_on_send(program.provider)
+
+    def __reduce__(self) -> tuple[Callable[..., "BaseSolanaSystem"], tuple[Any, ...]]:
+        # Clients, workspaces and processes can't be pickled, so rebuild the system instead, e.g. such that a worker
+        # process builds its own, connected to the cluster assigned to that worker.
+        return functools.partial(type(self), **self._init_kwargs), self._init_args
+
+    @property
+    def uses_solana(self) -> bool:
+        return True
+
+    @property
+    def uses_localnet(self) -> bool:
+        """Whether the system runs against a localnet cluster, rather than an in-process backend."""
+        return self._backend is None or not self._backend.IN_PROCESS
+
+    @property
+    def rpc(self) -> BatchClient:
+        """An `async` client that pools connections to the cluster and batches requests, opened on first use."""
+        if self._rpc is None:
+            self._rpc = (self._backend and self._backend.rpc()) or BatchClient(self.validator.cluster_uri)
+        return self._rpc
+
+    @property
+    def _backend(self) -> Optional[SolanaBackend]:
+        # Duck-typed validators, e.g. test doubles, are connected to as clusters.
+        return self.validator if isinstance(self.validator, SolanaBackend) else None
+
+    def setup(self) -> None:
+        self.account_cache.clear()
+        self.validator.start()
+
+    def teardown(self) -> None:
+        self.account_cache.clear()
+        if self.REUSE_LOCALNET:
+            self.reset()
+        else:
+            self.validator.stop()
+            self._clear_initialized_pools()
+
+    def reset(self) -> Any:
+        """Reset program and account state between runs on a reused localnet cluster, i.e. if `REUSE_LOCALNET`.
+
+        Implement this to e.g. generate fresh keypairs, such that each run starts from a clean slate.
+        """
+        pass
+
+    def snapshot(self, path: str) -> Any:
+        # Program and account state lives in the cluster's ledger. Subclasses that override this should call it.
+        self.validator.snapshot(os.path.join(path, "ledger"))
+        return None
+
+    def restore(self, snapshot: Any, path: str) -> None:
+        self.account_cache.clear()
+        self._clear_initialized_pools()
+        self.validator.restore(os.path.join(path, "ledger"))
+
+    async def cleanup(self) -> None:
+        try:
+            await close_workspace(self.workspace)
+            if self._rpc is not None:
+                await self._rpc.close()
+                self._rpc = None
+        finally:
+            # A worker's cluster outlives the systems built in that worker, and is stopped when the worker exits.
+            if self.validator is not worker_validator():
+                self.validator.stop()
+
+    @abstractmethod
+    async def initial_step(self) -> Awaitable[StateType]:
+        """Return initial system state.
+
+        This method is `async` because it (presumably) will make RPC calls
+        to the Solana blockchain, which are `async`.
+
+        Returns:
+            The initial state of the system.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def step(self, state: StateType, history: History) -> Awaitable[StateType]:
+        """Return an arbitrary state of the system.
+
+        This method is `async` because it (presumably) will make RPC calls
+        to the Solana blockchain, which are `async`.
+
+        Args:
+            state: The previous system state.
+            history: The history of system states, retaining as many as the system's `HISTORY` declares.
+
+        Returns:
+            The initial state of the system.
+        """
+        raise NotImplementedError
+
+    def get_token_account_balance(
+        self, pubkey: PublicKey, commitment: Optional[commitment.Commitment] = commitment.Confirmed
+    ) -> float:
+        """Get account token balance.
+
+        Args:
+            pubkey: The public key of the account in question.
+
+        Returns:
+            The token balance of the account.
+        """
+        if self.CACHE_ACCOUNTS:
+            cached, cached_balance = self.account_cache.get("balance", pubkey, str(commitment))
+            if cached:
+                self.account_cache.record(hits=1, misses=0)
+                return cast(float, cached_balance)
+        with instrument.timer("rpc"):
+            response = self.client.get_token_account_balance(pubkey, commitment)
+        balance = float(response["result"]["value"]["uiAmount"])
+        if self.CACHE_ACCOUNTS:
+            self.account_cache.record(hits=0, misses=1)
+            slot = response["result"].get("context", {}).get("slot")
+            self.account_cache.put("balance", pubkey, str(commitment), balance, slot)
+        return balance
+
+    async def get_token_account_balances(
+        self, pubkeys: Sequence[PublicKey], commitment: commitment.Commitment = commitment.Confirmed
+    ) -> list[float]:
+        """Get several accounts' token balances in one round trip, without blocking the event loop.
+
+        Args:
+            pubkeys: The public keys of the accounts in question.
+
+        Returns:
+            The token balance of each account.
+        """
+        if not self.CACHE_ACCOUNTS:
+            return await self.rpc.get_token_account_balances(pubkeys, commitment)
+        read = functools.partial(self.rpc.fetch_token_account_balances, commitment=commitment)
+        return await self.account_cache.fetch("balance", pubkeys, commitment, read)
+
+    async def get_multiple_accounts(
+        self, pubkeys: Sequence[PublicKey], commitment: commitment.Commitment = commitment.Confirmed
+    ) -> list[Optional[dict[str, Any]]]:
+        """Get several accounts in one round trip, without blocking the event loop.
+
+        Args:
+            pubkeys: The public keys of the accounts in question.
+
+        Returns:
+            Each account's info, with base64-encoded data, or `None` if the account doesn't exist.
+        """
+        if not self.CACHE_ACCOUNTS:
+            return await self.rpc.get_multiple_accounts(pubkeys, commitment)
+        read = functools.partial(self.rpc.fetch_multiple_accounts, commitment=commitment)
+        return await self.account_cache.fetch("account", pubkeys, commitment, read)
+
+    async def gather_agent_actions(
+        self, actions: Mapping[Hashable, Sequence[Action]], concurrency: Optional[int] = None
+    ) -> dict[Hashable, ActionResult]:
+        """Run independent agents' actions concurrently, and wait for all of them to be confirmed.
+
+        Each agent's actions run in order, e.g. an escrow's `submit` before its `accept`. Should one fail, the
+        agent's remaining actions are skipped, and the failure is reported in its result.
+
+        Args:
+            actions: A mapping from each agent to its sequence of (zero-argument, `async`) actions.
+            concurrency: The maximum number of actions in flight at once. Defaults to `MAX_CONCURRENT_ACTIONS`.
+
+        Returns:
+            A mapping from each agent to the outcome of its actions.
+        """
+        return await gather_actions(actions, concurrency or self.MAX_CONCURRENT_ACTIONS)
+
+    def account_pool(
+        self,
+        factory: Callable[[], T],
+        size: int,
+        initialize: Optional[Callable[[list[T]], Awaitable[Any]]] = None,
+        reusable: bool = True,
+    ) -> AccountPool[T]:
+        """Create a pool of pre-provisioned accounts, which outlives runs on a reused localnet cluster.
+
+        The pool is provisioned before each step, outside of the step's timing, such that leases within steps find
+        the accounts they need, so long as each step leases at most `size` of them.
+
+        Pools of initialized accounts are emptied whenever the cluster's ledger is replaced, i.e. when the cluster
+        is restarted for each run, or restored from a checkpoint. See `AccountPool` for the arguments.
+        """
+        pool = AccountPool(factory, size, initialize, reusable)
+        self._pools.append(pool)
+        return pool
+
+    async def provision_pools(self) -> None:
+        """Top each of the system's account pools back up to its size, which the simulation does before each step."""
+        for pool in self._pools:
+            await pool.provision()
+
+    def _clear_initialized_pools(self) -> None:
+        for pool in self._pools:
+            if pool.initialize is not None:
+                pool.clear()
+
+    def _invalidate_on_send(self, provider: Any) -> None:
+        # Wrap the provider through which a program's `rpc` namespace sends transactions, such that the accounts
+        # they write are dropped from the cache once they're confirmed (or fail).
+        send, send_all = provider.send, provider.send_all
+
+        async def send_and_invalidate(tx: Any, *args: Any, **kwargs: Any) -> Any:
+            try:
+                return await send(tx, *args, **kwargs)
+            finally:
+                self.account_cache.invalidate([*writable_accounts(tx), provider.wallet.public_key])
+
+        async def send_all_and_invalidate(reqs: Sequence[Any], *args: Any, **kwargs: Any) -> Any:
+            try:
+                return await send_all(reqs, *args, **kwargs)
+            finally:
+                for req in reqs:
+                    self.account_cache.invalidate([*writable_accounts(req.tx), provider.wallet.public_key])
+
+        provider.send, provider.send_all = send_and_invalidate, send_all_and_invalidate
@@ -0,0 +1,191 @@
+from collections.abc import Iterable
+import math
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import numpy as np
+
+from solsim.history import History
+from solsim.type import StateType
+
+if TYPE_CHECKING:
+    import queue
+    import threading
+
+
+# A predicate on a run's latest state and history that ends the run once true. For a `VectorizedSystem`, it
+# returns a boolean array of shape `(runs,)`, ending each run for which it is true.
+RunStopCondition = Callable[[StateType, History], Any]
+
+
+def threshold(quantity: str, lower: Optional[float] = None, upper: Optional[float] = None) -> RunStopCondition:
+    """Stop a run once a quantity falls to `lower`, or rises to `upper`, e.g. once a population dies out.
+
+    Args:
+        quantity: The state variable to watch.
+        lower: Stop once the quantity is at or below this value, if given.
+        upper: Stop once the quantity is at or above this value, if given.
+    """
+
+    def stop(state: StateType, history: History) -> Any:
+        value: np.ndarray[Any, Any] = np.asarray(state[quantity])
+        return (value <= (lower if lower is not None else -np.inf)) | (value >= (upper if upper is not None else np.inf))
+
+    return stop
+
+
+def fixed_point(quantities: Iterable[str], atol: float = 0.0) -> RunStopCondition:
+    """Stop a run once some quantities no longer change from one step to the next.
+
+    The previous state is read from `history`, so the system must retain at least 2 states of history.
+
+    Args:
+        quantities: The state variables to watch.
+        atol: The largest change considered to be none.
+    """
+    quantities = list(quantities)
+
+    def stop(state: StateType, history: History) -> Any:
+        if len(history) < 2:
+            return False
+        previous = history[-2]
+        return np.logical_and.reduce(
+            [np.abs(np.asarray(state[qty]) - np.asarray(previous[qty])) <= atol for qty in quantities]
+        )
+
+    return stop
+
+
+class Convergence:
+    """Stops scheduling runs once Monte Carlo estimates of some quantities have converged.
+
+    After each run, the quantities' values in its final state are folded into running means and variances. The
+    simulation starts no further runs once, for every quantity, the width of the confidence interval around its mean
+    (across runs) is at most `tolerance`.
+
+    Args:
+        quantities: The state variables whose mean final values to estimate.
+        tolerance: The largest acceptable confidence interval width.
+        confidence: The confidence level of the intervals.
+        min_runs: The fewest runs to complete before judging convergence, as intervals from few runs are unreliable.
+        relative: Whether `tolerance` is relative to the magnitude of each mean, rather than absolute.
+    """
+
+    def __init__(
+        self,
+        quantities: Iterable[str],
+        tolerance: float,
+        confidence: float = 0.95,
+        min_runs: int = 10,
+        relative: bool = False,
+    ) -> None:
+        self.quantities = sorted(quantities)
+        self.tolerance = tolerance
+        self.confidence = confidence
+        self.min_runs = max(min_runs, 2)
+        self.relative = relative
+        self._z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.reset()
+
+    @property
+    def runs(self) -> int:
+        """The number of runs folded in."""
+        return self._count
+
+    @property
+    def converged(self) -> bool:
+        if self._count < self.min_runs:
+            return False
+        return all(width <= self.tolerance for width in self.widths().values())
+
+    def reset(self) -> None:
+        self._count = 0
+        self._mean = {qty: 0.0 for qty in self.quantities}
+        self._m2 = {qty: 0.0 for qty in self.quantities}
+
+    def update(self, state: StateType) -> None:
+        """Fold in the final state of a run."""
+        self._count += 1
+        for qty in self.quantities:
+            try:
+                value = float(state[qty])
+            except KeyError:
+                raise Exception(f"{qty} not found in state: {state}")
+            delta = value - self._mean[qty]
+            self._mean[qty] += delta / self._count
+            self._m2[qty] += delta * (value - self._mean[qty])
+
+    def merge(self, other: "Convergence") -> None:
+        """Fold in another instance's runs, e.g. those completed before a simulation was interrupted."""
+        count = self._count + other._count
+        if not count:
+            return
+        for qty in self.quantities:
+            delta = other._mean[qty] - self._mean[qty]
+            self._mean[qty] += delta * other._count / count
+            self._m2[qty] += other._m2[qty] + delta ** 2 * self._count * other._count / count
+        self._count = count
+
+    def means(self) -> dict[str, float]:
+        return {qty: self._mean[qty] if self._count else math.nan for qty in self.quantities}
+
+    def widths(self) -> dict[str, float]:
+        """Return the width of each quantity's confidence interval, relative to its mean if `relative`."""
+        widths = {}
+        for qty in self.quantities:
+            if self._count < 2:
+                widths[qty] = math.inf
+                continue
+            width = 2 * self._z * math.sqrt(self._m2[qty] / (self._count - 1) / self._count)
+            if self.relative:
+                width = width / abs(self._mean[qty]) if self._mean[qty] else math.inf
+            widths[qty] = width
+        return widths
+
+    # The simulation reports each finished run to, and asks whether to start the next one of, a "monitor": the
+    # instance itself when runs are serial, or a `RemoteConvergence` in each worker process when they're parallel.
+
+    def report(self, state: StateType) -> None:
+        self.update(state)
+
+    def done(self) -> bool:
+        return self.converged
+
+
+class RemoteConvergence:
+    """Relays the final states of a worker's runs to the parent process, which judges convergence across workers.
+
+    Each report waits until the parent process has folded it in, such that a worker whose run widened an interval
+    past `tolerance` learns so before deciding whether to start another.
+
+    Args:
+        quantities: The state variables whose final values to relay.
+        queue: A queue of workers' positions and final states, which the parent process folds into its `Convergence`.
+        event: An event that the parent process sets while estimates have converged.
+        acknowledgements: A queue on which the parent process acknowledges this worker's reports.
+        position: The worker's position, by which the parent process acknowledges its reports.
+    """
+
+    def __init__(
+        self,
+        quantities: Iterable[str],
+        queue: "queue.Queue[Any]",
+        event: "threading.Event",
+        acknowledgements: "queue.Queue[Any]",
+        position: int,
+    ) -> None:
+        self.quantities = list(quantities)
+        self.queue = queue
+        self.event = event
+        self.acknowledgements = acknowledgements
+        self.position = position
+
+    def report(self, state: StateType) -> None:
+        self.queue.put((self.position, {qty: state[qty] for qty in self.quantities if qty in state}))
+        self.acknowledgements.get()
+
+    def acknowledge(self) -> None:
+        self.acknowledgements.put(True)
+
+    def done(self) -> bool:
+        return self.event.is_set()
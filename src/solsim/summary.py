@@ -0,0 +1,238 @@
+from collections.abc import Iterable, Sequence
+import math
+from typing import TYPE_CHECKING, Any, Dict
+
+import numpy as np
+
+from solsim.type import StateType
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class TDigest:
+    """A mergeable sketch of a distribution, from which quantiles can be estimated in constant memory.
+
+    Values are buffered, then merged into at most ~`compression` weighted centroids, which are smallest, i.e.
+    most accurate, in the distribution's tails (see Dunning & Ertl, "Computing Extremely Accurate Quantiles Using
+    t-Digests", 2019).
+
+    Args:
+        compression: The sketch's size, trading memory for accuracy.
+    """
+
+    def __init__(self, compression: float = 100) -> None:
+        self.compression = compression
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means: np.ndarray[Any, Any] = np.empty(0)
+        self._weights: np.ndarray[Any, Any] = np.empty(0)
+        self._buffer: list[float] = []
+        self._buffer_weights: list[float] = []
+
+    def add(self, value: float, weight: float = 1) -> None:
+        self._buffer.append(value)
+        self._buffer_weights.append(weight)
+        self.count += weight
+        self.min, self.max = min(self.min, value), max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def add_many(self, values: Iterable[float]) -> None:
+        values = np.asarray(values, dtype=float).ravel()
+        if not len(values):
+            return
+        self._buffer.extend(values.tolist())
+        self._buffer_weights.extend([1.0] * len(values))
+        self.count += len(values)
+        self.min, self.max = min(self.min, float(values.min())), max(self.max, float(values.max()))
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        """Fold in another digest, e.g. one built in a worker process."""
+        other._compress()
+        self._buffer.extend(other._means.tolist())
+        self._buffer_weights.extend(other._weights.tolist())
+        self.count += other.count
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        self._compress()
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile.
+
+        Args:
+            q: The quantile, in [0, 1].
+
+        Returns:
+            The estimate, or NaN if the digest is empty.
+        """
+        self._compress()
+        if not self.count:
+            return math.nan
+        # Each centroid sits at the middle of its weight, and the extremes at either end of the distribution.
+        positions: np.ndarray[Any, Any] = np.concatenate([[0], np.cumsum(self._weights) - self._weights / 2, [self.count]])
+        values: np.ndarray[Any, Any] = np.concatenate([[self.min], self._means, [self.max]])
+        return float(np.interp(q * self.count, positions, values))
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        means: np.ndarray[Any, Any] = np.concatenate([self._means, self._buffer])
+        weights: np.ndarray[Any, Any] = np.concatenate([self._weights, self._buffer_weights])
+        self._buffer, self._buffer_weights = [], []
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        merged_means, merged_weights = [means[0]], [weights[0]]
+        q = 0.0
+        limit = self._q_limit(q)
+        for mean, weight in zip(means[1:].tolist(), weights[1:].tolist()):
+            if q + (merged_weights[-1] + weight) / total <= limit:
+                merged_weights[-1] += weight
+                merged_means[-1] += (mean - merged_means[-1]) * weight / merged_weights[-1]
+            else:
+                q += merged_weights[-1] / total
+                limit = self._q_limit(q)
+                merged_means.append(mean)
+                merged_weights.append(weight)
+        self._means, self._weights = np.array(merged_means), np.array(merged_weights)
+
+    def _q_limit(self, q: float) -> float:
+        # The largest quantile that a centroid starting at `q` may reach, under the k1 scale function.
+        k = self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0), 1) - 1) + 1
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+
+class SummaryStore:
+    """Per-step summary statistics of watched quantities across runs, updated as each state is produced.
+
+    Means and variances are updated via Welford's algorithm, and quantiles estimated via t-digests, such that
+    memory depends on the number of steps, not of runs. Stores built from different runs, e.g. in different
+    worker processes, can be merged.
+
+    Args:
+        watchlist: The quantities to summarize, each of which must be numeric.
+        steps_per_run: The number of steps per run.
+        quantiles: The quantiles to estimate.
+        compression: The size of each t-digest, trading memory for accuracy.
+    """
+
+    def __init__(
+        self,
+        watchlist: Iterable[str],
+        steps_per_run: int,
+        quantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95),
+        compression: float = 100,
+    ) -> None:
+        self._watchlist = sorted(watchlist)
+        self.steps_per_run = steps_per_run
+        self.quantiles = list(quantiles)
+        self._count: np.ndarray[Any, Any] = np.zeros(steps_per_run, dtype=np.int64)
+        self._mean: Dict[str, np.ndarray[Any, Any]] = {qty: np.zeros(steps_per_run) for qty in self._watchlist}
+        self._m2: Dict[str, np.ndarray[Any, Any]] = {qty: np.zeros(steps_per_run) for qty in self._watchlist}
+        self._digests = {qty: [TDigest(compression) for _ in range(steps_per_run)] for qty in self._watchlist}
+
+    def __len__(self) -> int:
+        return int(self._count.sum())
+
+    def append(self, run: int, step: int, state: StateType) -> None:
+        """Fold in the watched quantities of a single state.
+
+        Args:
+            run: The run to which the state belongs.
+            step: The step to which the state belongs.
+            state: The system state.
+        """
+        self._count[step] += 1
+        n = self._count[step]
+        for qty in self._watchlist:
+            value = self._value(state, qty)
+            mean = self._mean[qty]
+            delta = value - mean[step]
+            mean[step] += delta / n
+            self._m2[qty][step] += delta * (value - mean[step])
+            self._digests[qty][step].add(value)
+
+    def append_batch(self, step: int, state: StateType) -> None:
+        """Fold in the watched quantities of many runs' states at once, e.g. of a `VectorizedSystem`.
+
+        Args:
+            step: The step to which the states belong.
+            state: The system state, mapping variables to arrays of shape `(runs,)`.
+        """
+        n = None
+        for qty in self._watchlist:
+            values: np.ndarray[Any, Any] = np.asarray(self._value(state, qty), dtype=float).ravel()
+            n = len(values)
+            if n:
+                self._combine(qty, step, n, values.mean(), ((values - values.mean()) ** 2).sum())
+                self._digests[qty][step].add_many(values)
+        if n:
+            self._count[step] += n
+
+    def merge(self, other: "SummaryStore") -> None:
+        """Fold in another store's statistics, e.g. those of another worker's runs."""
+        for qty in self._watchlist:
+            for step in np.flatnonzero(other._count).tolist():
+                self._combine(qty, step, int(other._count[step]), other._mean[qty][step], other._m2[qty][step])
+                self._digests[qty][step].merge(other._digests[qty][step])
+        self._count += other._count
+
+    def clear(self) -> None:
+        """Summaries aren't flushed, so there is nothing to drop."""
+        pass
+
+    def to_frame(self) -> "pd.DataFrame":
+        """Build the summary.
+
+        Returns:
+            A pandas DataFrame with one row per step and watched quantity, and columns `step`, `variable`, then
+            the count, mean, (sample) standard deviation, min, max and each quantile (e.g. `p5` for 0.05) of the
+            quantity across runs.
+        """
+        import pandas as pd
+
+        frames = []
+        steps = np.arange(self.steps_per_run)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = {qty: np.sqrt(self._m2[qty] / (self._count - 1)) for qty in self._watchlist}
+        for qty in self._watchlist:
+            digests = self._digests[qty]
+            frame = {
+                "step": steps,
+                "variable": qty,
+                "count": self._count,
+                "mean": np.where(self._count > 0, self._mean[qty], np.nan),
+                "std": std[qty],
+                "min": [digest.min if digest.count else np.nan for digest in digests],
+                "max": [digest.max if digest.count else np.nan for digest in digests],
+                **{self.quantile_name(q): [digest.quantile(q) for digest in digests] for q in self.quantiles},
+            }
+            frames.append(pd.DataFrame(frame))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["step", "variable"])
+
+    @staticmethod
+    def quantile_name(q: float) -> str:
+        return f"p{q * 100:g}"
+
+    def _combine(self, qty: str, step: int, n_b: int, mean_b: float, m2_b: float) -> None:
+        # Chan et al.'s parallel update of a mean and sum of squared deviations.
+        n_a = self._count[step]
+        n = n_a + n_b
+        delta = mean_b - self._mean[qty][step]
+        self._mean[qty][step] += delta * n_b / n
+        self._m2[qty][step] += m2_b + delta ** 2 * n_a * n_b / n
+
+    @staticmethod
+    def _value(state: StateType, qty: str) -> Any:
+        try:
+            value = state[qty]
+        except KeyError:
+            raise Exception(f"{qty} not found in state: {state}")
+        if type(value) not in (int, float):
+            dtype: np.dtype[Any] = np.asarray(value).dtype
+            if not (np.issubdtype(dtype, np.number) or np.issubdtype(dtype, np.bool_)):
+                raise Exception(f"{qty} must be numeric to be summarized, not {value!r}")
+        return value
@@ -0,0 +1,231 @@
+import asyncio
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+import hashlib
+import itertools
+import json
+import os
+import secrets
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+import feather
+import numpy as np
+import pandas as pd
+
+from solsim.simulation import Simulation
+from solsim.system import BaseSystem, VectorizedSystem
+
+if TYPE_CHECKING:
+    from solsim.solana_system import BaseSolanaSystem
+
+
+SystemFactory = Callable[..., Union[BaseSystem, "BaseSolanaSystem", VectorizedSystem]]
+
+
+class Sweep:
+    """Simulate a system across many combinations of its parameters.
+
+    Each (parameter combination, run) pair is scheduled as a separate job across a pool of processes. Runs are
+    seeded identically across combinations, so differences between combinations aren't masked by noise.
+
+    Args:
+        system_factory: A (picklable, e.g. module-level) callable that builds a system from keyword parameters.
+        watchlist: The quantities to watch.
+        design: The parameter combinations to simulate.
+        seed: The root seed from which each run's seed is derived.
+        output_dir: Optionally, a directory in which to save each combination's results once complete.
+            Combinations already saved therein, with the same seed, watchlist, `runs` and `steps_per_run`, are
+            skipped, e.g. when resuming an interrupted sweep. Unless a `seed` is given, the sweep adopts that of the
+            sweep that last saved results therein, from which `random` and `latin_hypercube` also sample its design.
+    """
+
+    def __init__(
+        self,
+        system_factory: SystemFactory,
+        watchlist: Iterable[str],
+        design: Sequence[Mapping[str, Any]],
+        seed: Optional[int] = None,
+        output_dir: Optional[str] = None,
+    ) -> None:
+        self._system_factory = system_factory
+        self._watchlist = list(watchlist)
+        self._design = [dict(params) for params in design]
+        self._seed = seed if seed is not None else secrets.randbits(128)
+        self._output_dir = output_dir
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            self._persist_seed(seed is not None)
+
+    @classmethod
+    def grid(
+        cls, system_factory: SystemFactory, watchlist: Iterable[str], grid: Mapping[str, Sequence[Any]], **kwargs: Any
+    ) -> "Sweep":
+        """Sweep every combination of the given parameter values.
+
+        Args:
+            grid: A mapping from each parameter to the values it takes.
+        """
+        design = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+        return cls(system_factory, watchlist, design, **kwargs)
+
+    @classmethod
+    def random(
+        cls,
+        system_factory: SystemFactory,
+        watchlist: Iterable[str],
+        bounds: Mapping[str, tuple[float, float]],
+        samples: int,
+        **kwargs: Any,
+    ) -> "Sweep":
+        """Sweep parameter values sampled uniformly at random.
+
+        Args:
+            bounds: A mapping from each parameter to the (low, high) bounds of its values.
+            samples: The number of parameter combinations to sample.
+        """
+        rng = cls._sampling_rng(kwargs)
+        unit = rng.random((samples, len(bounds)))
+        return cls(system_factory, watchlist, cls._scale(unit, bounds), **kwargs)
+
+    @classmethod
+    def latin_hypercube(
+        cls,
+        system_factory: SystemFactory,
+        watchlist: Iterable[str],
+        bounds: Mapping[str, tuple[float, float]],
+        samples: int,
+        **kwargs: Any,
+    ) -> "Sweep":
+        """Sweep parameter values sampled by Latin hypercube, i.e. such that each parameter's range is split into
+        `samples` equal strata, each of which is sampled exactly once.
+
+        Args:
+            bounds: A mapping from each parameter to the (low, high) bounds of its values.
+            samples: The number of parameter combinations to sample.
+        """
+        rng = cls._sampling_rng(kwargs)
+        strata = np.column_stack([rng.permutation(samples) for _ in bounds]) if bounds else np.empty((samples, 0))
+        unit = (strata + rng.random(strata.shape)) / samples
+        return cls(system_factory, watchlist, cls._scale(unit, bounds), **kwargs)
+
+    @classmethod
+    def _sampling_rng(cls, kwargs: dict[str, Any]) -> np.random.Generator:
+        # Sample with the seed the sweep adopts, such that a resumed sweep samples, and skips, the same combinations.
+        if kwargs.get("seed") is None:
+            seed = cls._saved_seed(kwargs.get("output_dir"))
+            kwargs["seed"] = seed if seed is not None else secrets.randbits(128)
+        return np.random.default_rng(kwargs["seed"])
+
+    @property
+    def design(self) -> list[dict[str, Any]]:
+        return self._design
+
+    def run(self, runs: int = 1, steps_per_run: int = 3, workers: int = 1) -> pd.DataFrame:
+        """Run the sweep.
+
+        Args:
+            runs: The number of times to run each parameter combination.
+            steps_per_run: The number of steps in each run.
+            workers: The number of processes across which to schedule (parameter combination, run) jobs.
+
+        Returns:
+            results: A pandas DataFrame containing the results of every combination, with each parameter as an
+                additional index column.
+        """
+        results: dict[int, Optional[pd.DataFrame]] = {
+            i: self._load(params, runs, steps_per_run) for i, params in enumerate(self._design)
+        }
+        pending = [i for i, result in results.items() if result is None]
+        if pending:
+            executor: Executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else _InlineExecutor()
+            with executor:
+                futures: dict[Future[pd.DataFrame], int] = {
+                    executor.submit(
+                        _run_job, self._system_factory, self._design[i], self._watchlist, self._seed, run, steps_per_run
+                    ): i
+                    for i in pending
+                    for run in range(runs)
+                }
+                completed: dict[int, list[pd.DataFrame]] = {i: [] for i in pending}
+                for future in as_completed(futures):
+                    i = futures[future]
+                    completed[i].append(future.result())
+                    if len(completed[i]) == runs:
+                        results[i] = self._collect(self._design[i], completed.pop(i))
+                        self._save(self._design[i], runs, steps_per_run, results[i])
+        return pd.concat([results[i] for i in range(len(self._design))], ignore_index=True)
+
+    def _collect(self, params: Mapping[str, Any], results: list[pd.DataFrame]) -> pd.DataFrame:
+        combined = pd.concat(results, ignore_index=True).sort_values(["run", "step"], ignore_index=True)
+        for i, (param, value) in enumerate(params.items()):
+            combined.insert(i, param, value)
+        return combined
+
+    def _persist_seed(self, seed_given: bool) -> None:
+        # An interrupted sweep, rerun without a seed, must seed its remaining combinations as it would have.
+        saved_seed = self._saved_seed(self._output_dir)
+        if not seed_given and saved_seed is not None:
+            self._seed = saved_seed
+        else:
+            with open(os.path.join(self._output_dir or "", "seed"), "w") as f:
+                f.write(str(self._seed))
+
+    @staticmethod
+    def _saved_seed(output_dir: Optional[str]) -> Optional[int]:
+        path = os.path.join(output_dir, "seed") if output_dir is not None else None
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return int(f.read())
+
+    def _path(self, params: Mapping[str, Any], runs: int, steps_per_run: int) -> Optional[str]:
+        if self._output_dir is None:
+            return None
+        # Results are only reusable by a sweep that would compute the same ones.
+        job = {
+            "params": params,
+            "seed": self._seed,
+            "watchlist": sorted(self._watchlist),
+            "runs": runs,
+            "steps_per_run": steps_per_run,
+        }
+        key = hashlib.sha256(json.dumps(job, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        return os.path.join(self._output_dir, f"params-{key}.feather")
+
+    def _load(self, params: Mapping[str, Any], runs: int, steps_per_run: int) -> Optional[pd.DataFrame]:
+        path = self._path(params, runs, steps_per_run)
+        return feather.read_dataframe(path) if path and os.path.exists(path) else None
+
+    def _save(self, params: Mapping[str, Any], runs: int, steps_per_run: int, results: pd.DataFrame) -> None:
+        path = self._path(params, runs, steps_per_run)
+        if path:
+            feather.write_dataframe(results, path)
+
+    @staticmethod
+    def _scale(unit: np.ndarray[Any, Any], bounds: Mapping[str, tuple[float, float]]) -> list[dict[str, Any]]:
+        low, high = np.array(list(bounds.values()), dtype=float).reshape(-1, 2).T
+        return [dict(zip(bounds, row)) for row in (low + unit * (high - low)).tolist()]
+
+
+class _InlineExecutor(Executor):
+    """Run jobs in the calling process, e.g. when sweeping with a single worker."""
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future[Any]:
+        future: Future[Any] = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+def _run_job(
+    system_factory: SystemFactory,
+    params: Mapping[str, Any],
+    watchlist: Sequence[str],
+    seed: int,
+    run: int,
+    steps_per_run: int,
+) -> pd.DataFrame:
+    simulation = Simulation(system_factory(**params), watchlist, seed=seed)
+    return asyncio.run(simulation._run([run], steps_per_run))
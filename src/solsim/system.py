@@ -1,25 +1,56 @@
 from abc import ABC, abstractmethod
-import time
-import psutil
-import signal
-import subprocess
-from subprocess import DEVNULL
-import tempfile
-from typing import Awaitable, Optional, List, Any
-
-from anchorpy import close_workspace, create_workspace
-from psutil import Process
-from solana.publickey import PublicKey
-from solana.rpc.api import Client
-from solana.rpc import commitment
+from contextlib import AbstractContextManager
+from typing import TYPE_CHECKING, Optional, Any
 
+import numpy as np
+
+from solsim import instrument
+from solsim.history import History
+from solsim.schema import StateSchema
 from solsim.type import StateType
 
+if TYPE_CHECKING:
+    from solsim.solana_system import BaseSolanaSystem as BaseSolanaSystem  # noqa: F401
+
 
 class BaseMixin:
+
+    # How many of the most recent states to pass to `step` as `history`: `None` retains every state, `0` none.
+    HISTORY: Optional[int] = None
+
+    # Optionally, the variables of the system's state and their dtypes, which the simulation checks the watchlist
+    # against before running, and with which it types result columns.
+    STATE: Optional[StateSchema] = None
+
+    _init_args: tuple[Any, ...]
+    _init_kwargs: dict[str, Any]
+    _rng: Optional[np.random.Generator] = None
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> Any:
+        # Record constructor arguments, such that a system can be rebuilt from scratch, e.g. in a worker process.
+        self = super().__new__(cls)
+        self._init_args, self._init_kwargs = args, kwargs
+        return self
+
     @property
     def uses_solana(self) -> bool:
-        return isinstance(self, BaseSolanaSystem)
+        return False
+
+    @property
+    def rng(self) -> np.random.Generator:
+        """The current run's random number generator, e.g. `self.rng.integers(1, 10)` or `self.rng.shuffle(agents)`.
+
+        The simulation seeds a fresh generator before each run from its root `seed` and the run's ID, so draw from it,
+        rather than from `random` or `np.random`, for runs to be reproducible alone and independent in parallel.
+        A `VectorizedSystem` shares one generator across the runs it advances at once.
+        """
+        if self._rng is None:
+            self._rng = np.random.default_rng()
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng: np.random.Generator) -> None:
+        self._rng = rng
 
     def setup(self) -> Any:
         pass
@@ -30,6 +61,35 @@ class BaseMixin:
     def cleanup(self) -> Any:
         pass
 
+    def timer(self, name: str, count: int = 1) -> AbstractContextManager[None]:
+        """Time a block of code, e.g. `with self.timer("pricing"): ...`, if the simulation is being profiled.
+
+        Args:
+            name: The name under which to record the time.
+            count: The number of events the block accounts for.
+        """
+        return instrument.timer(name, count)
+
+    def snapshot(self, path: str) -> Any:
+        """Capture state kept outside of `state` and `history`, e.g. agents, when the simulation checkpoints.
+
+        Args:
+            path: An empty directory in which to store bulky state, e.g. a validator's ledger.
+
+        Returns:
+            Picklable state, passed to `restore` should the simulation resume from this checkpoint.
+        """
+        return None
+
+    def restore(self, snapshot: Any, path: str) -> None:
+        """Restore what `snapshot` captured, when the simulation resumes from a checkpoint.
+
+        Args:
+            snapshot: What `snapshot` returned.
+            path: The directory into which `snapshot` wrote.
+        """
+        pass
+
 
 class BaseSystem(ABC, BaseMixin):
     @abstractmethod
@@ -42,7 +102,7 @@ class BaseSystem(ABC, BaseMixin):
         raise NotImplementedError
 
     @abstractmethod
-    def step(self, state: StateType, history: List[StateType]) -> StateType:
+    def step(self, state: StateType, history: History) -> StateType:
         """Return an arbitrary state of the system.
 
         This method is `async` because it (presumably) will make RPC calls
@@ -50,7 +110,7 @@ class BaseSystem(ABC, BaseMixin):
 
         Args:
             state: The previous system state.
-            history: The full history of system states.
+            history: The history of system states, retaining as many as the system's `HISTORY` declares.
 
         Returns:
             The initial state of the system.
@@ -58,126 +118,43 @@ class BaseSystem(ABC, BaseMixin):
         raise NotImplementedError
 
 
-class BaseSolanaSystem(ABC, BaseMixin):
-
-    SOLANA_CLUSTER_URI = "http://127.0.0.1:8899"
-
-    def __init__(
-        self, workspace_dir: str, client: Optional[Client] = None, localnet_process: Optional[Process] = None
-    ) -> None:
-        self._workspace_dir = workspace_dir
-        self._localnet_process = localnet_process
-        self._localnet_initialized = False
-        self.setup()
-        self.client = client or Client(self.SOLANA_CLUSTER_URI)
-        self.workspace = create_workspace(self._workspace_dir)
-
-    def setup(self) -> None:
-        if not self._localnet_initialized:
-            if not self._localnet_process:
-                self._logfile = tempfile.NamedTemporaryFile()
-                self._localnet = self._start_localnet()
-                print("👆 Starting Solana localnet cluster (~5s) ...")
-                while not self._localnet_ready:
-                    time.sleep(1)
-            else:
-                self._localnet = self._localnet_process
-            self._localnet_initialized = True
-
-    def teardown(self) -> None:
-        if self._localnet_initialized:
-            print("👇 Terminating Solana localnet cluster ...")
-            self._terminate_localnet()
-        self._localnet_initialized = False
-
-    async def cleanup(self) -> None:
-        await close_workspace(self.workspace)
+class VectorizedSystem(ABC, BaseMixin):
+    """A system that advances every run at once.
+
+    Each state variable is a NumPy array of shape `(runs,)`, holding its value in each run. The simulation
+    calls `step` once per step for all runs, rather than once per step per run.
+    """
 
     @abstractmethod
-    async def initial_step(self) -> Awaitable[StateType]:
+    def initial_step(self, runs: int) -> StateType:
         """Return initial system state.
 
-        This method is `async` because it (presumably) will make RPC calls
-        to the Solana blockchain, which are `async`.
+        Args:
+            runs: The number of runs to simulate in lockstep.
 
         Returns:
-            The initial state of the system.
+            The initial state of the system, mapping variables to arrays of shape `(runs,)`.
         """
         raise NotImplementedError
 
     @abstractmethod
-    async def step(self, state: StateType, history: List[StateType]) -> Awaitable[StateType]:
+    def step(self, state: StateType, history: History) -> StateType:
         """Return an arbitrary state of the system.
 
-        This method is `async` because it (presumably) will make RPC calls
-        to the Solana blockchain, which are `async`.
-
         Args:
-            state: The previous system state.
-            history: The full history of system states.
+            state: The previous system state, mapping variables to arrays of shape `(runs,)`.
+            history: The history of system states, retaining as many as the system's `HISTORY` declares.
 
         Returns:
-            The initial state of the system.
+            The current state of the system, mapping variables to arrays of shape `(runs,)`.
         """
         raise NotImplementedError
 
-    def _start_localnet(self) -> subprocess.Popen[Any]:
-        for proc in psutil.process_iter():
-            if proc.name() == "solana-test-validator":
-                self._terminate_processes([proc])
-        return subprocess.Popen(["anchor", "localnet"], cwd=self._workspace_dir, stdout=self._logfile, stderr=DEVNULL)
-
-    @property
-    def _localnet_ready(self) -> bool:
-        lastline = subprocess.check_output(["tail", "-n", "1", self._logfile.name]).decode("utf-8").strip()
-        return "| Processed Slot: " in lastline
 
-    def get_token_account_balance(
-        self, pubkey: PublicKey, commitment: Optional[commitment.Commitment] = commitment.Confirmed
-    ) -> float:
-        """Get account token balance.
+def __getattr__(name: str) -> Any:
+    # The Solana stack dominates solsim's import time, so load it only once a Solana system is used.
+    if name == "BaseSolanaSystem":
+        from solsim import solana_system
 
-        Args:
-            pubkey: The public key of the account in question.
-
-        Returns:
-            The token balance of the account.
-        """
-        return float(self.client.get_token_account_balance(pubkey, commitment)["result"]["value"]["uiAmount"])
-
-    def _terminate_processes(self, kill_list: list[Process], timeout: int = 10) -> None:
-        # Attempt graceful termination first.
-        for p in reversed(kill_list):
-            self._signal_process(p, signal.SIGTERM)
-        _, alive = psutil.wait_procs(kill_list, timeout=timeout)
-
-        # Forcefully terminate procs still running.
-        for p in alive:
-            self._signal_process(p, signal.SIGKILL)
-        _, alive = psutil.wait_procs(kill_list, timeout=timeout)
-
-        if alive:
-            raise Exception(f"could not terminate process {alive}")
-
-    def _terminate_localnet(self) -> None:
-        """
-        Borrowed from https://github.com/pytest-dev/pytest-xprocess/blob/6dac644e7b6b17d9b970f6e9e2bf2ade539841dc/xprocess/xprocess.py#L35.  # noqa E501
-        """
-        parent = psutil.Process(self._localnet.pid)
-        try:
-            kill_list = [parent]
-            kill_list += parent.children(recursive=True)
-            self._terminate_processes(kill_list)
-        except (psutil.Error, ValueError) as err:
-            raise Exception(f"Error while terminating process {err}")
-        else:
-            return
-
-    def _signal_process(self, p: Process, sig: signal.Signals) -> None:
-        """
-        Borrowed from: https://github.com/pytest-dev/pytest-xprocess/blob/6dac644e7b6b17d9b970f6e9e2bf2ade539841dc/xprocess/xprocess.py#L29.  # noqa E501
-        """
-        try:
-            p.send_signal(sig)
-        except psutil.NoSuchProcess:
-            pass
+        return solana_system.BaseSolanaSystem
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
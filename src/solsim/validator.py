@@ -0,0 +1,327 @@
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import json
+import multiprocessing
+from multiprocessing.util import Finalize
+import os
+import shutil
+import signal
+import subprocess
+from subprocess import DEVNULL
+import tempfile
+import time
+from typing import Any, Optional, Union
+import urllib.error
+import urllib.request
+
+import psutil
+from psutil import Process
+
+from solsim.backend import SolanaBackend
+from solsim.instrument import timer
+
+
+_worker_validator: Optional["LocalnetValidator"] = None
+
+
+def worker_validator() -> Optional["LocalnetValidator"]:
+    """Return the validator a `ValidatorPool` assigned to the current worker process, if any."""
+    return _worker_validator
+
+
+class LocalnetValidator(SolanaBackend):
+    """A Solana localnet cluster, started via `anchor localnet`, which can be kept warm across runs.
+
+    Args:
+        workspace_dir: The Anchor workspace whose programs the cluster deploys.
+        cluster_uri: The cluster's RPC endpoint.
+        process: Optionally, an already-running cluster process to adopt instead of starting one.
+        startup_timeout: The number of seconds to wait for the cluster to become healthy.
+        poll_interval: The number of seconds between health checks while waiting.
+    """
+
+    def __init__(
+        self,
+        workspace_dir: str,
+        cluster_uri: str = "http://127.0.0.1:8899",
+        process: Optional[Union[Process, subprocess.Popen[Any]]] = None,
+        startup_timeout: float = 60,
+        poll_interval: float = 0.1,
+    ) -> None:
+        super().__init__(workspace_dir, cluster_uri)
+        self.startup_timeout = startup_timeout
+        self.poll_interval = poll_interval
+        self._adopted_process = process
+        self._process: Optional[Union[Process, subprocess.Popen[Any]]] = None
+        # Whether to restart from the existing ledger, e.g. a restored snapshot, rather than from genesis.
+        self._resume_ledger = False
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None
+
+    @property
+    def ledger_dir(self) -> str:
+        return os.path.join(self.workspace_dir, ".anchor", "test-ledger")
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the cluster answers its `getHealth` RPC endpoint with "ok"."""
+        request = urllib.request.Request(
+            self.cluster_uri,
+            data=json.dumps({"jsonrpc": "2.0", "id": 1, "method": "getHealth"}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=1) as response:
+                return bool(json.load(response).get("result") == "ok")
+        except (urllib.error.URLError, OSError, ValueError):
+            return False
+
+    def start(self) -> None:
+        """Start the cluster, if not already running, and wait until it is healthy."""
+        if self.running:
+            return
+        if self._adopted_process is not None:
+            self._process = self._adopted_process
+            return
+        self._terminate_stale_processes()
+        print("👆 Starting Solana localnet cluster (~5s) ...")
+        self._logfile = tempfile.NamedTemporaryFile()
+        with timer("validator_start"):
+            popen = subprocess.Popen(self._command(), cwd=self.workspace_dir, stdout=self._logfile, stderr=DEVNULL)
+            self._process = popen
+            self._wait_until_healthy(popen)
+
+    def stop(self) -> None:
+        """Terminate the cluster, if running. It restarts from genesis."""
+        self._resume_ledger = False
+        self._stop_process()
+
+    def snapshot(self, path: str) -> None:
+        """Copy the cluster's ledger to a directory.
+
+        The cluster is paused while its ledger is copied, such that the copy is consistent, then restarted from it.
+
+        Args:
+            path: The directory, replaced if it exists.
+        """
+        running = self.running
+        self._stop_process()
+        shutil.rmtree(path, ignore_errors=True)
+        shutil.copytree(self.ledger_dir, path)
+        self._resume_ledger = True
+        if running:
+            self.start()
+
+    def restore(self, path: str) -> None:
+        """Restart the cluster from a ledger copied by `snapshot`.
+
+        Args:
+            path: The directory to which `snapshot` copied the ledger.
+        """
+        self._stop_process()
+        shutil.rmtree(self.ledger_dir, ignore_errors=True)
+        shutil.copytree(path, self.ledger_dir)
+        self._resume_ledger = True
+        self.start()
+
+    def _stop_process(self) -> None:
+        """
+        Borrowed from https://github.com/pytest-dev/pytest-xprocess/blob/6dac644e7b6b17d9b970f6e9e2bf2ade539841dc/xprocess/xprocess.py#L35.  # noqa E501
+        """
+        process, self._process = self._process, None
+        # An adopted process can't be restarted once terminated.
+        self._adopted_process = None
+        if process is None:
+            return
+        print("👇 Terminating Solana localnet cluster ...")
+        parent = psutil.Process(process.pid)
+        try:
+            kill_list = [parent]
+            kill_list += parent.children(recursive=True)
+            self._terminate_processes(kill_list)
+        except (psutil.Error, ValueError) as err:
+            raise Exception(f"Error while terminating process {err}")
+
+    def _command(self) -> list[str]:
+        if self._resume_ledger:
+            # `anchor localnet` always starts from genesis, so run the validator directly on the existing ledger.
+            return ["solana-test-validator", "--ledger", self.ledger_dir]
+        return ["anchor", "localnet"]
+
+    def _terminate_stale_processes(self) -> None:
+        for proc in psutil.process_iter():
+            if proc.name() == "solana-test-validator":
+                self._terminate_processes([proc])
+
+    def _wait_until_healthy(self, popen: subprocess.Popen[Any]) -> None:
+        deadline = time.monotonic() + self.startup_timeout
+        while not self.healthy:
+            if popen.poll() is not None:
+                self._process = None
+                raise Exception(f"Solana localnet cluster exited with code {popen.returncode}")
+            if time.monotonic() > deadline:
+                self.stop()
+                raise Exception(f"Solana localnet cluster not healthy after {self.startup_timeout}s")
+            time.sleep(self.poll_interval)
+
+    def _terminate_processes(self, kill_list: list[Process], timeout: int = 10) -> None:
+        # Attempt graceful termination first.
+        for p in reversed(kill_list):
+            self._signal_process(p, signal.SIGTERM)
+        _, alive = psutil.wait_procs(kill_list, timeout=timeout)
+
+        # Forcefully terminate procs still running.
+        for p in alive:
+            self._signal_process(p, signal.SIGKILL)
+        _, alive = psutil.wait_procs(kill_list, timeout=timeout)
+
+        if alive:
+            raise Exception(f"could not terminate process {alive}")
+
+    def _signal_process(self, p: Process, sig: signal.Signals) -> None:
+        """
+        Borrowed from: https://github.com/pytest-dev/pytest-xprocess/blob/6dac644e7b6b17d9b970f6e9e2bf2ade539841dc/xprocess/xprocess.py#L29.  # noqa E501
+        """
+        try:
+            p.send_signal(sig)
+        except psutil.NoSuchProcess:
+            pass
+
+
+class SolanaTestValidator(LocalnetValidator):
+    """A Solana localnet cluster, started via `solana-test-validator`, on its own ports and ledger.
+
+    Unlike `LocalnetValidator`, several can run on the same machine at once. Every program in the workspace's
+    `target/idl` directory is deployed from its `target/deploy` binary.
+
+    Args:
+        workspace_dir: The Anchor workspace whose programs the cluster deploys.
+        rpc_port: The cluster's RPC port. Its websocket port is `rpc_port + 1`.
+        faucet_port: The cluster's faucet port.
+        gossip_port: The cluster's gossip port.
+        dynamic_port_range: The (first, last) ports from which the cluster allocates the rest of its ports.
+    """
+
+    def __init__(
+        self,
+        workspace_dir: str,
+        rpc_port: int,
+        faucet_port: int,
+        gossip_port: int,
+        dynamic_port_range: tuple[int, int],
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(workspace_dir, cluster_uri=f"http://127.0.0.1:{rpc_port}", **kwargs)
+        self.rpc_port = rpc_port
+        self.faucet_port = faucet_port
+        self.gossip_port = gossip_port
+        self.dynamic_port_range = dynamic_port_range
+        self._ledger_dir: Optional[str] = None
+
+    @property
+    def ledger_dir(self) -> str:
+        if self._ledger_dir is None:
+            self._ledger_dir = tempfile.mkdtemp(prefix="solsim-ledger-")
+        return self._ledger_dir
+
+    def stop(self) -> None:
+        try:
+            super().stop()
+        finally:
+            if self._ledger_dir is not None:
+                shutil.rmtree(self._ledger_dir, ignore_errors=True)
+                self._ledger_dir = None
+
+    def _command(self) -> list[str]:
+        command = [
+            "solana-test-validator",
+            "--ledger",
+            self.ledger_dir,
+            "--rpc-port",
+            str(self.rpc_port),
+            "--faucet-port",
+            str(self.faucet_port),
+            "--gossip-port",
+            str(self.gossip_port),
+            "--dynamic-port-range",
+            "{}-{}".format(*self.dynamic_port_range),
+        ]
+        if self._resume_ledger:
+            return command  # Programs were deployed to the ledger at genesis.
+        command.append("--reset")
+        for idl_path in sorted(glob.glob(os.path.join(self.workspace_dir, "target", "idl", "*.json"))):
+            with open(idl_path) as f:
+                address = json.load(f)["metadata"]["address"]
+            name = os.path.splitext(os.path.basename(idl_path))[0]
+            command += ["--bpf-program", address, os.path.join(self.workspace_dir, "target", "deploy", f"{name}.so")]
+        return command
+
+    def _terminate_stale_processes(self) -> None:
+        pass  # Each cluster has its own ledger, so no other cluster can be stale with respect to it.
+
+
+class ValidatorPool:
+    """A pool of Solana localnet clusters, one per worker process, such that Solana runs can execute in parallel.
+
+    The clusters run on distinct blocks of `PORTS_PER_VALIDATOR` ports, starting at `base_port`.
+
+    Args:
+        workspace_dir: The Anchor workspace whose programs each cluster deploys.
+        size: The number of clusters, i.e. of worker processes.
+        base_port: The first port of the first cluster's block.
+    """
+
+    PORTS_PER_VALIDATOR = 50
+
+    def __init__(self, workspace_dir: str, size: int, base_port: int = 20000) -> None:
+        self.workspace_dir = workspace_dir
+        self.size = size
+        self.base_port = base_port
+
+    def validator(self, slot: int) -> SolanaTestValidator:
+        """Build (without starting) the cluster in a given slot of the pool.
+
+        Args:
+            slot: The index of the cluster in the pool.
+
+        Returns:
+            The cluster.
+        """
+        port = self.base_port + slot * self.PORTS_PER_VALIDATOR
+        return SolanaTestValidator(
+            self.workspace_dir,
+            rpc_port=port,
+            faucet_port=port + 2,
+            gossip_port=port + 3,
+            dynamic_port_range=(port + 10, port + self.PORTS_PER_VALIDATOR - 1),
+        )
+
+    def executor(self) -> ProcessPoolExecutor:
+        """Build a process pool in which each worker is assigned its own cluster.
+
+        Solana systems built in a worker connect to its cluster, which is started on first use and stopped when the
+        worker exits.
+
+        Returns:
+            The process pool.
+        """
+        slots: multiprocessing.Queue[int] = multiprocessing.Queue()
+        for slot in range(self.size):
+            slots.put(slot)
+        return ProcessPoolExecutor(max_workers=self.size, initializer=_assign_validator, initargs=(self, slots))
+
+
+def assign_worker_validator(validator: LocalnetValidator) -> None:
+    """Make a cluster the one to which Solana systems built in the current worker process connect.
+
+    The cluster is stopped when the process exits.
+    """
+    global _worker_validator
+    _worker_validator = validator
+    Finalize(None, validator.stop, exitpriority=10)
+
+
+def _assign_validator(pool: ValidatorPool, slots: "multiprocessing.Queue[int]") -> None:
+    assign_worker_validator(pool.validator(slots.get()))
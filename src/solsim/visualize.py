@@ -2,28 +2,65 @@
 
 import os
 import altair as alt
-import feather
 import streamlit as st
 
-from solsim.simulation import Simulation
+from solsim import explore
 
 
-results = feather.read_dataframe(os.environ["SOLSIM_RESULTS_PATH"])
-idx_cols = Simulation.INDEX_COLS
-watched_vars = [col for col in results.columns if col not in idx_cols]
+RESULTS_PATH = os.environ["SOLSIM_RESULTS_PATH"]
+RESULTS_FORMAT = os.environ.get("SOLSIM_RESULTS_FORMAT", "feather")
+MAX_POINTS = 1_000
+MAX_RUNS_DRAWN = 20
+PAGE_SIZE = 100
+
+
+# Datasets can't be hashed, so cached functions reopen the (lazily read) dataset from its path.
+
+
+@st.experimental_memo
+def load_metadata(path, format):
+    dataset = explore.open_results(path, format)
+    return explore.watched_quantities(dataset), explore.summarize(dataset), explore.run_ids(dataset)
+
+
+@st.experimental_memo(max_entries=8)
+def load_quantities(path, format, quantities, runs=None):
+    return explore.read_quantities(explore.open_results(path, format), quantities, runs)
+
+
+@st.experimental_memo(max_entries=8)
+def load_aggregate(path, format, quantities, band, method):
+    aggregated = explore.aggregate(load_quantities(path, format, quantities), quantities, band)
+    return explore.downsample(aggregated, "step", "mean", MAX_POINTS, by="variable", method=method)
+
+
+@st.experimental_memo(max_entries=8)
+def load_runs(path, format, quantities, runs, method):
+    results = load_quantities(path, format, quantities, runs).melt(explore.INDEX_COLS)
+    results["series"] = results["variable"] + " (run " + results["run"].astype(str) + ")"
+    return explore.downsample(results, "step", "value", MAX_POINTS, by="series", method=method)
+
+
+watched_vars, metadata, run_ids = load_metadata(RESULTS_PATH, RESULTS_FORMAT)
 
 # Sidebar
 
 st.sidebar.image(os.path.join(os.path.dirname(__file__), "../../img/logo.png"))
 
 st.sidebar.markdown("# 👉 Select quantities")
-quantities = st.sidebar.multiselect("State variables or KPIs to explore", watched_vars)
+quantities = tuple(st.sidebar.multiselect("State variables or KPIs to explore", watched_vars))
+
+st.sidebar.markdown("# 🎛️ Display")
+lower, upper = st.sidebar.slider("Quantile band across runs", 0.0, 1.0, (0.05, 0.95), step=0.05)
+method = st.sidebar.selectbox("Downsampling", ["lttb", "min_max"], help="Long series are downsampled for plotting.")
+runs_drawn = tuple(st.sidebar.multiselect("Individual runs to draw", run_ids)[:MAX_RUNS_DRAWN])
+
 st.sidebar.markdown(
     f"""
     # 🧮 Metadata
 
-    - **Runs: {results["run"].max() + 1}**
-    - **Steps per run: {results["step"].max() + 1}**
+    - **Runs: {metadata["runs"]}**
+    - **Steps per run: {metadata["steps_per_run"]}**
     - **Watched quantities: {len(watched_vars)}**
 """
 )
@@ -34,27 +71,27 @@ if quantities:
 
     st.markdown("## 📈 Graph")
 
-    results = results[quantities + idx_cols]
-    charts = []
-
-    for run, group in results.groupby("run"):
-        chart = (
-            alt.Chart(group.melt(idx_cols))
-            .mark_line()
-            .encode(
-                x=alt.X("step", axis=alt.Axis(tickMinStep=1), title="Timestep"),
-                y=alt.Y(
-                    "value",
-                    title="Value",
-                ),
-                color="variable",
-            )
-            .properties(title="Simulation Quantities over Time")
+    aggregated = load_aggregate(RESULTS_PATH, RESULTS_FORMAT, quantities, (lower, upper), method)
+    x = alt.X("step", axis=alt.Axis(tickMinStep=1), title="Timestep")
+    band = alt.Chart(aggregated).mark_area(opacity=0.3).encode(x=x, y="lower", y2="upper", color="variable")
+    mean = (
+        alt.Chart(aggregated)
+        .mark_line()
+        .encode(x=x, y=alt.Y("mean", title="Value"), color="variable")
+        .properties(title=f"Mean, and {lower:.0%}-{upper:.0%} quantile band, across runs")
+    )
+    layers = [band, mean]
+    if runs_drawn:
+        runs = load_runs(RESULTS_PATH, RESULTS_FORMAT, quantities, runs_drawn, method)
+        layers.append(
+            alt.Chart(runs).mark_line(strokeWidth=1, opacity=0.6, strokeDash=[4, 2]).encode(x=x, y="value", detail="series")
         )
-        charts.append(chart)
 
-    st.altair_chart(alt.layer(*charts), use_container_width=True)
+    st.altair_chart(alt.layer(*layers), use_container_width=True)
 
     st.markdown("## 📝 Table")
 
-    st.table(results)
+    results = load_quantities(RESULTS_PATH, RESULTS_FORMAT, quantities)
+    pages = max(-(-len(results) // PAGE_SIZE), 1)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+    st.dataframe(explore.paginate(results, page, PAGE_SIZE))
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+from solana.keypair import Keypair
+from solana.transaction import AccountMeta, Transaction, TransactionInstruction
+
+from solsim.accounts import AccountCache, writable_accounts
+from solsim.instrument import Profiler, activate, deactivate
+from solsim.rpc import BatchClient
+from solsim.simulation import Simulation
+from solsim.system import BaseSolanaSystem
+from solsim.validator import LocalnetValidator
+
+
+class _ValidatorlessLocalnet(LocalnetValidator):
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class BalanceSystem(BaseSolanaSystem):
+    """Reads token balances from an in-memory endpoint, which counts the balances it serves."""
+
+    def __init__(self, workspace_dir):
+        os.makedirs(os.path.join(workspace_dir, "target", "idl"), exist_ok=True)
+        super().__init__(workspace_dir, validator=_ValidatorlessLocalnet(workspace_dir))
+        self.served = []
+        self.balances = {}
+        self._rpc = BatchClient(
+            self.validator.cluster_uri, session=httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+        )
+
+    def _handle(self, request):
+        responses = []
+        for r in json.loads(request.content):
+            self.served.append(r["params"][0])
+            result = {"context": {"slot": 1}, "value": {"uiAmount": self.balances.get(r["params"][0], 0.0)}}
+            responses.append({"jsonrpc": "2.0", "id": r["id"], "result": result})
+        return httpx.Response(200, json=responses)
+
+    async def initial_step(self):
+        return {}
+
+    async def step(self, state, history):
+        return {}
+
+
+@pytest.fixture
+async def system(tmp_path):
+    system = BalanceSystem(str(tmp_path))
+    yield system
+    await system.rpc.close()
+
+
+def reader(calls, values, slot=1):
+    async def read(pubkeys):
+        calls.append(list(pubkeys))
+        return slot, [values[pubkey] for pubkey in pubkeys]
+
+    return read
+
+
+async def test_repeated_reads_are_served_from_the_cache():
+    cache, calls = AccountCache(), []
+    read = reader(calls, {"a": 1, "b": 2, "c": 3})
+    assert await cache.fetch("balance", ["a", "b"], "confirmed", read) == [1, 2]
+    assert await cache.fetch("balance", ["b", "c", "a", "c"], "confirmed", read) == [2, 3, 1, 3]
+    assert calls == [["a", "b"], ["c"]]
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+async def test_entries_are_keyed_by_kind_and_commitment():
+    cache, calls = AccountCache(), []
+    read = reader(calls, {"a": 1})
+    await cache.fetch("balance", ["a"], "confirmed", read)
+    await cache.fetch("balance", ["a"], "finalized", read)
+    await cache.fetch("account", ["a"], "confirmed", read)
+    assert len(calls) == 3
+    assert len(cache) == 3
+
+
+async def test_invalidated_accounts_are_read_again():
+    cache, calls = AccountCache(), []
+    values = {"a": 1, "b": 2}
+    await cache.fetch("balance", ["a", "b"], "confirmed", reader(calls, values))
+    values["a"] = 10
+    cache.invalidate(["a"])
+    assert await cache.fetch("balance", ["a", "b"], "confirmed", reader(calls, values)) == [10, 2]
+    assert calls[-1] == ["a"]
+
+
+async def test_reads_in_flight_during_a_write_are_not_cached():
+    cache = AccountCache()
+
+    async def slow_read(pubkeys):
+        await asyncio.sleep(0.01)
+        return 1, [1 for _ in pubkeys]
+
+    read = asyncio.ensure_future(cache.fetch("balance", ["a"], "confirmed", slow_read))
+    await asyncio.sleep(0)
+    cache.invalidate(["a"])
+    assert await read == [1]
+    assert cache.get("balance", "a", "confirmed") == (False, None)
+
+
+def test_reads_from_earlier_slots_do_not_replace_later_ones():
+    cache = AccountCache()
+    cache.put("balance", "a", "confirmed", 5, slot=10)
+    cache.put("balance", "a", "confirmed", 4, slot=9)
+    assert cache.get("balance", "a", "confirmed") == (True, 5)
+    cache.put("balance", "a", "confirmed", 6, slot=11)
+    assert cache.get("balance", "a", "confirmed") == (True, 6)
+
+
+async def test_hits_and_misses_are_profiled():
+    cache, profiler = AccountCache(), Profiler()
+    token = activate(profiler)
+    try:
+        await cache.fetch("balance", ["a", "b"], "confirmed", reader([], {"a": 1, "b": 2}))
+        await cache.fetch("balance", ["a"], "confirmed", reader([], {}))
+    finally:
+        deactivate(token)
+    summary = profiler.summary()
+    assert summary.loc["account_cache_miss", "count"] == 2
+    assert summary.loc["account_cache_hit", "count"] == 1
+
+
+def test_writable_accounts_of_a_transaction():
+    writable, readonly, payer = (Keypair().public_key for _ in range(3))
+    instruction = TransactionInstruction(
+        keys=[AccountMeta(writable, is_signer=False, is_writable=True), AccountMeta(readonly, False, False)],
+        program_id=Keypair().public_key,
+    )
+    tx = Transaction(fee_payer=payer).add(instruction)
+    assert writable_accounts(tx) == [writable, payer]
+
+
+async def test_system_reads_balances_once_until_written(system):
+    pubkeys = [Keypair().public_key for _ in range(3)]
+    system.balances = {str(pubkey): 5.0 for pubkey in pubkeys}
+    assert await system.get_token_account_balances(pubkeys) == [5.0] * 3
+    assert await system.get_token_account_balances(pubkeys) == [5.0] * 3
+    assert len(system.served) == 3
+
+    class Provider:
+        wallet = Keypair()
+
+        async def send(self, tx, signers=None, opts=None):
+            system.balances[str(pubkeys[0])] = 1.0
+
+        async def send_all(self, reqs, opts=None):
+            pass
+
+    provider = Provider()
+    system._invalidate_on_send(provider)
+    instruction = TransactionInstruction(
+        keys=[AccountMeta(pubkeys[0], is_signer=False, is_writable=True)], program_id=Keypair().public_key
+    )
+    await provider.send(Transaction().add(instruction))
+    assert await system.get_token_account_balances(pubkeys) == [1.0, 5.0, 5.0]
+    assert system.served[3:] == [str(pubkeys[0])]
+    assert (system.account_cache.hits, system.account_cache.misses) == (5, 4)
+
+
+async def test_caching_can_be_disabled(system):
+    system.CACHE_ACCOUNTS = False
+    pubkeys = [Keypair().public_key]
+    await system.get_token_account_balances(pubkeys)
+    await system.get_token_account_balances(pubkeys)
+    assert len(system.served) == 2
+
+
+class SteppingBalanceSystem(BalanceSystem):
+    """Reads a balance twice per step, then writes it by means the cache can't see."""
+
+    def __init__(self, workspace_dir):
+        super().__init__(workspace_dir)
+        self.pubkey = Keypair().public_key
+
+    async def initial_step(self):
+        return await self.step({}, [])
+
+    async def step(self, state, history):
+        await self.get_token_account_balances([self.pubkey])
+        (balance,) = await self.get_token_account_balances([self.pubkey])
+        self.balances[str(self.pubkey)] = balance + 1
+        return {"balance": balance}
+
+
+def test_accounts_are_cached_within_a_step(tmp_path):
+    system = SteppingBalanceSystem(str(tmp_path))
+    results = Simulation(system, ["balance"]).run(steps_per_run=3)
+    assert results["balance"].tolist() == [0.0, 1.0, 2.0]
+    assert len(system.served) == 3
@@ -0,0 +1,45 @@
+import asyncio
+
+from solsim.action import gather_actions
+
+
+async def test_gather_actions_preserves_per_agent_order_and_limits_concurrency():
+    log, in_flight, peak = [], [0], [0]
+
+    def action(agent, name):
+        async def run():
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.01)
+            log.append((agent, name))
+            in_flight[0] -= 1
+            return name
+
+        return run
+
+    actions = {agent: [action(agent, "submit"), action(agent, "accept")] for agent in range(5)}
+    results = await gather_actions(actions, concurrency=2)
+
+    assert peak[0] == 2
+    assert all(result.ok and result.results == ["submit", "accept"] for result in results.values())
+    for agent in range(5):
+        assert log.index((agent, "submit")) < log.index((agent, "accept"))
+
+
+async def test_gather_actions_reports_failures_per_agent():
+    accepted = []
+
+    async def fail():
+        raise RuntimeError("submit failed")
+
+    async def accept():
+        accepted.append(True)
+
+    async def succeed():
+        return "ok"
+
+    results = await gather_actions({"a": [fail, accept], "b": [succeed]})
+
+    assert not results["a"].ok and isinstance(results["a"].error, RuntimeError)
+    assert results["b"].ok and results["b"].results == ["ok"]
+    assert accepted == []
@@ -0,0 +1,38 @@
+import json
+
+from benchmarks.suite import SUITE, compare, measure, record, select
+
+
+BASELINE = {"sim": {"steps_per_second": 1000, "peak_rss_bytes": 100 * 2 ** 20}}
+
+
+def test_compare_flags_slowdowns_and_memory_growth_beyond_tolerance():
+    within = {"sim": {"steps_per_second": 850, "peak_rss_bytes": 110 * 2 ** 20}}
+    assert compare(within, BASELINE, tolerance=0.2) == []
+
+    slower = {"sim": {"steps_per_second": 700, "peak_rss_bytes": 100 * 2 ** 20}}
+    (regression,) = compare(slower, BASELINE, tolerance=0.2)
+    assert "700 steps/s, down from 1,000" in regression
+
+    bigger = {"sim": {"steps_per_second": 1000, "peak_rss_bytes": 130 * 2 ** 20}}
+    (regression,) = compare(bigger, BASELINE, tolerance=0.2)
+    assert "130 MiB peak RSS, up from 100" in regression
+
+    assert compare({"new": slower["sim"]}, BASELINE) == []
+
+
+def test_suite_names_are_unique():
+    names = [benchmark.name for benchmark in SUITE]
+    assert len(names) == len(set(names))
+
+
+def test_quick_mock_rpc_benchmark_runs_without_a_validator(tmp_path):
+    (benchmark,) = select("mock_rpc*", quick=True)
+    result = measure(benchmark, repeat=1)
+    assert result["steps_per_second"] > 0 and result["peak_rss_bytes"] > 0
+
+    path = tmp_path / "history.jsonl"
+    record({benchmark.name: result}, quick=True, path=str(path))
+    record({benchmark.name: result}, quick=True, path=str(path))
+    entries = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(entries) == 2 and entries[0]["results"] == {benchmark.name: result}
@@ -0,0 +1,106 @@
+import os
+
+import pandas as pd
+import pytest
+
+from examples.lotka_volterra.system import LotkaVolterraSystem, VectorizedLotkaVolterraSystem
+from solsim.cache import ResultCache
+from solsim.simulation import Simulation
+from solsim.system import BaseSystem
+
+
+class CountingWalkSystem(BaseSystem):
+    """A random walk that counts the runs it executes, across instances."""
+
+    executed = []
+
+    def __init__(self, drift=0):
+        self.drift = drift
+
+    def initial_step(self):
+        CountingWalkSystem.executed.append(None)
+        return {"position": 0}
+
+    def step(self, state, history):
+        return {"position": state["position"] + self.drift + int(self.rng.choice([-1, 1]))}
+
+
+@pytest.fixture(autouse=True)
+def reset_executed():
+    CountingWalkSystem.executed = []
+
+
+def simulate(cache, runs, drift=0, seed=1, **kwargs):
+    return Simulation(CountingWalkSystem(drift), ["position"], seed=seed, cache=cache).run(
+        runs=runs, steps_per_run=10, **kwargs
+    )
+
+
+def test_cached_runs_are_not_recomputed(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    first = simulate(cache, runs=4)
+    second = simulate(cache, runs=4)
+    assert len(CountingWalkSystem.executed) == 4
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_partial_hits_compute_only_missing_runs(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    simulate(cache, runs=3)
+    results = simulate(cache, runs=5)
+    assert len(CountingWalkSystem.executed) == 5
+    expected = Simulation(CountingWalkSystem(), ["position"], seed=1).run(runs=5, steps_per_run=10)
+    pd.testing.assert_frame_equal(results, expected)
+
+
+def test_parallel_misses_are_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    parallel = simulate(cache, runs=4, workers=2)
+    serial = simulate(cache, runs=4)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_key_depends_on_params_seed_and_steps(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    key = cache.key(CountingWalkSystem(0), ["position"], 10, 1)
+    assert key == cache.key(CountingWalkSystem(0), ["position"], 10, 1)
+    assert key != cache.key(CountingWalkSystem(1), ["position"], 10, 1)
+    assert key != cache.key(CountingWalkSystem(0), ["position"], 10, 2)
+    assert key != cache.key(CountingWalkSystem(0), ["position"], 20, 1)
+    assert key != cache.key(LotkaVolterraSystem(50, 1000, 0.01, 0.1), ["position"], 10, 1)
+
+
+def test_emulated_systems_hit_the_cache(tmp_path, mocker):
+    from examples.drunken_escrow.emulator import escrow_backend
+    from examples.drunken_escrow.system import DrunkenEscrowSystem
+
+    workspace_dir = os.path.join(os.path.dirname(__file__), "..", "examples", "drunken_escrow", "anchor-escrow-program")
+    initial_step = mocker.spy(DrunkenEscrowSystem, "initial_step")
+    cache = ResultCache(str(tmp_path))
+
+    def simulate():
+        system = DrunkenEscrowSystem(workspace_dir, 100, num_escrows=3, validator=escrow_backend(workspace_dir))
+        return Simulation(system, ["num_swaps"], seed=1, cache=cache).run(runs=2, steps_per_run=4)
+
+    first, second = simulate(), simulate()
+    assert initial_step.call_count == 2
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_least_recently_used_runs_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    simulate(cache, runs=4)
+    cache.max_bytes = cache.size - 1
+    key = cache.key(CountingWalkSystem(), ["position"], 10, 1)
+    for i, run in enumerate([1, 0, 3, 2]):
+        os.utime(cache._run_path(key, run), (i, i))
+    cache.evict()
+    assert sorted(cache.get(key, range(4))) == [0, 2, 3]
+
+
+def test_cache_requires_seed_and_unvectorized_system(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    with pytest.raises(Exception, match="seed"):
+        Simulation(CountingWalkSystem(), ["position"], cache=cache)
+    with pytest.raises(Exception, match="Vectorized"):
+        Simulation(VectorizedLotkaVolterraSystem(50, 1000, 0.01, 0.1), ["food_supply"], seed=1, cache=cache)
@@ -0,0 +1,158 @@
+import os
+import random
+
+import pandas as pd
+import pytest
+
+from solsim.checkpoint import Checkpoint
+from solsim.simulation import Simulation
+from solsim.sink import ParquetSink
+from solsim.system import BaseSystem
+from solsim.validator import LocalnetValidator, SolanaTestValidator
+
+
+class CrashingWalkSystem(BaseSystem):
+    """A random walk, with momentum from the last two states, that optionally crashes at a given (run, step)."""
+
+    HISTORY = 2
+
+    def __init__(self, crash_at=None):
+        self.crash_at = crash_at
+        self.steps_taken = 0
+
+    def initial_step(self):
+        return {"position": 0, "steps_taken": self.steps_taken}
+
+    def step(self, state, history):
+        if (state["run"], state["step"] + 1) == self.crash_at:
+            raise KeyboardInterrupt
+        self.steps_taken += 1
+        momentum = history[-1]["position"] - history[-2]["position"] if len(history) > 1 else 0
+        return {"position": state["position"] + momentum + random.choice([-1, 1]), "steps_taken": self.steps_taken}
+
+    def snapshot(self, path):
+        return self.steps_taken
+
+    def restore(self, snapshot, path):
+        self.steps_taken = snapshot
+
+
+WATCHLIST = ("position", "steps_taken")
+
+
+def run_interrupted(tmp_path, crash_at, workers=1, sink=None, runs=4, **kwargs):
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    simulation = Simulation(CrashingWalkSystem(crash_at), WATCHLIST, checkpoint_dir=checkpoint_dir, sink=sink, **kwargs)
+    with pytest.raises(BaseException):
+        simulation.run(runs=runs, steps_per_run=10, workers=workers)
+    simulation = Simulation(CrashingWalkSystem(), WATCHLIST, checkpoint_dir=checkpoint_dir, sink=sink, **kwargs)
+    return simulation.run(runs=runs, steps_per_run=10, workers=workers, resume=True)
+
+
+def test_resumed_simulation_matches_uninterrupted_one(tmp_path):
+    expected = Simulation(CrashingWalkSystem(), WATCHLIST, seed=7).run(runs=4, steps_per_run=10)
+    resumed = run_interrupted(tmp_path, crash_at=(2, 6), seed=7, checkpoint_every=3)
+    pd.testing.assert_frame_equal(resumed, expected)
+
+
+def test_resumed_simulation_with_sink_writes_each_row_once(tmp_path):
+    expected = Simulation(CrashingWalkSystem(), WATCHLIST, seed=7).run(runs=4, steps_per_run=10)
+    sink = ParquetSink(str(tmp_path / "results"), flush_every=4)
+    resumed = run_interrupted(tmp_path, crash_at=(1, 8), sink=sink, seed=7, checkpoint_every=5)
+    pd.testing.assert_frame_equal(resumed, expected, check_dtype=False)
+
+
+def test_simulation_of_unordered_runs_resumes_after_its_checkpoint(tmp_path):
+    runs = [3, 0, 2, 1]
+    expected = Simulation(CrashingWalkSystem(), WATCHLIST, seed=7).run(runs=runs, steps_per_run=10)
+    sink = ParquetSink(str(tmp_path / "results"), flush_every=4)
+    resumed = run_interrupted(tmp_path, crash_at=(2, 6), sink=sink, runs=runs, seed=7, checkpoint_every=3)
+    # A sink's parts are named, and so read, by the run and step with which each starts.
+    resumed = resumed.sort_values(["run", "step"], ignore_index=True)
+    expected = expected.sort_values(["run", "step"], ignore_index=True)
+    pd.testing.assert_frame_equal(resumed, expected, check_dtype=False)
+
+
+def test_parallel_simulation_resumes_each_shard(tmp_path):
+    expected = Simulation(CrashingWalkSystem(), WATCHLIST, seed=7).run(runs=4, steps_per_run=10, workers=2)
+    resumed = run_interrupted(tmp_path, crash_at=(3, 4), workers=2, seed=7, checkpoint_every=3)
+    pd.testing.assert_frame_equal(resumed, expected)
+
+
+def test_resume_adopts_the_checkpointed_seed(tmp_path):
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    simulation = Simulation(CrashingWalkSystem(crash_at=(1, 2)), WATCHLIST, checkpoint_dir=checkpoint_dir)
+    with pytest.raises(KeyboardInterrupt):
+        simulation.run(runs=2, steps_per_run=5)
+    resumed = Simulation(CrashingWalkSystem(), WATCHLIST, checkpoint_dir=checkpoint_dir, checkpoint_every=1)
+    expected = Simulation(CrashingWalkSystem(), WATCHLIST, seed=simulation._seed)
+    pd.testing.assert_frame_equal(resumed.run(runs=2, steps_per_run=5, resume=True), expected.run(runs=2, steps_per_run=5))
+
+
+def test_resume_requires_the_same_runs_and_steps(tmp_path):
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    Simulation(CrashingWalkSystem(), WATCHLIST, seed=0, checkpoint_dir=checkpoint_dir, checkpoint_every=2).run(2, 5)
+    simulation = Simulation(CrashingWalkSystem(), WATCHLIST, checkpoint_dir=checkpoint_dir)
+    with pytest.raises(Exception, match="resume with the same"):
+        simulation.run(runs=2, steps_per_run=6, resume=True)
+    with pytest.raises(Exception, match="seed 0, not 1"):
+        Simulation(CrashingWalkSystem(), WATCHLIST, seed=1, checkpoint_dir=checkpoint_dir).run(2, 5, resume=True)
+    with pytest.raises(Exception, match="checkpoint_dir"):
+        Simulation(CrashingWalkSystem(), WATCHLIST).run(resume=True)
+
+
+def test_fresh_run_discards_previous_checkpoints(tmp_path):
+    checkpoint_dir = tmp_path / "checkpoints"
+    simulation = Simulation(CrashingWalkSystem(), WATCHLIST, checkpoint_dir=str(checkpoint_dir), checkpoint_every=2)
+    simulation.run(runs=2, steps_per_run=5)
+    simulation.run(runs=2, steps_per_run=5)
+    assert [path for path in os.listdir(checkpoint_dir) if path.endswith(".pkl")] == ["checkpoint-0000.pkl"]
+    # The seed, the checkpoint, and its system directory and the file that records it.
+    assert len(os.listdir(checkpoint_dir)) == 4
+
+
+def test_checkpoints_replace_their_predecessors_without_reading_them(mocker, tmp_path):
+    load = mocker.spy(Checkpoint, "load")
+    checkpoint_dir = tmp_path / "checkpoints"
+    Simulation(CrashingWalkSystem(), WATCHLIST, checkpoint_dir=str(checkpoint_dir), checkpoint_every=1).run(2, 5)
+    load.assert_not_called()
+    assert len([path for path in os.listdir(checkpoint_dir) if "-system-" in path]) == 1
+
+
+@pytest.mark.parametrize("validator_cls", [LocalnetValidator, SolanaTestValidator])
+def test_validator_restarts_from_restored_ledger(mocker, tmp_path, validator_cls):
+    mocker.patch.object(validator_cls, "start")
+    if validator_cls is LocalnetValidator:
+        validator = LocalnetValidator(str(tmp_path))
+    else:
+        validator = SolanaTestValidator(str(tmp_path), 20000, 20002, 20003, (20010, 20049))
+    os.makedirs(validator.ledger_dir, exist_ok=True)
+    (tmp_path / "snapshot").mkdir()
+    (tmp_path / "snapshot" / "genesis.bin").write_bytes(b"ledger")
+
+    validator.restore(str(tmp_path / "snapshot"))
+
+    with open(os.path.join(validator.ledger_dir, "genesis.bin"), "rb") as f:
+        assert f.read() == b"ledger"
+    command = validator._command()
+    assert command[:3] == ["solana-test-validator", "--ledger", validator.ledger_dir]
+    assert "--reset" not in command and "--bpf-program" not in command
+    validator.stop()
+    assert validator._command()[0] == ("anchor" if validator_cls is LocalnetValidator else "solana-test-validator")
+
+
+class GeneratorWalkSystem(CrashingWalkSystem):
+    def step(self, state, history):
+        if (state["run"], state["step"] + 1) == self.crash_at:
+            raise KeyboardInterrupt
+        return {"position": state["position"] + int(self.rng.choice([-1, 1])), "steps_taken": 0}
+
+
+def test_resumed_simulation_restores_system_generator(tmp_path):
+    expected = Simulation(GeneratorWalkSystem(), WATCHLIST, seed=7).run(runs=2, steps_per_run=10)
+    checkpoint_dir = str(tmp_path / "checkpoints")
+    kwargs = dict(seed=7, checkpoint_dir=checkpoint_dir, checkpoint_every=3)
+    with pytest.raises(BaseException):
+        Simulation(GeneratorWalkSystem(crash_at=(1, 8)), WATCHLIST, **kwargs).run(runs=2, steps_per_run=10)
+    resumed = Simulation(GeneratorWalkSystem(), WATCHLIST, **kwargs).run(runs=2, steps_per_run=10, resume=True)
+    pd.testing.assert_frame_equal(resumed, expected)
@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+
+import pandas as pd
+import pytest
+
+from solsim.distributed import Coordinator, Worker
+from solsim.simulation import Simulation
+from solsim.sink import FeatherSink
+from solsim.system import BaseSystem
+
+
+class WalkSystem(BaseSystem):
+    """A random walk that crashes its worker process, or raises, at a given run.
+
+    Args:
+        crash_at_run: The run at which to kill the worker process, once, recording that it did in `marker`.
+        marker: The file recording that the worker was killed.
+        fail_at_run: The run at which to raise, each time it's attempted.
+    """
+
+    def __init__(self, crash_at_run=None, marker=None, fail_at_run=None):
+        self.crash_at_run = crash_at_run
+        self.marker = marker
+        self.fail_at_run = fail_at_run
+
+    def initial_step(self):
+        return {"position": 0}
+
+    def step(self, state, history):
+        if state["run"] == self.crash_at_run and not os.path.exists(self.marker):
+            open(self.marker, "w").close()
+            os._exit(1)
+        if state["run"] == self.fail_at_run:
+            raise ValueError("Boom")
+        return {"position": state["position"] + int(self.rng.choice([-1, 1]))}
+
+
+def distribute(coordinator, workers=2, authkey=None):
+    # Forked workers would inherit, and hold open, the coordinator's socket.
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=Worker(coordinator.url, authkey or coordinator.authkey, poll_seconds=0.1).run)
+        for _ in range(workers)
+    ]
+    coordinator.start()
+    for process in processes:
+        process.start()
+    try:
+        return coordinator.wait(timeout=60)
+    finally:
+        coordinator.stop()
+        for process in processes:
+            process.join(timeout=10)
+
+
+def test_distributed_results_match_local_ones():
+    expected = Simulation(WalkSystem(), ["position"], seed=0).run(runs=8, steps_per_run=5)
+    results = distribute(Coordinator(Simulation(WalkSystem(), ["position"], seed=0), runs=8, steps_per_run=5), workers=3)
+    pd.testing.assert_frame_equal(results, expected)
+
+
+def test_runs_of_crashed_workers_are_reassigned(tmp_path):
+    system = WalkSystem(crash_at_run=3, marker=str(tmp_path / "crashed"))
+    coordinator = Coordinator(Simulation(system, ["position"], seed=0), runs=6, steps_per_run=5, lease_seconds=2)
+    results = distribute(coordinator)
+    assert os.path.exists(tmp_path / "crashed")
+    expected = Simulation(WalkSystem(), ["position"], seed=0).run(runs=6, steps_per_run=5)
+    pd.testing.assert_frame_equal(results, expected)
+
+
+def test_runs_that_keep_failing_fail_the_simulation():
+    system = WalkSystem(fail_at_run=2)
+    coordinator = Coordinator(Simulation(system, ["position"], seed=0), runs=4, steps_per_run=5, max_attempts=2)
+    with pytest.raises(Exception, match="Run 2 failed 2 time"):
+        distribute(coordinator)
+
+
+def test_summaries_are_merged():
+    kwargs = dict(seed=0, summarize=True)
+    expected = Simulation(WalkSystem(), ["position"], **kwargs).run(runs=6, steps_per_run=5)
+    results = distribute(Coordinator(Simulation(WalkSystem(), ["position"], **kwargs), runs=6, steps_per_run=5))
+    pd.testing.assert_frame_equal(results, expected)
+
+
+def test_workers_need_the_authkey():
+    coordinator = Coordinator(Simulation(WalkSystem(), ["position"], seed=0), runs=1, steps_per_run=5)
+    with coordinator:
+        with pytest.raises(Exception, match="authkey"):
+            Worker(coordinator.url, "wrong").run()
+        assert Worker(coordinator.url, coordinator.authkey).run() == 1
+        assert len(coordinator.wait(timeout=10)) == 5
+
+
+def test_distributed_results_replace_those_previously_written_to_the_sink(tmp_path):
+    sink = FeatherSink(str(tmp_path), flush_every=5)
+    Simulation(WalkSystem(), ["position"], seed=0, sink=sink).run(runs=6, steps_per_run=5)
+    coordinator = Coordinator(Simulation(WalkSystem(), ["position"], seed=0, sink=sink), runs=2, steps_per_run=5)
+    results = distribute(coordinator)
+    assert sorted(results["run"].unique()) == [0, 1]
+    assert len(results) == 2 * 5
+
+
+def test_workers_stop_once_the_coordinator_resets_their_connection(mocker):
+    coordinator = Coordinator(Simulation(WalkSystem(), ["position"], seed=0), runs=1, steps_per_run=5)
+    request = Worker._request
+
+    def reset_leases(worker, method, path, body=b""):
+        if path == "/lease":
+            raise ConnectionResetError
+        return request(worker, method, path, body)
+
+    mocker.patch.object(Worker, "_request", autospec=True, side_effect=reset_leases)
+    with coordinator:
+        assert Worker(coordinator.url, coordinator.authkey).run() == 0
+
+
+def test_a_worker_runs_solana_systems_for_each_of_its_tasks():
+    from examples.drunken_escrow.emulator import escrow_backend
+    from examples.drunken_escrow.system import DrunkenEscrowSystem
+
+    workspace_dir = os.path.join(os.path.dirname(__file__), "..", "examples", "drunken_escrow", "anchor-escrow-program")
+
+    def simulation():
+        system = DrunkenEscrowSystem(workspace_dir, 100, num_escrows=3, validator=escrow_backend(workspace_dir))
+        return Simulation(system, ["num_swaps", "mean_balance_spread"], seed=0)
+
+    expected = simulation().run(runs=3, steps_per_run=4)
+    coordinator = Coordinator(simulation(), runs=3, steps_per_run=4)
+    with coordinator:
+        assert Worker(coordinator.url, coordinator.authkey).run() == 3
+        results = coordinator.wait(timeout=30)
+    pd.testing.assert_frame_equal(results, expected)
@@ -0,0 +1,146 @@
+from anchorpy import Context
+import pytest
+from solana.keypair import Keypair
+
+from solsim.emulator import EmulatedBackend, Emulator, EmulatedInstruction, EmulatedTransaction
+from solsim.simulation import Simulation
+from solsim.system import BaseSolanaSystem
+
+
+def init_vault(emulator, *, accounts, signers):
+    emulator.create_mint(accounts["mint"])
+    emulator.create_token_account(accounts["vault"], accounts["mint"], accounts["mint"])
+    emulator.mint_to(accounts["vault"], 100)
+
+
+def open_account(emulator, *, accounts, signers):
+    emulator.create_token_account(accounts["account"], accounts["mint"], signers[0].public_key)
+
+
+def withdraw(emulator, amount, *, accounts, signers):
+    emulator.transfer(accounts["vault"], accounts["account"], amount)
+
+
+PROGRAMS = {"faucet": {"init_vault": init_vault, "open_account": open_account, "withdraw": withdraw}}
+
+
+class FaucetSystem(BaseSolanaSystem):
+    """Agents withdraw from a faucet's vault, until it runs dry."""
+
+    REUSE_LOCALNET = False  # The emulator starts afresh each run.
+
+    def __init__(self, workspace_dir, num_agents):
+        super().__init__(workspace_dir, validator=EmulatedBackend(workspace_dir, PROGRAMS))
+        self.faucet = self.workspace["faucet"]
+        self.num_agents = num_agents
+        self.mint, self.vault = Keypair().public_key, Keypair().public_key
+        self.agents = [Keypair() for _ in range(num_agents)]
+        self.accounts = [Keypair().public_key for _ in range(num_agents)]
+
+    async def initial_step(self):
+        await self.faucet.rpc["init_vault"](ctx=Context(accounts={"mint": self.mint, "vault": self.vault}))
+        for agent, account in zip(self.agents, self.accounts):
+            await self.faucet.rpc["open_account"](
+                ctx=Context(accounts={"account": account, "mint": self.mint}, signers=[agent])
+            )
+        return await self._state()
+
+    async def step(self, state, history):
+        actions = {}
+        for agent, account in enumerate(self.accounts):
+
+            async def take(account=account):
+                await self.faucet.rpc["withdraw"](10, ctx=Context(accounts={"vault": self.vault, "account": account}))
+
+            actions[agent] = [take]
+        await self.gather_agent_actions(actions)
+        return await self._state()
+
+    async def _state(self):
+        vault, *balances = await self.get_token_account_balances([self.vault, *self.accounts])
+        return {"vault": vault, "total": sum(balances)}
+
+
+def test_transfers_move_tokens_between_accounts_of_a_mint():
+    emulator, mint, other_mint = Emulator(), "mint", "other"
+    emulator.create_mint(mint)
+    emulator.create_mint(other_mint)
+    emulator.create_token_account("a", mint, "alice")
+    emulator.create_token_account("b", mint, "bob")
+    emulator.create_token_account("c", other_mint, "carol")
+    emulator.mint_to("a", 10)
+    emulator.transfer("a", "b", 4)
+    assert (emulator.token_balance("a"), emulator.token_balance("b")) == (6, 4)
+    with pytest.raises(Exception, match="Insufficient funds"):
+        emulator.transfer("a", "b", 7)
+    with pytest.raises(Exception, match="different mints"):
+        emulator.transfer("a", "c", 1)
+
+
+async def test_failed_transactions_are_rolled_back():
+    emulator = Emulator()
+    emulator.create_mint("mint")
+    emulator.create_token_account("vault", "mint", "faucet")
+    emulator.mint_to("vault", 15)
+    accounts = {"vault": "vault", "account": "mine", "mint": "mint"}
+    signers = [Keypair()]
+    tx = EmulatedTransaction(
+        [
+            EmulatedInstruction(open_account, (), accounts, signers),
+            EmulatedInstruction(withdraw, (10,), accounts, signers),
+            EmulatedInstruction(withdraw, (10,), accounts, signers),
+        ]
+    )
+    with pytest.raises(Exception, match="Insufficient funds"):
+        await emulator.execute(tx)
+    assert not emulator.exists("mine")
+    assert emulator.token_balance("vault") == 15
+    assert emulator.slot == 0
+
+    assert await emulator.execute(EmulatedTransaction(tx.instructions[:2])) == "emulated-1"
+    assert (emulator.token_balance("vault"), emulator.token_balance("mine")) == (5, 10)
+
+
+async def test_system_reads_and_writes_through_the_emulator(tmp_path):
+    system = FaucetSystem(str(tmp_path), num_agents=2)
+    try:
+        state = await system.initial_step()
+        assert state == {"vault": 100.0, "total": 0.0}
+        state = await system.step(state, [])
+        assert state == {"vault": 80.0, "total": 20.0}
+        assert system.client.get_account_info(system.vault)["result"]["value"] is not None
+        (info,) = await system.get_multiple_accounts([system.mint])
+        assert info is not None
+    finally:
+        await system.cleanup()
+
+
+def test_emulated_systems_run_in_parallel_without_a_cluster(tmp_path):
+    system = FaucetSystem(str(tmp_path), num_agents=3)
+    assert not system.uses_localnet
+    results = Simulation(system, watchlist=("vault", "total")).run(runs=2, steps_per_run=5, workers=2)
+    assert results.groupby("run")["vault"].last().tolist() == [0.0, 0.0]
+    assert results.groupby("run")["total"].last().tolist() == [100.0, 100.0]
+
+
+def test_snapshots_restore_accounts(tmp_path):
+    backend = EmulatedBackend(str(tmp_path), PROGRAMS)
+    backend.start()
+    backend.emulator.create_mint("mint", decimals=2)
+    backend.snapshot(str(tmp_path / "ledger"))
+    backend.stop()
+    assert not backend.emulator.exists("mint")
+    backend.restore(str(tmp_path / "ledger"))
+    assert backend.emulator.account("mint").decimals == 2
+    assert backend.emulator.exists(backend.wallet.public_key)
+
+
+def test_program_ids_are_read_from_idls(tmp_path):
+    program_id = Keypair().public_key
+    (tmp_path / "target" / "idl").mkdir(parents=True)
+    (tmp_path / "target" / "idl" / "faucet.json").write_text(
+        f'{{"name": "faucet", "metadata": {{"address": "{program_id}"}}}}'
+    )
+    backend = EmulatedBackend(str(tmp_path), PROGRAMS)
+    assert backend.workspace()["faucet"].program_id == program_id
+    assert backend.source_files() == [__file__]
@@ -1,3 +1,4 @@
+import pandas as pd
 import pytest
 
 
@@ -12,3 +13,40 @@ def test_drunken_escrow():
     from examples.drunken_escrow.run import main
 
     main(num_escrows=1, steps_per_run=1)
+
+
+def test_emulated_drunken_escrow():
+    from examples.drunken_escrow.run import main
+
+    results = main(num_escrows=3, steps_per_run=4, emulated=True)
+    assert len(results) == 4
+    assert (results["num_swaps"] > 0).any()
+
+
+def test_emulated_drunken_escrow_provisions_swap_states_between_steps():
+    import os
+
+    from examples.drunken_escrow.emulator import escrow_backend
+    from examples.drunken_escrow.system import DrunkenEscrowSystem
+    from solsim.instrument import Profiler
+    from solsim.simulation import Simulation
+
+    workspace_dir = os.path.join(os.path.dirname(__file__), "..", "examples", "drunken_escrow", "anchor-escrow-program")
+    system = DrunkenEscrowSystem(workspace_dir, 100, num_escrows=3, validator=escrow_backend(workspace_dir))
+    profiler = Profiler()
+    Simulation(system, watchlist=("num_swaps",), profiler=profiler).run(steps_per_run=4)
+    summary = profiler.summary()
+    assert summary.loc["provision_pools", "count"] == 4
+    assert "account_pool_provision" not in summary.index
+
+
+def test_vectorized_lotka_volterra_matches_lotka_volterra():
+    from examples.lotka_volterra.system import LotkaVolterraSystem, VectorizedLotkaVolterraSystem
+    from solsim.simulation import Simulation
+
+    params = dict(population_size=50, food_supply=1000, reproduction_rate=0.01, consumption_rate=0.1)
+    watchlist = ("population_size", "food_supply")
+    expected = Simulation(LotkaVolterraSystem(**params), watchlist).run(runs=3, steps_per_run=10)
+    actual = Simulation(VectorizedLotkaVolterraSystem(**params), watchlist).run(runs=3, steps_per_run=10)
+
+    pd.testing.assert_frame_equal(expected, actual)
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from solsim import explore
+from solsim.sink import FeatherSink, ParquetSink
+
+
+@pytest.fixture(scope="function")
+def results():
+    runs, steps = 4, 50
+    return pd.DataFrame(
+        {
+            "step": np.tile(np.arange(steps), runs),
+            "run": np.repeat(np.arange(runs), steps),
+            "a": np.arange(runs * steps, dtype=float),
+            "b": np.repeat(np.arange(runs), steps) * 10.0,
+        }
+    )
+
+
+@pytest.mark.parametrize("sink_cls", [FeatherSink, ParquetSink])
+def test_reads_only_selected_quantities_and_runs(tmp_path, results, sink_cls):
+    sink = sink_cls(str(tmp_path), flush_every=30)
+    for start in range(0, len(results), 30):
+        sink.write(results.iloc[start : start + 30])  # noqa: E203
+    dataset = explore.open_results(sink.path, sink.FORMAT)
+
+    assert explore.watched_quantities(dataset) == ["a", "b"]
+    assert explore.summarize(dataset) == {"runs": 4, "steps_per_run": 50, "rows": 200}
+    subset = explore.read_quantities(dataset, ["b"], runs=[1, 3])
+    assert list(subset.columns) == ["step", "run", "b"]
+    assert sorted(subset["run"].unique()) == [1, 3]
+
+
+def test_run_ids_are_those_in_the_results(tmp_path, results):
+    sink = FeatherSink(str(tmp_path))
+    sink.write(results[results["run"].isin([3, 1])].sort_values(["run", "step"]))
+    assert explore.run_ids(explore.open_results(sink.path, sink.FORMAT)) == [1, 3]
+
+
+def test_aggregate_computes_mean_and_quantile_band_per_step(results):
+    aggregated = explore.aggregate(results, ["a", "b"], band=(0.0, 1.0))
+
+    assert list(aggregated.columns) == ["step", "variable", "mean", "median", "lower", "upper"]
+    assert len(aggregated) == 2 * 50
+    first = aggregated[(aggregated["variable"] == "b") & (aggregated["step"] == 0)].iloc[0]
+    assert (first["mean"], first["median"], first["lower"], first["upper"]) == (15.0, 15.0, 0.0, 30.0)
+
+
+@pytest.mark.parametrize("method", ["lttb", "min_max"])
+def test_downsampling_keeps_the_series_shape(method):
+    x = np.arange(10_000)
+    y = np.sin(x / 500) + (x == 1234) * 5.0  # A spike, which a shape-preserving downsampler keeps.
+    selected = explore.DOWNSAMPLERS[method](x, y, 200)
+
+    assert len(selected) <= 200
+    assert np.all(np.diff(selected) > 0)
+    assert 1234 in selected
+    assert y[selected].min() == pytest.approx(-1, abs=1e-3)
+    if method == "lttb":
+        assert selected[0] == 0 and selected[-1] == len(x) - 1
+
+
+def test_downsample_applies_per_series(results):
+    long = results.melt(explore.INDEX_COLS)
+    downsampled = explore.downsample(long[long["run"] == 0], "step", "value", 10, by="variable")
+
+    assert downsampled.groupby("variable").size().to_dict() == {"a": 10, "b": 10}
+    # Short series are left as is.
+    assert len(explore.downsample(long, "step", "value", 1_000, by="run")) == len(long)
+
+
+def test_paginate(results):
+    assert explore.paginate(results, page=2, page_size=30)["a"].tolist() == list(np.arange(30, 60, dtype=float))
+    assert len(explore.paginate(results, page=7, page_size=30)) == 20
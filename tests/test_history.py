@@ -0,0 +1,58 @@
+import pytest
+
+from solsim.history import History
+from solsim.simulation import Simulation
+from solsim.system import BaseSystem
+
+
+class LookbackSystem(BaseSystem):
+
+    HISTORY = 2
+
+    def initial_step(self):
+        return {"a": 0, "lookback": None}
+
+    def step(self, state, history):
+        return {"a": len(history), "lookback": history[-2]["a"] if len(history) > 1 else None}
+
+
+def test_history_retains_last_k_states():
+    history = History(maxlen=2)
+    for step in range(5):
+        history.append({"step": step})
+
+    assert len(history) == 5
+    assert history[-1] == {"step": 4}
+    assert history[3] == {"step": 3}
+    assert history[-2:] == [{"step": 3}, {"step": 4}]
+    with pytest.raises(IndexError, match="no longer retained"):
+        history[0]
+    with pytest.raises(IndexError, match="out of range"):
+        history[5]
+
+
+def test_iterating_history_covers_retained_states():
+    history = History(maxlen=2)
+    for step in range(5):
+        history.append({"step": step})
+
+    assert list(history) == [{"step": 3}, {"step": 4}]
+    assert list(reversed(history)) == [{"step": 4}, {"step": 3}]
+    assert {"step": 4} in history
+    assert {"step": 0} not in history
+
+
+def test_history_retaining_nothing_still_counts_states():
+    history = History(maxlen=0)
+    history.append({"step": 0})
+
+    assert len(history) == 1
+    with pytest.raises(IndexError):
+        history[-1]
+
+
+def test_simulation_passes_bounded_history():
+    results = Simulation(LookbackSystem(), watchlist=("a", "lookback")).run(steps_per_run=4)
+
+    assert results["a"].tolist() == [0, 1, 2, 3]
+    assert results["lookback"].tolist() == [None, None, 0, 1]
@@ -0,0 +1,36 @@
+import json
+import re
+import subprocess
+import sys
+
+
+# Modules that pure-Python simulations never use, and so must not pay to import.
+HEAVY_MODULES = ["anchorpy", "solana", "spl", "psutil", "httpx", "pandas", "pyarrow", "feather", "typer", "streamlit"]
+
+# The most that importing `solsim.simulation` may cost, as a fraction of the cost of importing pandas and anchorpy.
+IMPORT_TIME_BUDGET = 0.5
+
+
+def run_python(*args):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def import_time(module):
+    # `-X importtime` reports each module's cumulative import time, in microseconds, on stderr. Modules imported at
+    # the top level, rather than by another module, aren't indented.
+    stderr = run_python("-X", "importtime", "-c", f"import {module}").stderr
+    return sum(int(match) for match in re.findall(r"^import time:\s+\d+ \|\s+(\d+) \| \S", stderr, re.MULTILINE))
+
+
+def test_importing_solsim_does_not_load_heavy_dependencies():
+    code = (
+        "import json, sys\n"
+        "import solsim.history, solsim.instrument, solsim.results, solsim.simulation, solsim.system\n"
+        f"print(json.dumps([module for module in {HEAVY_MODULES!r} if module in sys.modules]))"
+    )
+    assert json.loads(run_python("-c", code).stdout) == []
+
+
+def test_import_time_is_within_budget():
+    solsim_import_time = import_time("solsim.simulation")
+    assert solsim_import_time < IMPORT_TIME_BUDGET * import_time("pandas, anchorpy")
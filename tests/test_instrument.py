@@ -0,0 +1,78 @@
+from solsim import instrument
+from solsim.instrument import Profiler
+from solsim.simulation import Simulation
+from solsim.system import BaseSystem
+
+
+class TimedSystem(BaseSystem):
+    def initial_step(self):
+        return {"x": 0}
+
+    def step(self, state, history):
+        with self.timer("custom"):
+            return {"x": state["x"] + 1}
+
+
+def test_timer_is_a_no_op_without_an_active_profiler():
+    assert instrument.active_profiler() is None
+    with instrument.timer("anything"):
+        pass
+
+
+def test_profiler_records_events_tagged_by_run_and_step():
+    profiler = Profiler()
+    token = instrument.activate(profiler)
+    try:
+        profiler.run, profiler.step = 3, 7
+        with instrument.timer("rpc", count=5):
+            pass
+    finally:
+        instrument.deactivate(token)
+
+    metrics = profiler.metrics()
+    assert list(metrics.columns) == Profiler.COLUMNS
+    assert metrics[["run", "step", "name", "count"]].values.tolist() == [[3, 7, "rpc", 5]]
+    assert instrument.active_profiler() is None
+
+
+def test_simulation_records_phase_timings():
+    profiler = Profiler(trace_memory=True)
+    simulation = Simulation(TimedSystem(), ["x"], profiler=profiler)
+    simulation.run(runs=2, steps_per_run=3)
+
+    metrics = simulation.metrics
+    counts = metrics.groupby("name").size().to_dict()
+    assert counts == {
+        "setup": 2,
+        "initial_step": 2,
+        "step": 4,
+        "custom": 4,
+        "record": 6,
+        "wall": 6,
+        "teardown": 2,
+        "cleanup": 1,
+    }
+    assert set(metrics[metrics["name"] == "step"]["step"]) == {1, 2}
+    assert set(metrics[metrics["name"] == "setup"]["step"]) == {-1}
+    assert (metrics["seconds"] >= 0).all()
+    assert profiler.peak_memory["rss"] > 0 and profiler.peak_memory["traced"] > 0
+    assert profiler.summary().loc["step", "count"] == 4
+
+    # Each call to `run` starts afresh.
+    simulation.run(runs=1, steps_per_run=3)
+    assert len(simulation.metrics[simulation.metrics["name"] == "setup"]) == 1
+
+
+def test_parallel_simulation_merges_worker_metrics():
+    simulation = Simulation(TimedSystem(), ["x"], profiler=Profiler())
+    simulation.run(runs=4, steps_per_run=3, workers=2)
+
+    metrics = simulation.metrics
+    assert sorted(metrics[metrics["name"] == "setup"]["run"]) == [0, 1, 2, 3]
+    assert len(metrics[metrics["name"] == "cleanup"]) == 2
+
+
+def test_simulation_without_profiler_has_no_metrics():
+    simulation = Simulation(TimedSystem(), ["x"])
+    simulation.run(runs=1, steps_per_run=2)
+    assert simulation.metrics is None
@@ -0,0 +1,84 @@
+import itertools
+import os
+
+from solsim.instrument import Profiler, activate, deactivate
+from solsim.pool import AccountPool
+from solsim.system import BaseSolanaSystem
+from solsim.validator import LocalnetValidator
+
+
+class _ValidatorlessLocalnet(LocalnetValidator):
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class PooledSystem(BaseSolanaSystem):
+    REUSE_LOCALNET = False
+
+    def __init__(self, workspace_dir):
+        os.makedirs(os.path.join(workspace_dir, "target", "idl"), exist_ok=True)
+        super().__init__(workspace_dir, validator=_ValidatorlessLocalnet(workspace_dir))
+        self.keypairs = self.account_pool(object, size=2)
+        self.accounts = self.account_pool(object, size=2, initialize=self._initialize)
+
+    async def _initialize(self, accounts):
+        pass
+
+    async def initial_step(self):
+        return {}
+
+    async def step(self, state, history):
+        return {}
+
+
+def counter():
+    return itertools.count().__next__
+
+
+async def test_accounts_are_provisioned_in_bulk_and_recycled():
+    batches = []
+
+    async def initialize(accounts):
+        batches.append(list(accounts))
+
+    pool = AccountPool(counter(), size=3, initialize=initialize)
+    await pool.provision()
+    assert batches == [[0, 1, 2]]
+    leased = await pool.lease(2)
+    assert leased == [0, 1]
+    assert (pool.available, pool.leased) == (1, 2)
+    pool.release(leased)
+    assert await pool.lease(3) == [2, 0, 1]
+    assert batches == [[0, 1, 2]]
+
+
+async def test_used_up_accounts_are_replenished():
+    pool = AccountPool(counter(), size=2, reusable=False)
+    await pool.provision()
+    pool.release(await pool.lease(2))
+    assert pool.available == 0
+    await pool.provision()
+    assert await pool.lease(2) == [2, 3]
+
+
+async def test_shortfalls_are_provisioned_and_profiled():
+    pool, profiler = AccountPool(counter(), size=1), Profiler()
+    await pool.provision()
+    token = activate(profiler)
+    try:
+        assert await pool.lease(3) == [0, 1, 2]
+    finally:
+        deactivate(token)
+    assert profiler.summary().loc["account_pool_provision", "count"] == 2
+
+
+async def test_initialized_pools_are_cleared_with_the_ledger(tmp_path):
+    system = PooledSystem(str(tmp_path))
+    await system.keypairs.provision()
+    await system.accounts.provision()
+    system.teardown()
+    assert system.keypairs.available == 2
+    assert system.accounts.available == 0
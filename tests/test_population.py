@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from solsim.population import Population
+from solsim.simulation import Simulation
+from solsim.system import BaseSystem
+
+
+class WealthExchangeSystem(BaseSystem):
+    """Agents paired at random each step, the poorer of each pair giving a unit to the richer if it can."""
+
+    def __init__(self, num_agents=10_000):
+        self.num_agents = num_agents
+
+    def initial_step(self):
+        self.agents = Population(self.num_agents, balance=10)
+        return {"total_balance": int(self.agents["balance"].sum()), "num_broke": 0}
+
+    def step(self, state, history):
+        pairs = self.agents.pair(self.rng)
+        balances = self.agents["balance"][pairs]
+        giver = np.where(balances[:, 0] <= balances[:, 1], pairs[:, 0], pairs[:, 1])
+        receiver = np.where(balances[:, 0] <= balances[:, 1], pairs[:, 1], pairs[:, 0])
+        can_give = self.agents["balance"][giver] > 0
+        self.agents["balance"][giver[can_give]] -= 1
+        self.agents["balance"][receiver[can_give]] += 1
+        return {"total_balance": int(self.agents["balance"].sum()), "num_broke": int((self.agents["balance"] == 0).sum())}
+
+
+def test_columns_broadcast_and_validate_length():
+    population = Population(3, ids=["a", "b", "c"], balance=5, risk=[0.1, 0.2, 0.3])
+    assert population["balance"].tolist() == [5, 5, 5]
+    assert population.names == ["balance", "risk"]
+    population["balance"] += 1
+    assert population["balance"].tolist() == [6, 6, 6]
+    with pytest.raises(Exception, match="2 values"):
+        population["risk"] = [1, 2]
+    with pytest.raises(Exception, match="not found"):
+        population["missing"]
+
+
+def test_sub_populations_and_updates():
+    population = Population(4, ids=[(0, 0), (1, 1), (2, 2), (3, 3)], balance=[0, 5, 0, 7])
+    rich = population[population["balance"] > 0]
+    assert len(rich) == 2
+    assert rich.ids.tolist() == [(1, 1), (3, 3)]
+    rich["balance"][:] = 0
+    assert population["balance"].tolist() == [0, 5, 0, 7]
+    population.update(population["balance"] > 0, balance=[1, 2])
+    assert population["balance"].tolist() == [0, 1, 0, 2]
+
+
+def test_append_and_keep():
+    population = Population(2, ids=["a", "b"], balance=[1, 2], alive=True)
+    population.append(2, ids=["c", "d"], balance=3)
+    assert population["balance"].tolist() == [1, 2, 3, 3]
+    assert population["alive"].tolist() == [True, True, False, False]
+    population.keep(population["alive"])
+    assert len(population) == 2
+    assert population.ids.tolist() == ["a", "b"]
+    with pytest.raises(Exception, match="not found"):
+        population.append(1, ids=["e"], wealth=1)
+
+
+def test_pairs_are_disjoint_and_cover_all_but_one():
+    population = Population(11)
+    pairs = population.pair(np.random.default_rng(0))
+    assert pairs.shape == (5, 2)
+    assert len(set(pairs.ravel())) == 10
+    among = population.pair(np.random.default_rng(0), among=np.arange(11) < 4)
+    assert set(among.ravel()) == {0, 1, 2, 3}
+
+
+def test_match_draws_from_each_group():
+    population = Population(6, buyer=[True, True, True, False, False, True])
+    matches = population.match(population["buyer"], ~population["buyer"], np.random.default_rng(0))
+    assert matches.shape == (2, 2)
+    assert population["buyer"][matches[:, 0]].all()
+    assert not population["buyer"][matches[:, 1]].any()
+    assert len(set(matches[:, 0])) == 2
+
+
+def test_policies_are_evaluated_per_strategy():
+    population = Population(5, strategy=[0, 1, 0, 1, 1], balance=[10, 10, 20, 20, 30])
+    calls = []
+
+    def cautious(agents, rng):
+        calls.append(len(agents))
+        return agents["balance"] // 10
+
+    def bold(agents, rng):
+        calls.append(len(agents))
+        return agents["balance"] / 2
+
+    bids = population.evaluate([cautious, bold], np.random.default_rng(0), by="strategy")
+    assert bids.tolist() == [1, 5, 2, 10, 15]
+    assert calls == [2, 3]
+    assert population.evaluate(lambda agents, rng: 1, np.random.default_rng(0)).tolist() == [1] * 5
+    with pytest.raises(Exception, match="decisions"):
+        population.evaluate(lambda agents, rng: [1, 2], np.random.default_rng(0))
+
+
+def test_simulation_with_many_agents():
+    results = Simulation(WealthExchangeSystem(), ["total_balance", "num_broke"], seed=0).run(runs=2, steps_per_run=50)
+    assert (results["total_balance"] == 100_000).all()
+    assert results.groupby("run")["num_broke"].last().gt(0).all()
+
+
+def test_object_columns_keep_one_entry_per_agent():
+    population = Population(2, account=[("a", 1), ("b", 2)])
+    assert population["account"].shape == (2,)
+    assert population["account"][1] == ("b", 2)
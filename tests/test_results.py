@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from solsim.results import ResultsStore
+
+
+def test_results_store_grows_past_capacity():
+    store = ResultsStore(watchlist=("a",), capacity=2)
+    for step in range(5):
+        store.append(run=0, step=step, state={"a": step, "b": "unwatched"})
+    results = store.to_frame()
+
+    assert list(results.columns) == ["step", "run", "a"]
+    assert results["a"].tolist() == list(range(5))
+    assert results["step"].dtype == np.int64
+
+
+def test_results_store_promotes_dtypes():
+    store = ResultsStore(watchlist=("a", "b"))
+    store.append(run=0, step=0, state={"a": 1, "b": 1})
+    store.append(run=0, step=1, state={"a": 1.5, "b": "x"})
+    results = store.to_frame()
+
+    assert results["a"].tolist() == [1.0, 1.5]
+    assert results["b"].tolist() == [1, "x"]
+
+
+def test_results_store_keeps_integers_that_overflow_int64():
+    store = ResultsStore(watchlist=("lamports",))
+    store.append(run=0, step=0, state={"lamports": 1})
+    store.append(run=0, step=1, state={"lamports": 2 ** 64 - 1})
+    results = store.to_frame()
+
+    assert results["lamports"].tolist() == [1, 2 ** 64 - 1]
+
+
+def test_results_store_frame_views_buffers():
+    store = ResultsStore(watchlist=("a",))
+    store.append(run=0, step=0, state={"a": 1.0})
+    results = store.to_frame()
+
+    assert np.shares_memory(results["a"].values, store._columns["a"])
+
+
+def test_results_store_raises_on_missing_quantity():
+    store = ResultsStore(watchlist=("a",))
+    with pytest.raises(Exception, match="a not found in state"):
+        store.append(run=0, step=0, state={"b": 1})
@@ -0,0 +1,61 @@
+import json
+
+import httpx
+import pytest
+from solana.keypair import Keypair
+
+from solsim.rpc import BatchClient
+
+
+@pytest.fixture(scope="function")
+def requests():
+    return []
+
+
+@pytest.fixture(scope="function")
+async def client(requests):
+    def handle(request):
+        payload = json.loads(request.content)
+        requests.append(payload)
+        responses = []
+        for r in payload:
+            if r["method"] == "getTokenAccountBalance":
+                result = {"value": {"uiAmount": float(len(r["params"][0]))}}
+            elif r["method"] == "getMultipleAccounts":
+                result = {"value": [{"lamports": 1} for _ in r["params"][0]]}
+            else:
+                responses.append({"jsonrpc": "2.0", "id": r["id"], "error": {"message": "unknown method"}})
+                continue
+            responses.append({"jsonrpc": "2.0", "id": r["id"], "result": result})
+        return httpx.Response(200, json=list(reversed(responses)))
+
+    client = BatchClient("http://127.0.0.1:8899", session=httpx.AsyncClient(transport=httpx.MockTransport(handle)))
+    yield client
+    await client.close()
+
+
+async def test_token_account_balances_fetched_in_one_round_trip(client, requests):
+    pubkeys = [Keypair().public_key for _ in range(10)]
+    balances = await client.get_token_account_balances(pubkeys)
+
+    assert len(requests) == 1
+    assert [r["params"][0] for r in requests[0]] == [str(pubkey) for pubkey in pubkeys]
+    assert balances == [float(len(str(pubkey))) for pubkey in pubkeys]
+
+
+async def test_multiple_accounts_chunked_into_one_batch(client, requests):
+    accounts = await client.get_multiple_accounts([Keypair().public_key for _ in range(250)])
+
+    assert len(requests) == 1
+    assert [len(r["params"][0]) for r in requests[0]] == [100, 100, 50]
+    assert len(accounts) == 250
+
+
+async def test_batch_raises_on_error(client):
+    with pytest.raises(Exception, match="getFoo request failed"):
+        await client.batch([("getFoo", [])])
+
+
+async def test_empty_batch_makes_no_request(client, requests):
+    assert await client.get_token_account_balances([]) == []
+    assert requests == []
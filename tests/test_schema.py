@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from examples.lotka_volterra.system import LotkaVolterraSystem, VectorizedLotkaVolterraSystem
+from solsim.schema import StateSchema
+from solsim.simulation import Simulation
+from solsim.system import BaseSystem
+
+
+WATCHLIST = ("population_size", "food_supply")
+PARAMS = dict(population_size=50, food_supply=1000, reproduction_rate=0.01, consumption_rate=0.1)
+
+
+class TypedLotkaVolterraSystem(LotkaVolterraSystem):
+    STATE = StateSchema(population_size=float, food_supply=np.float32)
+
+
+class TypedVectorizedLotkaVolterraSystem(VectorizedLotkaVolterraSystem):
+    STATE = StateSchema(population_size=float, food_supply=np.float32)
+
+
+class CounterSystem(BaseSystem):
+    STATE = StateSchema(count=np.int32)
+
+    def __init__(self, extra=None):
+        self.extra = extra
+
+    def initial_step(self):
+        return {"count": 0} if self.extra is None else {"count": 0, self.extra: 0}
+
+    def step(self, state, history):
+        return {"count": state["count"] + 1}
+
+
+def test_watchlist_is_checked_before_running():
+    with pytest.raises(Exception, match="aren't declared"):
+        Simulation(CounterSystem(), ["count", "total"])
+
+
+def test_results_have_declared_dtypes():
+    results = Simulation(TypedLotkaVolterraSystem(**PARAMS), WATCHLIST).run(runs=2, steps_per_run=5)
+    assert results["population_size"].dtype == np.float64
+    assert results["food_supply"].dtype == np.float32
+    expected = Simulation(LotkaVolterraSystem(**PARAMS), WATCHLIST).run(runs=2, steps_per_run=5)
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+
+def test_values_are_converted_to_declared_dtypes():
+    results = Simulation(CounterSystem(), ["count"]).run(runs=1, steps_per_run=3)
+    assert results["count"].dtype == np.int32
+    assert results["count"].tolist() == [0, 1, 2]
+
+
+def test_vectorized_results_have_declared_dtypes():
+    results = Simulation(TypedVectorizedLotkaVolterraSystem(**PARAMS), WATCHLIST).run(runs=3, steps_per_run=5)
+    assert results["food_supply"].dtype == np.float32
+    expected = Simulation(VectorizedLotkaVolterraSystem(**PARAMS), WATCHLIST).run(runs=3, steps_per_run=5)
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
+
+
+def test_initial_state_is_checked_against_schema():
+    with pytest.raises(Exception, match="aren't declared"):
+        Simulation(CounterSystem(extra="total"), ["count"]).run(runs=1, steps_per_run=2)
+
+
+def test_missing_state_variables_raise():
+    with pytest.raises(Exception, match="missing"):
+        StateSchema(count=int, total=int).check({"count": 0, "run": 0, "step": 0})
@@ -1,8 +1,38 @@
+import random
+
+import numpy as np
+import pandas as pd
+
 from solsim.simulation import Simulation
+from solsim.system import BaseSystem, VectorizedSystem
+
+
+class RandomWalkSystem(BaseSystem):
+    def initial_step(self):
+        return {"position": 0}
+
+    def step(self, state, history):
+        return {"position": state["position"] + random.choice([-1, 1])}
+
+
+class GeneratorWalkSystem(BaseSystem):
+    def initial_step(self):
+        return {"position": 0}
+
+    def step(self, state, history):
+        return {"position": state["position"] + int(self.rng.choice([-1, 1]))}
+
+
+class VectorizedGeneratorWalkSystem(VectorizedSystem):
+    def initial_step(self, runs):
+        return {"position": np.zeros(runs, dtype=int)}
+
+    def step(self, state, history):
+        return {"position": state["position"] + self.rng.choice([-1, 1], size=len(state["position"]))}
 
 
-def mock_run_method(runs, steps_per_run, visualize_results):
-    return runs, steps_per_run, visualize_results
+def mock_run_method(runs, steps_per_run, visualize_results, workers, resume=False):
+    return runs, steps_per_run, visualize_results, workers, resume
 
 
 def test_cli_command_list():
@@ -17,6 +47,44 @@ def test_cli_run_method(mocker):
     simulation = Simulation(system=None, watchlist=())
     cli_commands = simulation.cli.registered_commands
     (cli_run_cmd,) = [cmd.callback for cmd in cli_commands if cmd.callback.__name__ == "run"]
-    args = 5, 10, True  # runs, steps_per_run, viz_results
-    assert simulation.run(*args) == cli_run_cmd(*args)
-    assert Simulation.run.mock_calls == [mocker.call(*args)] * 2
+    args = 5, 10, True, 2  # runs, steps_per_run, viz_results, workers
+    assert simulation.run(*args, resume=True) == cli_run_cmd(*args, resume=True)
+    assert Simulation.run.mock_calls == [mocker.call(*args, resume=True)] * 2
+
+
+def test_runs_are_reproducible_given_seed():
+    first = Simulation(RandomWalkSystem(), watchlist=("position",), seed=42).run(runs=3, steps_per_run=10)
+    second = Simulation(RandomWalkSystem(), watchlist=("position",), seed=42).run(runs=3, steps_per_run=10)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_parallel_run_matches_serial_run():
+    simulation = Simulation(RandomWalkSystem(), watchlist=("position",), seed=42)
+    serial = simulation.run(runs=5, steps_per_run=10)
+    parallel = simulation.run(runs=5, steps_per_run=10, workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_run_reexecuted_alone_reproduces_its_rows():
+    simulation = Simulation(GeneratorWalkSystem(), watchlist=("position",), seed=42)
+    every_run = simulation.run(runs=5, steps_per_run=10)
+    run_3 = simulation.run(runs=[3], steps_per_run=10)
+    pd.testing.assert_frame_equal(run_3, every_run[every_run["run"] == 3].reset_index(drop=True))
+
+
+def test_runs_draw_from_independent_generators():
+    results = Simulation(GeneratorWalkSystem(), watchlist=("position",), seed=42).run(runs=4, steps_per_run=50)
+    walks = [run["position"].tolist() for _, run in results.groupby("run")]
+    assert len({tuple(walk) for walk in walks}) == 4
+    parallel = Simulation(GeneratorWalkSystem(), watchlist=("position",), seed=42).run(runs=4, steps_per_run=50, workers=2)
+    pd.testing.assert_frame_equal(results, parallel)
+
+
+def test_vectorized_runs_are_reproducible_per_number_of_workers():
+    simulation = Simulation(VectorizedGeneratorWalkSystem(), watchlist=("position",), seed=42)
+    serial = simulation.run(runs=4, steps_per_run=20)
+    parallel = simulation.run(runs=4, steps_per_run=20, workers=2)
+    pd.testing.assert_frame_equal(serial, simulation.run(runs=4, steps_per_run=20))
+    pd.testing.assert_frame_equal(parallel, simulation.run(runs=4, steps_per_run=20, workers=2))
+    # Each worker draws for its own shard of runs, so shards don't reproduce the serial draws.
+    assert not serial.equals(parallel)
@@ -0,0 +1,64 @@
+import pandas as pd
+import pyarrow.dataset as ds
+import pytest
+
+from solsim import explore
+from solsim.simulation import Simulation
+from solsim.sink import FeatherSink, ParquetSink
+from solsim.system import BaseSystem
+
+
+class CountingSystem(BaseSystem):
+    def initial_step(self):
+        return {"count": 0}
+
+    def step(self, state, history):
+        if state["count"] == 3 and state["run"] == 1:
+            raise RuntimeError("boom")
+        return {"count": state["count"] + 1}
+
+
+@pytest.mark.parametrize("sink_class", [FeatherSink, ParquetSink])
+def test_sink_results_match_in_memory_results(tmp_path, sink_class):
+    sink = sink_class(str(tmp_path), flush_every=3)
+    expected = Simulation(CountingSystem(), watchlist=("count",)).run(runs=1, steps_per_run=4)
+    actual = Simulation(CountingSystem(), watchlist=("count",), sink=sink).run(runs=1, steps_per_run=4)
+
+    assert len(sink.parts) == 2
+    pd.testing.assert_frame_equal(expected, actual)
+
+
+def test_sink_returns_lazy_dataset(tmp_path):
+    sink = FeatherSink(str(tmp_path), flush_every=2)
+    results = Simulation(CountingSystem(), watchlist=("count",), sink=sink).run(runs=1, steps_per_run=3, lazy=True)
+
+    assert isinstance(results, ds.Dataset)
+    assert results.to_table(columns=["count"]).column("count").to_pylist() == [0, 1, 2]
+
+
+def test_sink_keeps_flushed_results_after_crash(tmp_path):
+    sink = FeatherSink(str(tmp_path), flush_every=2)
+    with pytest.raises(RuntimeError):
+        Simulation(CountingSystem(), watchlist=("count",), sink=sink).run(runs=2, steps_per_run=5)
+
+    results = sink.read()
+    assert results["run"].tolist() == [0] * 5 + [1] * 4
+    assert results["count"].tolist() == [0, 1, 2, 3, 4, 0, 1, 2, 3]
+
+
+class PromotingSystem(BaseSystem):
+    def initial_step(self):
+        return {"amount": 0}
+
+    def step(self, state, history):
+        return {"amount": state["amount"] + 0.5}
+
+
+@pytest.mark.parametrize("sink_class", [FeatherSink, ParquetSink])
+def test_sink_dataset_widens_columns_promoted_after_first_flush(tmp_path, sink_class):
+    sink = sink_class(str(tmp_path), flush_every=1)
+    results = Simulation(PromotingSystem(), watchlist=("amount",), sink=sink).run(runs=1, steps_per_run=3, lazy=True)
+
+    assert results.schema.field("amount").type == "double"
+    assert results.to_table().column("amount").to_pylist() == [0.0, 0.5, 1.0]
+    assert explore.read_quantities(explore.open_results(sink.path, sink.FORMAT), ["amount"])["amount"].dtype == float
@@ -0,0 +1,139 @@
+import random
+
+import numpy as np
+import pytest
+
+from solsim.simulation import Simulation
+from solsim.stopping import Convergence, fixed_point, threshold
+from solsim.system import BaseSystem, VectorizedSystem
+
+
+class DecaySystem(BaseSystem):
+    """A population that dies out after a random number of steps, after which it stays at 0."""
+
+    def initial_step(self):
+        return {"population": random.randint(1, 5)}
+
+    def step(self, state, history):
+        return {"population": max(state["population"] - 1, 0)}
+
+
+class VectorizedDecaySystem(VectorizedSystem):
+    def initial_step(self, runs):
+        return {"population": np.arange(1, runs + 1)}
+
+    def step(self, state, history):
+        return {"population": np.maximum(state["population"] - 1, 0)}
+
+
+class NoisySystem(BaseSystem):
+    def initial_step(self):
+        return {"value": random.gauss(10, 1)}
+
+    def step(self, state, history):
+        return {"value": state["value"]}
+
+
+def test_threshold_ends_runs_early():
+    results = Simulation(DecaySystem(), ["population"], seed=0, stop_run=threshold("population", lower=0)).run(
+        runs=10, steps_per_run=20
+    )
+    last = results.groupby("run").tail(1)
+    assert (last["population"] == 0).all()
+    assert (results.groupby("run").size() <= 6).all()
+    assert (results.groupby("run")["population"].apply(lambda population: (population.iloc[:-1] > 0).all())).all()
+
+
+def test_fixed_point_ends_runs_once_state_stops_changing():
+    results = Simulation(DecaySystem(), ["population"], seed=0, stop_run=fixed_point(["population"])).run(
+        runs=10, steps_per_run=20
+    )
+    for _, run in results.groupby("run"):
+        assert list(run["population"].iloc[-2:]) == [0, 0]
+        assert (run["population"].iloc[:-2] > 0).all()
+
+
+def test_vectorized_runs_end_independently():
+    results = Simulation(VectorizedDecaySystem(), ["population"], stop_run=threshold("population", lower=0)).run(
+        runs=4, steps_per_run=10
+    )
+    assert results.groupby("run").size().tolist() == [2, 3, 4, 5]
+    assert results.groupby("run")["step"].max().tolist() == [1, 2, 3, 4]
+    assert (results.groupby("run").tail(1)["population"] == 0).all()
+
+
+def test_vectorized_summary_counts_only_running_runs():
+    results = Simulation(
+        VectorizedDecaySystem(), ["population"], summarize=True, stop_run=threshold("population", lower=0)
+    ).run(runs=4, steps_per_run=10)
+    assert results["count"].tolist()[:5] == [4, 4, 3, 2, 1]
+    assert (results["count"].iloc[5:] == 0).all()
+
+
+def test_convergence_stops_scheduling_runs():
+    convergence = Convergence(["value"], tolerance=0.5, min_runs=10)
+    results = Simulation(NoisySystem(), ["value"], seed=0, convergence=convergence).run(runs=10_000, steps_per_run=2)
+    assert 10 <= results["run"].nunique() < 200
+    assert results["run"].nunique() == convergence.runs
+    assert convergence.converged
+    assert convergence.widths()["value"] <= 0.5
+    assert convergence.means()["value"] == pytest.approx(10, abs=0.5)
+
+
+def test_relative_convergence():
+    convergence = Convergence(["value"], tolerance=0.05, relative=True)
+    results = Simulation(NoisySystem(), ["value"], seed=0, convergence=convergence).run(runs=10_000, steps_per_run=1)
+    assert convergence.converged
+    assert convergence.widths()["value"] <= 0.05
+    assert results["value"].std() * 2 * 1.96 / np.sqrt(len(results)) / results["value"].mean() == pytest.approx(
+        convergence.widths()["value"], rel=1e-3
+    )
+
+
+def test_convergence_across_workers():
+    convergence = Convergence(["value"], tolerance=0.5, min_runs=10)
+    results = Simulation(NoisySystem(), ["value"], seed=0, convergence=convergence).run(
+        runs=10_000, steps_per_run=2, workers=2
+    )
+    assert convergence.converged
+    assert results["run"].nunique() == convergence.runs < 1_000
+
+
+def test_merged_convergence_matches_single_one():
+    states = [{"value": value} for value in np.random.default_rng(0).normal(size=50)]
+    expected, merged, other = (Convergence(["value"], tolerance=0.1) for _ in range(3))
+    for i, state in enumerate(states):
+        expected.update(state)
+        (merged if i < 20 else other).update(state)
+    merged.merge(other)
+    assert merged.runs == expected.runs
+    assert merged.means() == pytest.approx(expected.means())
+    assert merged.widths() == pytest.approx(expected.widths())
+
+
+def test_vectorized_systems_cannot_converge():
+    with pytest.raises(Exception, match="converge"):
+        Simulation(VectorizedDecaySystem(), ["population"], convergence=Convergence(["population"], 0.1)).run()
+
+
+class CrashingNoisySystem(NoisySystem):
+    def __init__(self, crash_at_run=None):
+        self.crash_at_run = crash_at_run
+
+    def step(self, state, history):
+        if state["run"] == self.crash_at_run:
+            raise KeyboardInterrupt
+        return super().step(state, history)
+
+
+def test_resumed_simulation_keeps_convergence_estimates(tmp_path):
+    expected = Convergence(["value"], tolerance=0.5)
+    Simulation(NoisySystem(), ["value"], seed=0, convergence=expected).run(runs=10_000, steps_per_run=2)
+    convergence = Convergence(["value"], tolerance=0.5)
+    kwargs = dict(seed=0, convergence=convergence, checkpoint_dir=str(tmp_path / "checkpoints"), checkpoint_every=1)
+    with pytest.raises(BaseException):
+        Simulation(CrashingNoisySystem(crash_at_run=20), ["value"], **kwargs).run(runs=10_000, steps_per_run=2)
+    assert convergence.runs == 20
+    Simulation(CrashingNoisySystem(), ["value"], **kwargs).run(runs=10_000, steps_per_run=2, resume=True)
+    assert convergence.runs == expected.runs
+    assert convergence.means() == pytest.approx(expected.means())
@@ -0,0 +1,111 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from solsim.simulation import Simulation
+from solsim.summary import SummaryStore, TDigest
+from solsim.system import BaseSystem, VectorizedSystem
+
+
+class WalkSystem(BaseSystem):
+    def initial_step(self):
+        return {"position": 0.0, "label": "walk"}
+
+    def step(self, state, history):
+        return {"position": state["position"] + random.gauss(0, 1), "label": "walk"}
+
+
+class VectorizedWalkSystem(VectorizedSystem):
+    def initial_step(self, runs):
+        return {"position": np.zeros(runs)}
+
+    def step(self, state, history):
+        return {"position": state["position"] + np.random.normal(size=len(state["position"]))}
+
+
+def fill(store, values, runs):
+    for run in runs:
+        for step in range(store.steps_per_run):
+            store.append(run, step, {"position": values[run, step]})
+    return store
+
+
+def test_summary_matches_exact_statistics():
+    values = np.random.default_rng(0).normal(size=(500, 3))
+    summary = fill(SummaryStore(["position"], steps_per_run=3), values, range(500)).to_frame()
+    assert list(summary.columns) == ["step", "variable", "count", "mean", "std", "min", "max"] + [
+        f"p{q}" for q in (5, 25, 50, 75, 95)
+    ]
+    np.testing.assert_allclose(summary["mean"], values.mean(axis=0))
+    np.testing.assert_allclose(summary["std"], values.std(axis=0, ddof=1))
+    np.testing.assert_allclose(summary["min"], values.min(axis=0))
+    np.testing.assert_allclose(summary["max"], values.max(axis=0))
+    np.testing.assert_allclose(summary["p50"], np.quantile(values, 0.5, axis=0), atol=0.05)
+    np.testing.assert_allclose(summary["p95"], np.quantile(values, 0.95, axis=0), atol=0.05)
+
+
+def test_tdigest_estimates_quantiles_of_large_samples():
+    values = np.random.default_rng(0).exponential(size=100_000)
+    digest = TDigest()
+    digest.add_many(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        assert digest.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+    assert len(digest._means) < 10 * digest.compression
+
+
+def test_merged_summaries_match_single_summary():
+    values = np.random.default_rng(0).normal(size=(200, 4))
+    expected = fill(SummaryStore(["position"], steps_per_run=4), values, range(200)).to_frame()
+    merged = fill(SummaryStore(["position"], steps_per_run=4), values, range(0, 80))
+    merged.merge(fill(SummaryStore(["position"], steps_per_run=4), values, range(80, 200)))
+    merged = merged.to_frame()
+    pd.testing.assert_frame_equal(
+        merged[["step", "count", "mean", "std", "min", "max"]], expected[["step", "count", "mean", "std", "min", "max"]]
+    )
+    np.testing.assert_allclose(merged["p50"], expected["p50"], atol=0.05)
+
+
+def test_summary_memory_does_not_grow_with_runs():
+    def size(runs):
+        store = fill(
+            SummaryStore(["position"], steps_per_run=2), np.random.default_rng(0).normal(size=(runs, 2)), range(runs)
+        )
+        return sum(len(digest._means) + len(digest._buffer) for digest in store._digests["position"])
+
+    assert size(100_000) <= size(10_000) * 1.5
+
+
+def test_simulation_summarizes_across_runs():
+    results = Simulation(WalkSystem(), ["position"], seed=0, summarize=True).run(runs=50, steps_per_run=5)
+    raw = Simulation(WalkSystem(), ["position"], seed=0).run(runs=50, steps_per_run=5)
+    assert list(results["step"]) == list(range(5))
+    assert (results["count"] == 50).all()
+    np.testing.assert_allclose(results["mean"], raw.groupby("step")["position"].mean())
+    np.testing.assert_allclose(results["std"], raw.groupby("step")["position"].std())
+
+
+def test_parallel_simulation_merges_summaries():
+    results = Simulation(WalkSystem(), ["position"], seed=0, summarize=True).run(runs=40, steps_per_run=5, workers=2)
+    raw = Simulation(WalkSystem(), ["position"], seed=0).run(runs=40, steps_per_run=5, workers=2)
+    assert (results["count"] == 40).all()
+    np.testing.assert_allclose(results["mean"], raw.groupby("step")["position"].mean())
+
+
+def test_vectorized_simulation_summarizes_across_runs():
+    results = Simulation(VectorizedWalkSystem(), ["position"], seed=0, summarize=True).run(runs=1_000, steps_per_run=5)
+    raw = Simulation(VectorizedWalkSystem(), ["position"], seed=0).run(runs=1_000, steps_per_run=5)
+    np.testing.assert_allclose(results["mean"], raw.groupby("step")["position"].mean())
+    np.testing.assert_allclose(results["std"], raw.groupby("step")["position"].std())
+    np.testing.assert_allclose(results["p50"], raw.groupby("step")["position"].median(), atol=0.1)
+
+
+def test_summary_requires_numeric_quantities():
+    with pytest.raises(Exception, match="numeric"):
+        Simulation(WalkSystem(), ["label"], summarize=True).run(runs=2, steps_per_run=2)
+
+
+def test_summaries_are_not_visualized():
+    with pytest.raises(Exception, match="visualized"):
+        Simulation(WalkSystem(), ["position"], summarize=True).run(runs=2, steps_per_run=2, visualize_results=True)
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+from examples.lotka_volterra.system import LotkaVolterraSystem
+from solsim.sweep import Sweep
+
+
+BUILT = []
+
+
+def build_system(**params):
+    BUILT.append(params)
+    return LotkaVolterraSystem(population_size=50, food_supply=1000, **params)
+
+
+WATCHLIST = ("population_size", "food_supply")
+GRID = {"reproduction_rate": [0.01, 0.02], "consumption_rate": [0.1, 0.2, 0.3]}
+
+
+def test_grid_sweep_indexes_results_by_parameters():
+    results = Sweep.grid(build_system, WATCHLIST, GRID, seed=0).run(runs=2, steps_per_run=3)
+
+    assert list(results.columns[:4]) == ["reproduction_rate", "consumption_rate", "step", "run"]
+    assert len(results) == 6 * 2 * 3
+    assert results.groupby(["reproduction_rate", "consumption_rate"]).ngroups == 6
+
+
+def test_parallel_sweep_matches_serial_sweep():
+    serial = Sweep.grid(build_system, WATCHLIST, GRID, seed=0).run(runs=2, steps_per_run=3)
+    parallel = Sweep.grid(build_system, WATCHLIST, GRID, seed=0).run(runs=2, steps_per_run=3, workers=3)
+
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_sweep_skips_completed_combinations(tmp_path):
+    Sweep.grid(
+        build_system, WATCHLIST, {"reproduction_rate": [0.01], "consumption_rate": [0.1]}, output_dir=str(tmp_path)
+    ).run(runs=2, steps_per_run=3)
+
+    BUILT.clear()
+    results = Sweep.grid(build_system, WATCHLIST, GRID, output_dir=str(tmp_path)).run(runs=2, steps_per_run=3)
+
+    assert len(BUILT) == 5 * 2
+    assert len(results) == 6 * 2 * 3
+
+
+def test_sweep_recomputes_combinations_saved_for_other_runs_or_seeds(tmp_path):
+    grid = {"reproduction_rate": [0.01], "consumption_rate": [0.1]}
+    Sweep.grid(build_system, WATCHLIST, grid, seed=0, output_dir=str(tmp_path)).run(runs=2, steps_per_run=3)
+
+    BUILT.clear()
+    results = Sweep.grid(build_system, WATCHLIST, grid, seed=0, output_dir=str(tmp_path)).run(runs=3, steps_per_run=4)
+    assert len(BUILT) == 3
+    assert len(results) == 3 * 4
+
+    BUILT.clear()
+    Sweep.grid(build_system, WATCHLIST, grid, seed=1, output_dir=str(tmp_path)).run(runs=3, steps_per_run=4)
+    assert len(BUILT) == 3
+
+
+@pytest.mark.parametrize("sample", [Sweep.random, Sweep.latin_hypercube])
+def test_resumed_sampled_sweeps_sample_and_skip_the_same_combinations(tmp_path, sample):
+    bounds = {"reproduction_rate": (0.0, 0.1), "consumption_rate": (0.0, 1.0)}
+    first = sample(build_system, WATCHLIST, bounds, samples=3, output_dir=str(tmp_path))
+    expected = first.run(runs=2, steps_per_run=3)
+
+    BUILT.clear()
+    resumed = sample(build_system, WATCHLIST, bounds, samples=3, output_dir=str(tmp_path))
+    results = resumed.run(runs=2, steps_per_run=3)
+
+    assert resumed.design == first.design
+    assert BUILT == []
+    pd.testing.assert_frame_equal(results, expected)
+
+
+def test_latin_hypercube_design_stratifies_each_parameter():
+    bounds = {"reproduction_rate": (0.0, 0.1), "consumption_rate": (0.0, 1.0)}
+    sweep = Sweep.latin_hypercube(build_system, WATCHLIST, bounds, samples=10, seed=0)
+    strata = sorted(int(params["consumption_rate"] * 10) for params in sweep.design)
+
+    assert strata == list(range(10))
@@ -1,4 +1,5 @@
 import os
+import pickle
 from signal import SIGTERM
 from pytest import fixture
 from typing import Any, Dict, List
@@ -9,6 +10,7 @@ from solana.publickey import PublicKey
 import solsim
 from solsim.simulation import Simulation
 from solsim.system import BaseSolanaSystem
+from solsim.validator import LocalnetValidator, ValidatorPool
 
 
 class SomeSolanaSystem(BaseSolanaSystem):
@@ -22,6 +24,10 @@ class SomeSolanaSystem(BaseSolanaSystem):
         return {"a": 1, "b": 2}
 
 
+class ReusingSolanaSystem(SomeSolanaSystem):
+    REUSE_LOCALNET = True
+
+
 @fixture(scope="function")
 def workspace_dir():
     return os.path.join(os.path.dirname(__file__), "idls")
@@ -67,13 +73,84 @@ def test_solana_localnet_process(mocker, workspace_dir, solana_client, solana_lo
 def test_workspace_created_and_closed(mocker, workspace_dir, solana_client, solana_localnet_process):
     workspace = mocker.MagicMock()
     mocker.patch("psutil.Process", return_value=solana_localnet_process)
-    mocker.patch("solsim.system.create_workspace", return_value=workspace)
-    mocker.patch("solsim.system.close_workspace")
+    mocker.patch("solsim.solana_system.create_workspace", return_value=workspace)
+    mocker.patch("solsim.solana_system.close_workspace")
     system = SomeSolanaSystem(workspace_dir, solana_client, solana_localnet_process)
 
-    solsim.system.create_workspace.assert_called_once_with(workspace_dir)
+    solsim.solana_system.create_workspace.assert_called_once_with(workspace_dir, url=BaseSolanaSystem.SOLANA_CLUSTER_URI)
 
     simulation = Simulation(system, watchlist=("a"))
     simulation.run(steps_per_run=5)
 
-    solsim.system.close_workspace.assert_called_once_with(workspace)
+    solsim.solana_system.close_workspace.assert_called_once_with(workspace)
+
+
+def test_localnet_restarted_for_each_run_by_default(mocker, workspace_dir, solana_client, solana_localnet_process):
+    start = mocker.patch.object(LocalnetValidator, "start")
+    stop = mocker.patch.object(LocalnetValidator, "stop")
+    system = SomeSolanaSystem(workspace_dir, solana_client, solana_localnet_process)
+    mocker.spy(system, "reset")
+    simulation = Simulation(system, watchlist=("a"))
+    simulation.run(runs=3, steps_per_run=2)
+
+    assert system.reset.call_count == 0
+    assert (start.call_count, stop.call_count) == (1 + 3, 3 + 1)
+
+
+def test_localnet_reused_across_runs(mocker, workspace_dir, solana_client, solana_localnet_process):
+    mocker.patch("psutil.Process", return_value=solana_localnet_process)
+    system = ReusingSolanaSystem(workspace_dir, solana_client, solana_localnet_process)
+    mocker.spy(system, "reset")
+    simulation = Simulation(system, watchlist=("a"))
+    simulation.run(runs=3, steps_per_run=2)
+
+    assert system.reset.call_count == 3
+    solana_localnet_process.send_signal.assert_called_once_with(SIGTERM)
+
+
+def test_validator_waits_until_healthy(mocker, workspace_dir):
+    mocker.patch("psutil.process_iter", return_value=[])
+    popen = mocker.patch("subprocess.Popen")
+    popen.return_value.poll.return_value = None
+    healthy = mocker.patch.object(LocalnetValidator, "healthy", new_callable=mocker.PropertyMock)
+    healthy.side_effect = [False, False, True]
+    sleep = mocker.patch("time.sleep")
+    validator = LocalnetValidator(workspace_dir, poll_interval=0.01)
+    validator.start()
+    validator.start()
+
+    assert validator.running
+    assert popen.call_count == 1
+    assert sleep.call_args_list == [mocker.call(0.01)] * 2
+
+
+def test_validator_pool_assigns_distinct_clusters(workspace_dir):
+    pool = ValidatorPool(workspace_dir, size=2)
+    validators = [pool.validator(slot) for slot in range(pool.size)]
+    commands = [validator._command() for validator in validators]
+    for validator in validators:
+        validator.stop()
+
+    assert [validator.cluster_uri for validator in validators] == ["http://127.0.0.1:20000", "http://127.0.0.1:20050"]
+    assert commands[0][commands[0].index("--ledger") + 1] != commands[1][commands[1].index("--ledger") + 1]
+    assert commands[1][commands[1].index("--dynamic-port-range") + 1] == "20060-20099"
+    assert commands[0][-3:] == [
+        "--bpf-program",
+        "8nA4T4UFdYz1sKuEFdnj2mYcJ6hp79Tw14sPvTQVWwVb",
+        os.path.join(workspace_dir, "target", "deploy", "basic-0.so"),
+    ]
+
+
+def test_system_built_in_worker_uses_worker_cluster(mocker, workspace_dir, solana_client):
+    validator = mocker.Mock(cluster_uri="http://127.0.0.1:20000")
+    mocker.patch("solsim.solana_system.worker_validator", return_value=validator)
+    mocker.patch("solsim.solana_system.create_workspace")
+    mocker.patch("solsim.solana_system.close_workspace")
+    system = pickle.loads(pickle.dumps(ReusingSolanaSystem(workspace_dir, client=None, localnet_process=None)))
+    simulation = Simulation(system, watchlist=("a"))
+    simulation.run(steps_per_run=2)
+
+    assert system.validator is validator
+    solsim.solana_system.create_workspace.assert_called_with(workspace_dir, url="http://127.0.0.1:20000")
+    validator.start.assert_called()
+    validator.stop.assert_not_called()